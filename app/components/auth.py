@@ -1,11 +1,30 @@
 """
 Componente de autenticación
 """
+import threading
 import streamlit as st
-import pandas as pd
-from src.utils import generate_user_names
+from app.components.user_index import UserNameIndex
 from config.settings import USER_CONFIG, GRADIENTS
 
+USER_INDEX_FILE = 'data/user_index.pkl'
+
+# Índice de nombres compartido por todas las sesiones del proceso
+_user_index = None
+_user_index_lock = threading.Lock()
+
+
+def get_user_index():
+    """Obtiene el índice de login, al día con la tabla de interacciones"""
+    global _user_index
+    
+    with _user_index_lock:
+        if _user_index is None:
+            _user_index = UserNameIndex(USER_INDEX_FILE)
+    
+    _user_index.refresh()
+    return _user_index
+
+
 def authenticate_user(username, password):
     """Autentica usuario y devuelve rol y user_id"""
     # Director
@@ -13,15 +32,11 @@ def authenticate_user(username, password):
         password == USER_CONFIG['director_password']):
         return "director", None, "Director del Sistema"
     
-    # Clientes
-    interactions = pd.read_csv('data/interactions.csv')
-    user_ids = sorted(interactions['user_id'].unique())
-    user_names = generate_user_names(user_ids)
-    
-    for user_id, name in user_names.items():
-        if (name.lower() == username.lower() and 
-            password == USER_CONFIG['default_password']):
-            return "cliente", user_id, name
+    # Clientes: una búsqueda en el índice de nombres
+    match = get_user_index().lookup(username)
+    if match is not None and password == USER_CONFIG['default_password']:
+        user_id, name = match
+        return "cliente", user_id, name
     
     return None, None, None
 
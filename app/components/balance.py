@@ -2,21 +2,42 @@
 Gestión de saldo de usuarios
 Saldo inicial: $3000.00 por usuario
 """
-import pandas as pd
-import os
-from datetime import datetime
+import threading
+from app.components.balance_store import SQLiteBalanceStore, CSVBalanceStore
+from config.settings import DATA_CONFIG
 
 BALANCE_FILE = 'data/user_balance.csv'
+BALANCE_DB = 'data/user_balance.db'
 INITIAL_BALANCE = 3000.00
 
+# Backend compartido por todas las sesiones del proceso
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_balance_store():
+    """
+    Obtiene el backend de saldos configurado en DATA_CONFIG['balance_backend']
+
+    'sqlite' (por defecto) migra el CSV existente la primera vez que se abre;
+    'csv' conserva el archivo original como almacenamiento.
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            if DATA_CONFIG.get('balance_backend', 'sqlite') == 'csv':
+                _store = CSVBalanceStore(BALANCE_FILE, INITIAL_BALANCE)
+            else:
+                _store = SQLiteBalanceStore(BALANCE_DB, INITIAL_BALANCE)
+                _store.import_csv(BALANCE_FILE)
+
+    return _store
+
 
 def initialize_balance_file():
-    """Crea el archivo de saldo si no existe"""
-    os.makedirs('data', exist_ok=True)
-    
-    if not os.path.exists(BALANCE_FILE):
-        df = pd.DataFrame(columns=['user_id', 'balance', 'last_updated'])
-        df.to_csv(BALANCE_FILE, index=False)
+    """Crea el almacenamiento de saldo si no existe"""
+    get_balance_store()
 
 
 def get_user_balance(user_id):
@@ -24,25 +45,9 @@ def get_user_balance(user_id):
     Obtiene el saldo actual de un usuario
     Si no existe, crea uno con saldo inicial de $3000
     """
-    initialize_balance_file()
-    
     try:
-        df = pd.read_csv(BALANCE_FILE)
-        
-        if user_id in df['user_id'].values:
-            balance = df[df['user_id'] == user_id]['balance'].iloc[0]
-            return float(balance)
-        else:
-            # Usuario nuevo - asignar saldo inicial
-            new_row = pd.DataFrame({
-                'user_id': [user_id],
-                'balance': [INITIAL_BALANCE],
-                'last_updated': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-            })
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(BALANCE_FILE, index=False)
-            return INITIAL_BALANCE
-            
+        return get_balance_store().get(user_id)
+
     except Exception as e:
         print(f"Error al obtener saldo: {e}")
         return INITIAL_BALANCE
@@ -52,25 +57,10 @@ def update_user_balance(user_id, new_balance):
     """
     Actualiza el saldo de un usuario
     """
-    initialize_balance_file()
-    
     try:
-        df = pd.read_csv(BALANCE_FILE)
-        
-        if user_id in df['user_id'].values:
-            df.loc[df['user_id'] == user_id, 'balance'] = new_balance
-            df.loc[df['user_id'] == user_id, 'last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        else:
-            new_row = pd.DataFrame({
-                'user_id': [user_id],
-                'balance': [new_balance],
-                'last_updated': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-            })
-            df = pd.concat([df, new_row], ignore_index=True)
-        
-        df.to_csv(BALANCE_FILE, index=False)
+        get_balance_store().set(user_id, new_balance)
         return True
-        
+
     except Exception as e:
         print(f"Error al actualizar saldo: {e}")
         return False
@@ -81,23 +71,23 @@ def deduct_balance(user_id, amount):
     Descuenta un monto del saldo del usuario
     Retorna (success, new_balance, message)
     """
-    current_balance = get_user_balance(user_id)
-    
-    if current_balance < amount:
-        return False, current_balance, f"Saldo insuficiente. Necesitas ${amount:.2f} pero tienes ${current_balance:.2f}"
-    
-    new_balance = current_balance - amount
-    success = update_user_balance(user_id, new_balance)
-    
+    try:
+        success, balance = get_balance_store().debit(user_id, amount)
+    except Exception as e:
+        print(f"Error al descontar saldo: {e}")
+        return False, get_user_balance(user_id), "Error al procesar el pago"
+
     if success:
-        return True, new_balance, f"Compra exitosa. Nuevo saldo: ${new_balance:.2f}"
+        return True, balance, f"Compra exitosa. Nuevo saldo: ${balance:.2f}"
     else:
-        return False, current_balance, "Error al procesar el pago"
+        return False, balance, f"Saldo insuficiente. Necesitas ${amount:.2f} pero tienes ${balance:.2f}"
 
 
 def add_balance(user_id, amount):
     """Añade saldo a un usuario (para reembolsos o recargas)"""
-    current_balance = get_user_balance(user_id)
-    new_balance = current_balance + amount
-    success = update_user_balance(user_id, new_balance)
-    return success, new_balance
+    try:
+        new_balance = get_balance_store().credit(user_id, amount)
+        return True, new_balance
+    except Exception as e:
+        print(f"Error al añadir saldo: {e}")
+        return False, get_user_balance(user_id)
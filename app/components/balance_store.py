@@ -0,0 +1,243 @@
+"""
+Backends de almacenamiento de saldos
+SQLite (modo WAL) con lecturas por clave y débitos atómicos, y el archivo
+CSV original como respaldo
+"""
+import sqlite3
+import threading
+import os
+import pandas as pd
+from datetime import datetime
+from src.data_store import DATA_CACHE
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class SQLiteBalanceStore:
+    """
+    Saldos en SQLite con una fila por usuario
+
+    Cada débito es un UPDATE condicional dentro de una transacción
+    BEGIN IMMEDIATE, así que sesiones concurrentes (hilos o procesos) no
+    pierden actualizaciones ni dejan saldos negativos.
+    """
+
+    def __init__(self, db_path, initial_balance):
+        """
+        Abre (o crea) la base de datos de saldos
+
+        Args:
+            db_path: Ruta del archivo SQLite
+            initial_balance: Saldo asignado a usuarios nuevos
+        """
+        self.db_path = db_path
+        self.initial_balance = initial_balance
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS balances (
+                user_id INTEGER PRIMARY KEY,
+                balance REAL NOT NULL,
+                last_updated TEXT NOT NULL
+            )
+        """)
+
+    def _connection(self):
+        """Conexión propia de cada hilo (y de cada proceso)"""
+        conn = getattr(self._local, 'conn', None)
+        pid = getattr(self._local, 'pid', None)
+
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return conn
+
+    def _ensure_user(self, conn, user_id):
+        conn.execute(
+            "INSERT OR IGNORE INTO balances (user_id, balance, last_updated) VALUES (?, ?, ?)",
+            (int(user_id), self.initial_balance, _now())
+        )
+
+    def get(self, user_id):
+        """Obtiene el saldo del usuario, creándolo con el saldo inicial si no existe"""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT balance FROM balances WHERE user_id = ?", (int(user_id),)
+        ).fetchone()
+
+        if row is not None:
+            return float(row[0])
+
+        self._ensure_user(conn, user_id)
+        return self.get(user_id)
+
+    def set(self, user_id, balance):
+        """Fija el saldo del usuario"""
+        self._connection().execute(
+            """
+            INSERT INTO balances (user_id, balance, last_updated) VALUES (?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                balance = excluded.balance,
+                last_updated = excluded.last_updated
+            """,
+            (int(user_id), float(balance), _now())
+        )
+
+    def debit(self, user_id, amount):
+        """
+        Descuenta amount solo si el saldo alcanza, de forma atómica
+
+        Returns:
+            (success, balance): balance es el saldo resultante o el actual si falla
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._ensure_user(conn, user_id)
+            cursor = conn.execute(
+                """
+                UPDATE balances SET balance = balance - ?, last_updated = ?
+                WHERE user_id = ? AND balance >= ?
+                """,
+                (float(amount), _now(), int(user_id), float(amount))
+            )
+            balance = conn.execute(
+                "SELECT balance FROM balances WHERE user_id = ?", (int(user_id),)
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return cursor.rowcount == 1, float(balance)
+
+    def credit(self, user_id, amount):
+        """Suma amount al saldo de forma atómica y devuelve el nuevo saldo"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._ensure_user(conn, user_id)
+            conn.execute(
+                "UPDATE balances SET balance = balance + ?, last_updated = ? WHERE user_id = ?",
+                (float(amount), _now(), int(user_id))
+            )
+            balance = conn.execute(
+                "SELECT balance FROM balances WHERE user_id = ?", (int(user_id),)
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return float(balance)
+
+    def import_csv(self, csv_path):
+        """
+        Migra los saldos del archivo CSV original si la tabla está vacía
+
+        Returns:
+            Número de usuarios importados
+        """
+        if not os.path.exists(csv_path):
+            return 0
+
+        df = pd.read_csv(csv_path).drop_duplicates('user_id', keep='last')
+        if 'last_updated' not in df:
+            df['last_updated'] = _now()
+        rows = [
+            (int(user_id), float(balance), str(last_updated))
+            for user_id, balance, last_updated in zip(
+                df['user_id'], df['balance'], df['last_updated'].fillna(_now())
+            )
+        ]
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM balances").fetchone()[0] > 0:
+                rows = []
+            conn.executemany(
+                "INSERT OR IGNORE INTO balances (user_id, balance, last_updated) VALUES (?, ?, ?)",
+                rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return len(rows)
+
+
+class CSVBalanceStore:
+    """
+    Saldos en el archivo CSV original (respaldo local)
+
+    Conserva el formato user_id, balance, last_updated. Las escrituras se
+    serializan con un lock de proceso y se reemplaza el archivo de forma
+    atómica; no protege frente a varios procesos escribiendo a la vez.
+    """
+
+    def __init__(self, csv_path, initial_balance):
+        self.csv_path = csv_path
+        self.initial_balance = initial_balance
+        self._lock = threading.RLock()
+
+        os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+        if not os.path.exists(csv_path):
+            pd.DataFrame(columns=['user_id', 'balance', 'last_updated']).to_csv(csv_path, index=False)
+
+    def _read(self):
+        return DATA_CACHE.get('balances', None, [self.csv_path], lambda: pd.read_csv(self.csv_path))
+
+    def _write(self, df):
+        previous_version = DATA_CACHE.file_version([self.csv_path])
+        tmp_path = f"{self.csv_path}.{os.getpid()}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.csv_path)
+        DATA_CACHE.patch('balances', [self.csv_path], previous_version, lambda _: df)
+
+    def get(self, user_id):
+        with self._lock:
+            df = self._read()
+            if user_id in df['user_id'].values:
+                return float(df.loc[df['user_id'] == user_id, 'balance'].iloc[0])
+
+            self.set(user_id, self.initial_balance)
+            return self.initial_balance
+
+    def set(self, user_id, balance):
+        with self._lock:
+            df = self._read()
+            if user_id in df['user_id'].values:
+                df.loc[df['user_id'] == user_id, 'balance'] = balance
+                df.loc[df['user_id'] == user_id, 'last_updated'] = _now()
+            else:
+                new_row = pd.DataFrame({
+                    'user_id': [user_id],
+                    'balance': [balance],
+                    'last_updated': [_now()]
+                })
+                df = pd.concat([df, new_row], ignore_index=True)
+            self._write(df)
+
+    def debit(self, user_id, amount):
+        with self._lock:
+            balance = self.get(user_id)
+            if balance < amount:
+                return False, balance
+            self.set(user_id, balance - amount)
+            return True, balance - amount
+
+    def credit(self, user_id, amount):
+        with self._lock:
+            balance = self.get(user_id) + amount
+            self.set(user_id, balance)
+            return balance
@@ -6,8 +6,8 @@ import pandas as pd
 from datetime import datetime
 from config.settings import GRADIENTS
 from src.utils import format_currency, get_rating_stars
-from app.components.balance import get_user_balance, deduct_balance
-from app.components.purchases import save_purchase
+from app.components.balance import get_user_balance
+from app.components.purchases import save_purchases_batch
 
 
 # ============================================================================
@@ -291,40 +291,15 @@ def process_cart_checkout(user_id, user_balance):
         deficit = cart_total - user_balance
         return False, f"❌ Saldo insuficiente. Te faltan {format_currency(deficit)}", user_balance
     
-    # Descontar saldo
-    success, new_balance, message = deduct_balance(user_id, cart_total)
+    # Débito único y registro de todos los productos en un solo lote
+    success, new_balance, message = save_purchases_batch(user_id, cart)
     
-    if not success:
-        return False, message, user_balance
-    
-    # Procesar cada producto del carrito
-    failed_items = []
-    success_count = 0
-    
-    for item in cart:
-        purchase_success, purchase_message = save_purchase(
-            user_id,
-            item['product_id'],
-            item['product_name'],
-            item['category'],
-            item['price'],
-            item['quantity']
-        )
-        
-        if purchase_success:
-            success_count += 1
-        else:
-            failed_items.append(item['product_name'])
-    
-    # Limpiar carrito si todo fue exitoso
-    if success_count == len(cart):
-        clear_cart()
-        return True, f"🎉 ¡Compra exitosa! {success_count} producto(s) por {format_currency(cart_total)}. Saldo: {format_currency(new_balance)}", new_balance
-    elif success_count > 0:
+    if success:
+        count = len(cart)
         clear_cart()
-        return True, f"⚠️ Compra parcial: {success_count} de {len(cart)} productos. Saldo: {format_currency(new_balance)}", new_balance
+        return True, f"🎉 ¡Compra exitosa! {count} producto(s) por {format_currency(cart_total)}. Saldo: {format_currency(new_balance)}", new_balance
     else:
-        return False, f"❌ Error al procesar la compra. Tu saldo no se descontó.", new_balance
+        return False, message, user_balance if new_balance is None else new_balance
 
 
 # ============================================================================
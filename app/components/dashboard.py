@@ -1,47 +1,46 @@
 """
 Componente de dashboard del director
+Lee los agregados materializados de app.components.rollups en lugar de
+recorrer las interacciones en cada render
 """
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from src.utils import format_currency
+from app.components.rollups import get_dashboard_rollups
 from config.settings import THEME_COLORS, GRADIENTS
 
-def show_global_metrics(interactions, products, user_ids):
+def show_global_metrics(rollups, products):
     """Muestra métricas globales del sistema"""
+    totals = rollups.totals()
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("👥 Usuarios Totales", len(user_ids))
+        st.metric("👥 Usuarios Totales", totals['users'])
     
     with col2:
-        st.metric("🛒 Transacciones", len(interactions))
+        st.metric("🛒 Transacciones", totals['transactions'])
     
     with col3:
         st.metric("📦 Productos", len(products))
     
     with col4:
-        total_revenue = interactions['total_spent'].sum()
-        st.metric("💰 Ingresos Totales", format_currency(total_revenue))
+        st.metric("💰 Ingresos Totales", format_currency(totals['revenue']))
 
-def show_top_products_chart(interactions):
+def show_top_products_chart(rollups):
     """Muestra gráfico de productos más vendidos"""
     st.markdown("#### 📊 Top 10 Productos Más Vendidos")
     
-    top_products = interactions.groupby('product_name').agg({
-        'purchase_count': 'sum',
-        'total_spent': 'sum'
-    }).sort_values('purchase_count', ascending=False).head(10)
+    top_products = rollups.top_products(10)
     
     fig = px.bar(
-        x=top_products['purchase_count'],
-        y=top_products.index,
+        x=top_products['units'],
+        y=top_products['product_name'],
         orientation='h',
         labels={'x': 'Unidades Vendidas', 'y': 'Producto'},
-        color=top_products['purchase_count'],
+        color=top_products['units'],
         color_continuous_scale='Viridis',
-        text=top_products['purchase_count']
+        text=top_products['units']
     )
     
     fig.update_traces(texttemplate='%{text}', textposition='outside')
@@ -55,19 +54,19 @@ def show_top_products_chart(interactions):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def show_category_revenue_chart(interactions):
+def show_category_revenue_chart(rollups):
     """Muestra gráfico de ingresos por categoría"""
     st.markdown("#### 💰 Ingresos por Categoría")
     
-    category_revenue = interactions.groupby('category')['total_spent'].sum().sort_values(ascending=False)
+    category_revenue = rollups.category_revenue()
     
     fig = px.bar(
-        x=category_revenue.index,
-        y=category_revenue.values,
+        x=category_revenue['category'],
+        y=category_revenue['revenue'],
         labels={'x': 'Categoría', 'y': 'Ingresos ($)'},
-        color=category_revenue.values,
+        color=category_revenue['revenue'],
         color_continuous_scale='Blues',
-        text=category_revenue.values
+        text=category_revenue['revenue']
     )
     
     fig.update_traces(texttemplate='$%{text:,.0f}', textposition='outside')
@@ -81,25 +80,18 @@ def show_category_revenue_chart(interactions):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def show_sales_timeline(interactions):
+def show_sales_timeline(rollups):
     """Muestra evolución de ventas en el tiempo"""
     st.markdown("#### 📈 Evolución de Ventas Mensuales")
     
-    interactions['purchase_date'] = pd.to_datetime(interactions['purchase_date'])
-    
-    monthly_sales = interactions.groupby(
-        interactions['purchase_date'].dt.to_period('M')
-    ).agg({
-        'total_spent': 'sum',
-        'product_id': 'count'
-    })
+    monthly_sales = rollups.monthly_sales()
     
     fig = go.Figure()
     
     # Línea de ingresos
     fig.add_trace(go.Scatter(
-        x=monthly_sales.index.astype(str),
-        y=monthly_sales['total_spent'],
+        x=monthly_sales['month'],
+        y=monthly_sales['revenue'],
         mode='lines+markers',
         name='Ingresos ($)',
         line=dict(color=THEME_COLORS['primary'], width=3),
@@ -109,8 +101,8 @@ def show_sales_timeline(interactions):
     
     # Línea de transacciones
     fig.add_trace(go.Scatter(
-        x=monthly_sales.index.astype(str),
-        y=monthly_sales['product_id'],
+        x=monthly_sales['month'],
+        y=monthly_sales['transactions'],
         mode='lines+markers',
         name='Transacciones',
         line=dict(color=THEME_COLORS['success'], width=3),
@@ -131,22 +123,16 @@ def show_sales_timeline(interactions):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def show_user_activity_chart(user_stats):
+def show_user_activity_chart(rollups):
     """Muestra distribución de actividad de usuarios"""
     st.markdown("#### 👥 Distribución de Actividad de Usuarios")
     
-    # Categorizar usuarios por número de compras
-    user_stats['activity_level'] = pd.cut(
-        user_stats['num_interactions'],
-        bins=[0, 5, 10, 20, float('inf')],
-        labels=['Bajo (1-5)', 'Medio (6-10)', 'Alto (11-20)', 'Muy Alto (20+)']
-    )
-    
-    activity_dist = user_stats['activity_level'].value_counts()
+    # Usuarios por nivel de actividad (número de compras)
+    activity_dist = rollups.activity_distribution()
     
     fig = px.pie(
-        values=activity_dist.values,
-        names=activity_dist.index,
+        values=activity_dist['users'],
+        names=activity_dist['label'],
         hole=0.4,
         color_discrete_sequence=px.colors.sequential.Viridis
     )
@@ -165,21 +151,19 @@ def show_user_activity_chart(user_stats):
     
     st.plotly_chart(fig, use_container_width=True)
 
-def show_global_dashboard(interactions, products, user_stats):
+def show_global_dashboard(products):
     """
     Vista completa del dashboard global
     
     Args:
-        interactions: DataFrame con transacciones
         products: DataFrame con productos
-        user_stats: DataFrame con estadísticas de usuarios
     """
     st.markdown("### 🌍 Análisis Global del Sistema")
     
-    user_ids = sorted(interactions['user_id'].unique())
+    rollups = get_dashboard_rollups()
     
     # Métricas principales
-    show_global_metrics(interactions, products, user_ids)
+    show_global_metrics(rollups, products)
     
     st.markdown("---")
     
@@ -187,9 +171,9 @@ def show_global_dashboard(interactions, products, user_stats):
     col1, col2 = st.columns(2)
     
     with col1:
-        show_top_products_chart(interactions)
-        show_user_activity_chart(user_stats)
+        show_top_products_chart(rollups)
+        show_user_activity_chart(rollups)
     
     with col2:
-        show_category_revenue_chart(interactions)
-        show_sales_timeline(interactions)
\ No newline at end of file
+        show_category_revenue_chart(rollups)
+        show_sales_timeline(rollups)
\ No newline at end of file
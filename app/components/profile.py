@@ -6,6 +6,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from src.utils import format_currency
+from src.data_store import epoch_months, month_labels
 from config.settings import THEME_COLORS
 
 def display_user_stats_cards(user_info):
@@ -41,6 +42,7 @@ def display_category_chart(user_purchases):
     st.markdown("#### 🏷️ Tus Categorías Favoritas")
     
     category_counts = user_purchases['category'].value_counts()
+    category_counts = category_counts[category_counts > 0]
     
     fig = px.bar(
         x=category_counts.values,
@@ -66,7 +68,7 @@ def display_spending_pie(user_purchases):
     """Muestra gráfico circular de gasto por categoría"""
     st.markdown("#### 💰 Distribución de Gastos")
     
-    category_spending = user_purchases.groupby('category')['total_spent'].sum()
+    category_spending = user_purchases.groupby('category', observed=True)['total_spent'].sum()
     
     fig = px.pie(
         values=category_spending.values,
@@ -119,13 +121,12 @@ def display_timeline_chart(user_purchases):
     """Muestra evolución temporal de compras"""
     st.markdown("#### 📅 Evolución de Compras en el Tiempo")
     
-    user_purchases['purchase_date'] = pd.to_datetime(user_purchases['purchase_date'])
-    monthly_purchases = user_purchases.groupby(
-        user_purchases['purchase_date'].dt.to_period('M')
-    ).size()
+    # El historial del usuario ya está en memoria: mes desde epoch_day, sin
+    # parsear fechas ni recorrer las particiones de todo el dataset
+    monthly_purchases = pd.Series(epoch_months(user_purchases['epoch_day'])).value_counts().sort_index()
     
     fig = px.line(
-        x=monthly_purchases.index.astype(str),
+        x=month_labels(monthly_purchases.index),
         y=monthly_purchases.values,
         labels={'x': 'Mes', 'y': 'Número de compras'},
         markers=True
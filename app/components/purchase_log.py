@@ -0,0 +1,446 @@
+"""
+Diario de compras de solo anexado
+Las compras nuevas se agregan al final del CSV activo (fsync por lotes) y
+el diario se rota a segmentos Parquet ordenados por usuario. Un índice por
+usuario evita recorrer el historial completo en cada consulta.
+"""
+import csv
+import io
+import os
+import re
+import glob
+import atexit
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se coordinan los hilos del proceso
+    fcntl = None
+
+PURCHASE_COLUMNS = [
+    'user_id', 'product_id', 'product_name', 'category',
+    'price', 'quantity', 'total', 'timestamp'
+]
+
+SEGMENT_PATTERN = re.compile(r'segment_(\d+)\.parquet$')
+
+
+class PurchaseJournal:
+    """
+    Diario de compras con índice por usuario
+
+    - Diario activo: CSV al que solo se anexan líneas. Se guarda el offset
+      en bytes de cada línea por usuario, así que leer las compras de un
+      usuario cuesta O(compras del usuario).
+    - Segmentos: al rotar, el diario se escribe como Parquet ordenado por
+      user_id; el índice guarda el rango de filas de cada usuario y los
+      segmentos se leen con memoria mapeada.
+
+    Varios procesos comparten el diario a través de un archivo de bloqueo
+    (fcntl): anexar y rotar toman el bloqueo exclusivo y las lecturas el
+    compartido. Al rotar, el diario activo se renombra (no se trunca) y
+    el segmento recibe el siguiente número de secuencia bajo el bloqueo.
+    Si otro proceso anexó o rotó, el índice se pone al día comparando el
+    inodo y el tamaño del archivo y la lista de segmentos antes de leer.
+    """
+
+    def __init__(self, journal_path, segments_dir, fsync_every=32,
+                 fsync_interval=1.0, rotate_rows=100_000):
+        """
+        Args:
+            journal_path: Ruta del CSV activo
+            segments_dir: Carpeta de segmentos Parquet
+            fsync_every: Compras anexadas entre fsync
+            fsync_interval: Segundos máximos entre fsync
+            rotate_rows: Filas del diario activo que disparan una rotación
+        """
+        self.journal_path = journal_path
+        self.segments_dir = segments_dir
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.rotate_rows = rotate_rows
+
+        self.lock_path = f'{journal_path}.lock'
+        self.rotating_path = f'{journal_path}.rotating'
+
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._file = None
+        self._pending = 0
+        self._sync_timer = None
+
+        self._journal_offsets = {}
+        self._row_offsets = []
+        self._journal_inode = None
+        self._journal_size = 0
+        self._last_segment = 0
+        self._segments = {}
+        self._segment_ranges = {}
+
+        os.makedirs(os.path.dirname(journal_path) or '.', exist_ok=True)
+        os.makedirs(segments_dir, exist_ok=True)
+        with self._file_lock(exclusive=True):
+            # Rotación interrumpida: sus filas todavía no están en un segmento
+            if os.path.exists(self.rotating_path):
+                self._write_segment(self.rotating_path)
+            if not os.path.exists(journal_path):
+                self._write_header()
+
+        atexit.register(self.close)
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """Bloqueo entre procesos (y entre hilos) sobre el archivo .lock"""
+        with self._lock:
+            # Reentrante: rotate() se llama desde append_many con el bloqueo tomado
+            if fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def _write_header(self):
+        with open(self.journal_path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f, lineterminator='\n').writerow(PURCHASE_COLUMNS)
+
+    def _open_journal(self):
+        """Abre el diario activo para anexar, reabriéndolo si otro proceso lo rotó"""
+        if self._file is not None and os.fstat(self._file.fileno()).st_ino != os.stat(self.journal_path).st_ino:
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self._file = open(self.journal_path, 'a', newline='', encoding='utf-8')
+        return self._file
+
+    def append(self, record):
+        """
+        Anexa una compra al diario
+
+        Args:
+            record: Diccionario con las columnas de PURCHASE_COLUMNS
+
+        Returns:
+            Posiciones del diario (antes, después) de la compra
+        """
+        return self.append_many([record])
+
+    def append_many(self, records):
+        """
+        Anexa varias compras con una sola escritura
+
+        Las posiciones devueltas son las de read_since: quien ya leyó hasta
+        la primera puede avanzar a la segunda con estas compras, sin releer
+        el diario.
+
+        Args:
+            records: Lista de diccionarios con las columnas de PURCHASE_COLUMNS
+
+        Returns:
+            Posiciones del diario (antes, después) de las compras
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for record in records:
+            writer.writerow([record[column] for column in PURCHASE_COLUMNS])
+
+        with self._file_lock(exclusive=True):
+            journal = self._open_journal()
+            journal.write(buffer.getvalue())
+            journal.flush()
+            self._pending += len(records)
+
+            if self._pending >= self.fsync_every:
+                self.sync()
+            elif self._sync_timer is None:
+                # Un diario que deja de recibir compras también llega a disco
+                self._sync_timer = threading.Timer(self.fsync_interval, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+            # Con el bloqueo exclusivo, las últimas filas del diario son estas compras
+            self._catch_up()
+            start = (self._last_segment, len(self._row_offsets) - len(records))
+            if len(self._row_offsets) >= self.rotate_rows:
+                self.rotate()
+
+            return start, (self._last_segment, len(self._row_offsets))
+
+    def sync(self):
+        """Fuerza a disco las compras pendientes"""
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._file is not None and self._pending:
+                os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        """Fuerza a disco lo pendiente y cierra el diario activo"""
+        with self._lock:
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def rotate(self):
+        """
+        Mueve el diario activo a un nuevo segmento Parquet ordenado por usuario
+
+        Bajo el bloqueo exclusivo el diario se renombra a .rotating y se
+        crea uno nuevo vacío; si el proceso muere antes de escribir el
+        segmento, el próximo PurchaseJournal lo termina.
+
+        Returns:
+            Ruta del segmento creado o None si el diario estaba vacío
+        """
+        with self._file_lock(exclusive=True):
+            self.close()
+            if os.path.exists(self.rotating_path):
+                self._write_segment(self.rotating_path)
+
+            os.replace(self.journal_path, self.rotating_path)
+            self._write_header()
+            path = self._write_segment(self.rotating_path)
+
+            self._catch_up()
+            return path
+
+    def _write_segment(self, source):
+        """
+        Escribe las filas de un diario renombrado como el siguiente segmento
+
+        Debe llamarse con el bloqueo exclusivo: el número de secuencia es el
+        mayor existente más uno, así dos procesos nunca eligen el mismo.
+
+        Returns:
+            Ruta del segmento o None si no había filas
+        """
+        df = pd.read_csv(source)
+        path = None
+
+        if len(df) > 0:
+            # journal_row conserva el orden de anexado para read_since
+            df['journal_row'] = np.arange(len(df), dtype=np.int64)
+            df = df.sort_values('user_id', kind='stable').reset_index(drop=True)
+            segment_id = max(map(self._segment_id, self._list_segments()), default=0) + 1
+            path = os.path.join(self.segments_dir, f'segment_{segment_id:05d}.parquet')
+            tmp_path = f'{path}.tmp'
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pq.ParquetWriter(tmp_path, table.schema) as writer:
+                writer.write_table(table)
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+        os.remove(source)
+        return path
+
+    # ------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _segment_id(path):
+        return int(SEGMENT_PATTERN.search(path).group(1))
+
+    def _list_segments(self):
+        return sorted(glob.glob(os.path.join(self.segments_dir, 'segment_*.parquet')))
+
+    def _reset_journal_index(self):
+        self._journal_offsets = {}
+        self._row_offsets = []
+        self._journal_inode = None
+        self._journal_size = 0
+
+    def _index_segment(self, path):
+        """Guarda el rango de filas de cada usuario dentro de un segmento ordenado"""
+        table = pq.read_table(path, memory_map=True)
+        self._segments[path] = table
+
+        user_ids = table.column('user_id').to_numpy()
+        if len(user_ids) == 0:
+            return
+
+        starts = np.concatenate(([0], np.flatnonzero(user_ids[1:] != user_ids[:-1]) + 1))
+        ends = np.append(starts[1:], len(user_ids))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            self._segment_ranges.setdefault(int(user_ids[start]), []).append((path, start, end))
+
+    def _catch_up(self):
+        """Indexa segmentos nuevos y líneas anexadas desde la última lectura"""
+        segments = self._list_segments()
+        with open(self.journal_path, 'rb') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            if set(segments) != set(self._segments) or inode != self._journal_inode:
+                # Diario rotado (por este u otro proceso): reconstruir índice completo
+                self._segments = {}
+                self._segment_ranges = {}
+                self._reset_journal_index()
+                for path in segments:
+                    self._index_segment(path)
+                self._last_segment = max(map(self._segment_id, segments), default=0)
+                self._journal_inode = inode
+
+            f.seek(self._journal_size)
+            data = f.read()
+
+        offset = self._journal_size
+        if offset == 0:
+            # Saltar cabecera
+            header_end = data.find(b'\n')
+            if header_end < 0:
+                return
+            offset = header_end + 1
+            data = data[offset:]
+
+        position = 0
+        while True:
+            line_end = data.find(b'\n', position)
+            if line_end < 0:
+                break
+            line = data[position:line_end]
+            if line.strip():
+                user_id = int(line.split(b',', 1)[0])
+                self._journal_offsets.setdefault(user_id, []).append(offset + position)
+                self._row_offsets.append(offset + position)
+            position = line_end + 1
+
+        self._journal_size = offset + position
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def get_user(self, user_id):
+        """
+        Obtiene las compras de un usuario sin recorrer el historial completo
+
+        Args:
+            user_id: ID del usuario
+
+        Returns:
+            DataFrame con las columnas de PURCHASE_COLUMNS
+        """
+        with self._file_lock(exclusive=False):
+            if self._file is not None:
+                self._file.flush()
+            self._catch_up()
+
+            frames = [
+                self._segments[path].slice(start, end - start).select(PURCHASE_COLUMNS).to_pandas()
+                for path, start, end in self._segment_ranges.get(user_id, [])
+            ]
+
+            offsets = self._journal_offsets.get(user_id, [])
+            if offsets:
+                with open(self.journal_path, 'rb') as f:
+                    lines = []
+                    for offset in offsets:
+                        f.seek(offset)
+                        lines.append(f.readline().decode('utf-8'))
+                frames.append(pd.read_csv(io.StringIO(''.join(lines)), names=PURCHASE_COLUMNS))
+
+        if not frames:
+            return pd.DataFrame(columns=PURCHASE_COLUMNS)
+
+        return pd.concat(frames, ignore_index=True)
+
+    def read_all(self, columns=None):
+        """
+        Lee todas las compras (segmentos y diario activo)
+
+        Args:
+            columns: Columnas a leer (por defecto todas)
+
+        Returns:
+            DataFrame con el historial completo
+        """
+        columns = columns or PURCHASE_COLUMNS
+        with self._file_lock(exclusive=False):
+            self.sync()
+            frames = [pq.read_table(path, columns=columns).to_pandas() for path in self._list_segments()]
+            frames.append(pd.read_csv(self.journal_path, usecols=columns))
+
+        return pd.concat(frames, ignore_index=True)
+
+    def read_since(self, position=None, columns=None):
+        """
+        Lee las compras anexadas después de una posición del diario
+
+        La posición es (último segmento incluido, filas leídas del diario
+        que se convertirá en el segmento siguiente). Solo avanza al anexar,
+        no depende del reloj, así que sirve de checkpoint exacto: ninguna
+        compra se lee dos veces ni se salta.
+
+        Args:
+            position: Posición devuelta por una llamada anterior (None: desde el inicio)
+            columns: Columnas a leer (por defecto todas)
+
+        Returns:
+            (DataFrame con las compras nuevas, posición actual)
+        """
+        columns = columns or PURCHASE_COLUMNS
+        last_segment, journal_rows = position or (0, 0)
+        frames = []
+
+        with self._file_lock(exclusive=True):
+            # Una rotación interrumpida se termina antes para numerar bien los segmentos
+            if os.path.exists(self.rotating_path):
+                self._write_segment(self.rotating_path)
+            # Basta con que las filas estén en el archivo: el fsync queda para
+            # el lote de append_many (leer no exige durabilidad)
+            if self._file is not None:
+                self._file.flush()
+
+            segment_id = 0
+            for path in self._list_segments():
+                segment_id = self._segment_id(path)
+                if segment_id <= last_segment:
+                    continue
+                # Los segmentos rotados antes de existir journal_row no la tienen;
+                # ningún checkpoint quedó a mitad de ellos, se leen completos
+                has_rows = 'journal_row' in pq.read_schema(path).names
+                table = pq.read_table(path, columns=columns + (['journal_row'] if has_rows else []))
+                if segment_id == last_segment + 1:
+                    # Diario rotado después del checkpoint: saltar las filas ya leídas
+                    rows = table['journal_row'] if has_rows else pa.array(np.arange(table.num_rows))
+                    table = table.filter(pc.greater_equal(rows, journal_rows))
+                frames.append(table.select(columns).to_pandas())
+
+            self._catch_up()
+            current = (segment_id, len(self._row_offsets))
+            if segment_id != last_segment:
+                frames.append(pd.read_csv(self.journal_path, usecols=columns))
+            elif journal_rows < len(self._row_offsets):
+                # Sin rotación desde el checkpoint: leer solo desde la primera fila nueva
+                with open(self.journal_path, 'rb') as f:
+                    f.seek(self._row_offsets[journal_rows])
+                    tail = f.read(self._journal_size - self._row_offsets[journal_rows])
+                frames.append(pd.read_csv(io.BytesIO(tail), names=PURCHASE_COLUMNS, usecols=columns))
+
+        if not frames:
+            return pd.DataFrame(columns=columns), current
+
+        return pd.concat(frames, ignore_index=True), current
@@ -2,23 +2,153 @@
 Gestión de compras y historial
 """
 import pandas as pd
-import os
+import threading
 from datetime import datetime
-from app.components.balance import deduct_balance
+from app.components.balance import deduct_balance, add_balance
+from app.components.purchase_log import PurchaseJournal
+from app.components.rollups import apply_purchases_to_rollups
+from src.purchase_index import PurchasedItemIndex
+from src.data_store import load_table, DATA_CACHE
+from src.recommendation_cache import RECOMMENDATION_CACHE
 
 PURCHASES_FILE = 'data/user_purchases.csv'
+PURCHASE_SEGMENTS_DIR = 'data/purchase_segments'
+
+# Diario de compras compartido por todas las sesiones
+_journal = None
+_journal_lock = threading.Lock()
+
+# Índice de productos comprados compartido por todas las sesiones
+_purchased_index = None
+_purchased_index_lock = threading.Lock()
 
 
 def initialize_purchases_file():
     """Crea el archivo de compras si no existe"""
-    os.makedirs('data', exist_ok=True)
+    get_purchase_journal()
+
+
+def get_purchase_journal():
+    """Obtiene el diario de compras de solo anexado"""
+    global _journal
+    
+    with _journal_lock:
+        if _journal is None:
+            _journal = PurchaseJournal(PURCHASES_FILE, PURCHASE_SEGMENTS_DIR)
+    
+    return _journal
+
+
+def load_purchases(columns=None):
+    """
+    Carga todas las compras registradas desde la caché de datos
+    
+    Args:
+        columns: Columnas a cargar (por defecto todas)
+    
+    Returns:
+        DataFrame con el historial de compras (copia propia del llamador)
+    """
+    journal = get_purchase_journal()
+    key = tuple(columns) if columns is not None else None
+    
+    return DATA_CACHE.get(
+        'purchases', key, [PURCHASES_FILE, PURCHASE_SEGMENTS_DIR],
+        lambda: journal.read_all(columns)
+    )
+
+
+def _append_purchases(records):
+    """
+    Anexa compras al diario (el único paso que puede hacer fallar la compra)
+    
+    Args:
+        records: Lista de diccionarios con las columnas del diario
     
-    if not os.path.exists(PURCHASES_FILE):
-        df = pd.DataFrame(columns=[
-            'user_id', 'product_id', 'product_name', 'category', 
-            'price', 'quantity', 'total', 'timestamp'
-        ])
-        df.to_csv(PURCHASES_FILE, index=False)
+    Returns:
+        (versión de los archivos de compras antes de anexar,
+         posiciones del diario antes y después de las compras)
+    """
+    previous_version = DATA_CACHE.file_version([PURCHASES_FILE, PURCHASE_SEGMENTS_DIR])
+    span = get_purchase_journal().append_many(records)
+    return previous_version, span
+
+
+def _apply_purchases(records, previous_version, span=None):
+    """
+    Actualiza caché, índice, rankings y agregados con compras ya anexadas
+    
+    La compra ya quedó en el diario: un fallo aquí no la anula. Si no se
+    pudo parchear, la caché y el índice se descartan y se reconstruyen
+    desde disco en la siguiente lectura.
+    
+    Args:
+        records: Lista de diccionarios con las columnas del diario
+        previous_version: Versión devuelta por _append_purchases
+        span: Posiciones del diario devueltas por _append_purchases
+    """
+    global _purchased_index
+    
+    try:
+        new_rows = pd.DataFrame(records)
+        DATA_CACHE.patch(
+            'purchases', [PURCHASES_FILE, PURCHASE_SEGMENTS_DIR], previous_version,
+            lambda df: pd.concat([df, new_rows[df.columns]], ignore_index=True)
+        )
+        
+        if _purchased_index is not None:
+            for record in records:
+                _purchased_index.add(record['user_id'], record['product_id'])
+    except Exception as e:
+        print(f"Error al actualizar caché e índice de compras: {e}")
+        DATA_CACHE.invalidate('purchases')
+        with _purchased_index_lock:
+            _purchased_index = None
+    
+    # Los rankings guardados del comprador aún incluyen lo que acaba de comprar
+    try:
+        for user_id in {record['user_id'] for record in records}:
+            RECOMMENDATION_CACHE.invalidate_user(user_id)
+    except Exception as e:
+        print(f"Error al invalidar recomendaciones guardadas: {e}")
+    
+    # Agregados del dashboard
+    try:
+        apply_purchases_to_rollups(records, span)
+    except Exception as e:
+        print(f"Error al actualizar agregados del dashboard: {e}")
+
+
+def _record_purchases(records):
+    """
+    Anexa compras al diario y actualiza caché e índice sin releer el historial
+    
+    Args:
+        records: Lista de diccionarios con las columnas del diario
+    """
+    _apply_purchases(records, *_append_purchases(records))
+
+
+def get_purchased_index():
+    """
+    Obtiene el índice usuario -> productos comprados
+    
+    Se construye una sola vez desde interactions.csv y el archivo de compras;
+    save_purchase lo actualiza de forma incremental.
+    """
+    global _purchased_index
+    
+    with _purchased_index_lock:
+        if _purchased_index is None:
+            initialize_purchases_file()
+            columns = ['user_id', 'product_id']
+            purchases = pd.concat([
+                load_table('interactions', columns=columns),
+                load_purchases(columns)
+            ], ignore_index=True)
+            _purchased_index = PurchasedItemIndex.from_dataframe(purchases)
+    
+    return _purchased_index
 
 
 def save_purchase(user_id, product_id, product_name, category, price, quantity=1):
@@ -47,21 +177,17 @@ def save_purchase(user_id, product_id, product_name, category, price, quantity=1
         return False, balance_message
     
     try:
-        # Registrar la compra
-        new_purchase = pd.DataFrame({
-            'user_id': [user_id],
-            'product_id': [product_id],
-            'product_name': [product_name],
-            'category': [category],
-            'price': [price],
-            'quantity': [quantity],
-            'total': [total],
-            'timestamp': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-        })
-        
-        df = pd.read_csv(PURCHASES_FILE)
-        df = pd.concat([df, new_purchase], ignore_index=True)
-        df.to_csv(PURCHASES_FILE, index=False)
+        # Registrar la compra (anexar al diario)
+        _record_purchases([{
+            'user_id': user_id,
+            'product_id': product_id,
+            'product_name': product_name,
+            'category': category,
+            'price': price,
+            'quantity': quantity,
+            'total': total,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }])
         
         return True, f"✅ Compra registrada. Saldo actual: ${new_balance:.2f}"
         
@@ -70,14 +196,68 @@ def save_purchase(user_id, product_id, product_name, category, price, quantity=1
         return False, f"❌ Error al registrar la compra: {str(e)}"
 
 
-def get_user_purchases(user_id):
-    """Obtiene el historial de compras de un usuario"""
+def save_purchases_batch(user_id, items):
+    """
+    Registra varias compras como una sola transacción
+    
+    Valida todos los items, descuenta el total una única vez y anexa todas
+    las líneas al diario en una sola escritura. Si el registro falla, el
+    saldo se reembolsa.
+    
+    Args:
+        user_id: ID del usuario
+        items: Lista de diccionarios con product_id, product_name, category,
+            price y quantity
+        
+    Returns:
+        tuple: (success, new_balance, message)
+    """
     initialize_purchases_file()
     
+    if len(items) == 0:
+        return False, None, "❌ No hay productos para comprar"
+    
+    for item in items:
+        if item['quantity'] <= 0 or item['price'] < 0:
+            return False, None, f"❌ Cantidad o precio inválido para '{item['product_name']}'"
+    
+    total = sum(item['price'] * item['quantity'] for item in items)
+    
+    # Un único débito por el total
+    success, new_balance, balance_message = deduct_balance(user_id, total)
+    
+    if not success:
+        return False, new_balance, balance_message
+    
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    records = [{
+        'user_id': user_id,
+        'product_id': item['product_id'],
+        'product_name': item['product_name'],
+        'category': item['category'],
+        'price': item['price'],
+        'quantity': item['quantity'],
+        'total': item['price'] * item['quantity'],
+        'timestamp': timestamp
+    } for item in items]
+    
+    # Solo un fallo al anexar al diario reembolsa: después la compra ya existe
+    try:
+        previous_version, span = _append_purchases(records)
+    except Exception as e:
+        print(f"Error al guardar compras: {e}")
+        _, new_balance = add_balance(user_id, total)
+        return False, new_balance, f"❌ Error al registrar la compra: {str(e)}"
+    
+    _apply_purchases(records, previous_version, span)
+    
+    return True, new_balance, f"✅ {len(items)} compra(s) registradas. Saldo actual: ${new_balance:.2f}"
+
+
+def get_user_purchases(user_id):
+    """Obtiene el historial de compras de un usuario"""
     try:
-        df = pd.read_csv(PURCHASES_FILE)
-        user_purchases = df[df['user_id'] == user_id]
-        return user_purchases
+        return get_purchase_journal().get_user(user_id)
     except Exception as e:
         print(f"Error al obtener compras: {e}")
         return pd.DataFrame()
@@ -0,0 +1,471 @@
+"""
+Agregados materializados del dashboard global
+Tablas de resumen por producto, categoría, mes y usuario en SQLite. Se
+construyen una vez recorriendo interactions (y el diario de compras) por
+bloques y después cada compra las actualiza, así el dashboard lee
+O(tamaño del resultado) sin importar el tamaño del historial.
+"""
+import os
+import json
+import sqlite3
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from src.data_store import iter_table_batches, monthly_totals, interactions_source_version
+from config.settings import DATA_CONFIG
+
+# Límite superior de cada nivel de actividad (compras por usuario)
+ACTIVITY_LIMITS = [5, 10, 20]
+ACTIVITY_LABELS = ['Bajo (1-5)', 'Medio (6-10)', 'Alto (11-20)', 'Muy Alto (20+)']
+
+# Los meses de interactions salen del dataset particionado (monthly_totals),
+# así los bloques no leen ni recortan purchase_date
+INTERACTION_COLUMNS = ['user_id', 'product_id', 'product_name', 'category',
+                       'purchase_count', 'total_spent']
+
+# Agregados compartidos por todas las sesiones
+_rollups = None
+_rollups_lock = threading.Lock()
+
+
+def activity_level(counts):
+    """Índice del nivel de actividad (ACTIVITY_LABELS) para cada número de compras"""
+    return np.searchsorted(ACTIVITY_LIMITS, counts, side='left')
+
+
+class DashboardRollups:
+    """
+    Agregados del dashboard en SQLite (modo WAL)
+
+    - rollup_products: unidades, ingresos y transacciones por producto
+    - rollup_categories: ingresos y transacciones por categoría
+    - rollup_months: ingresos y transacciones por mes (YYYY-MM)
+    - rollup_users: transacciones por usuario
+    - rollup_activity: usuarios por nivel de actividad
+    - rollup_totals: totales globales
+
+    rollup_meta guarda la posición del diario de compras hasta la que
+    llegan los agregados (PurchaseJournal.read_since). La reconstrucción
+    la fija y cada actualización incremental aplica solo las compras
+    posteriores y la avanza en la misma transacción BEGIN IMMEDIATE, así
+    ni varios procesos ni una reconstrucción concurrente cuentan una
+    compra dos veces o la pierden.
+    """
+
+    def __init__(self, db_path):
+        """
+        Abre (o crea) la base de datos de agregados
+
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rollup_products (
+                product_id INTEGER PRIMARY KEY,
+                product_name TEXT NOT NULL,
+                units INTEGER NOT NULL,
+                revenue REAL NOT NULL,
+                transactions INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_rollup_products_units ON rollup_products (units DESC);
+            CREATE TABLE IF NOT EXISTS rollup_categories (
+                category TEXT PRIMARY KEY,
+                revenue REAL NOT NULL,
+                transactions INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollup_months (
+                month TEXT PRIMARY KEY,
+                revenue REAL NOT NULL,
+                transactions INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollup_users (
+                user_id INTEGER PRIMARY KEY,
+                transactions INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollup_activity (
+                level INTEGER PRIMARY KEY,
+                users INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollup_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                users INTEGER NOT NULL,
+                transactions INTEGER NOT NULL,
+                revenue REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rollup_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def _connection(self):
+        """Conexión propia de cada hilo (y de cada proceso)"""
+        conn = getattr(self._local, 'conn', None)
+        pid = getattr(self._local, 'pid', None)
+
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return conn
+
+    def _built_version(self, conn):
+        row = conn.execute("SELECT value FROM rollup_meta WHERE key = 'source_version'").fetchone()
+        return row[0] if row is not None else None
+
+    def _journal_position(self, conn):
+        """Posición del diario incluida en los agregados (None: sin construir)"""
+        row = conn.execute("SELECT value FROM rollup_meta WHERE key = 'journal_position'").fetchone()
+        return tuple(json.loads(row[0])) if row is not None else None
+
+    def ensure_built(self):
+        """Reconstruye los agregados si no existen o si interactions cambió"""
+        conn = self._connection()
+        if self._built_version(conn) != interactions_source_version() or self._journal_position(conn) is None:
+            self.rebuild()
+
+    # ------------------------------------------------------------------
+    # Construcción completa
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _partial_rollups(df):
+        """Agregados de un bloque (con purchase_date, además, agrega por mes)"""
+        partial = {
+            'products': df.groupby('product_id', observed=True).agg(
+                product_name=('product_name', 'first'),
+                units=('purchase_count', 'sum'),
+                revenue=('total_spent', 'sum'),
+                transactions=('total_spent', 'size')
+            ),
+            'categories': df.groupby('category', observed=True)['total_spent'].agg(['sum', 'size']),
+            'users': df.groupby('user_id').size()
+        }
+        if 'purchase_date' in df:
+            month = df['purchase_date'].astype(str).str.slice(0, 7)
+            partial['months'] = df.groupby(month)['total_spent'].agg(['sum', 'size'])
+        return partial
+
+    @staticmethod
+    def _purchase_batches():
+        """
+        Compras del diario con los nombres de columna de interactions
+
+        Returns:
+            (lista de bloques, posición del diario leída)
+        """
+        from app.components.purchases import get_purchase_journal
+
+        purchases, position = get_purchase_journal().read_since(None)
+        if len(purchases) == 0:
+            return [], position
+
+        return [pd.DataFrame({
+            'user_id': purchases['user_id'],
+            'product_id': purchases['product_id'],
+            'product_name': purchases['product_name'],
+            'category': purchases['category'],
+            'purchase_count': purchases['quantity'],
+            'total_spent': purchases['total'],
+            'purchase_date': purchases['timestamp']
+        })], position
+
+    def rebuild(self, batch_rows=1_000_000):
+        """
+        Recalcula todos los agregados recorriendo interactions por bloques
+
+        Args:
+            batch_rows: Filas por bloque
+
+        Returns:
+            Número de filas procesadas
+        """
+        version = interactions_source_version()
+        timeline = monthly_totals()
+        partials = {'products': [], 'categories': [], 'users': [], 'months': [pd.DataFrame(
+            {'sum': timeline['total_spent'].to_numpy(), 'size': timeline['purchases'].to_numpy()},
+            index=timeline['month']
+        )]}
+        n_rows = 0
+
+        purchase_batches, position = self._purchase_batches()
+        batches = itertools.chain(
+            iter_table_batches('interactions', INTERACTION_COLUMNS, batch_rows),
+            purchase_batches
+        )
+        for batch in batches:
+            for name, partial in self._partial_rollups(batch).items():
+                partials[name].append(partial)
+            n_rows += len(batch)
+
+        if n_rows == 0:
+            return 0
+
+        def combine(name, **agg):
+            combined = pd.concat(partials[name])
+            return combined.groupby(level=0, observed=True).agg(agg) if agg else combined.groupby(level=0).sum()
+
+        products = combine('products', product_name='first', units='sum', revenue='sum', transactions='sum')
+        categories = combine('categories')
+        months = combine('months')
+        users = combine('users')
+        activity = np.bincount(activity_level(users.to_numpy()), minlength=len(ACTIVITY_LABELS))
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in ('rollup_products', 'rollup_categories', 'rollup_months',
+                          'rollup_users', 'rollup_activity', 'rollup_totals'):
+                conn.execute(f"DELETE FROM {table}")
+
+            conn.executemany(
+                "INSERT INTO rollup_products VALUES (?, ?, ?, ?, ?)",
+                zip(products.index.astype(int).tolist(), products['product_name'].astype(str).tolist(),
+                    products['units'].astype(int).tolist(), products['revenue'].tolist(),
+                    products['transactions'].astype(int).tolist())
+            )
+            conn.executemany(
+                "INSERT INTO rollup_categories VALUES (?, ?, ?)",
+                zip(categories.index.astype(str).tolist(), categories['sum'].tolist(),
+                    categories['size'].astype(int).tolist())
+            )
+            conn.executemany(
+                "INSERT INTO rollup_months VALUES (?, ?, ?)",
+                zip(months.index.astype(str).tolist(), months['sum'].tolist(),
+                    months['size'].astype(int).tolist())
+            )
+            conn.executemany(
+                "INSERT INTO rollup_users VALUES (?, ?)",
+                zip(users.index.astype(int).tolist(), users.astype(int).tolist())
+            )
+            conn.executemany(
+                "INSERT INTO rollup_activity VALUES (?, ?)",
+                enumerate(activity.astype(int).tolist())
+            )
+            conn.execute(
+                "INSERT INTO rollup_totals VALUES (1, ?, ?, ?)",
+                (len(users), int(users.sum()), float(products['revenue'].sum()))
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO rollup_meta VALUES ('source_version', ?)", (version,)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO rollup_meta VALUES ('journal_position', ?)",
+                (json.dumps(list(position)),)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return n_rows
+
+    # ------------------------------------------------------------------
+    # Actualización incremental
+    # ------------------------------------------------------------------
+
+    def apply_purchases(self, records=None, span=None):
+        """
+        Suma a los agregados las compras del diario posteriores a su posición
+
+        La posición se lee y se avanza dentro de la misma transacción, así
+        las compras ya incluidas (por una reconstrucción o por otro
+        proceso) se saltan. No hace nada si los agregados aún no se
+        construyeron: la primera construcción ya incluye el diario.
+
+        Si los agregados están justo en la posición anterior a las compras
+        recién anexadas (span), se aplican esos registros sin releer el
+        diario; si no (otro proceso anexó en medio), se lee desde la posición.
+
+        Args:
+            records: Compras recién anexadas (opcional)
+            span: Posiciones (antes, después) devueltas por append_many
+
+        Returns:
+            Número de compras aplicadas
+        """
+        from app.components.purchases import get_purchase_journal
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            position = self._journal_position(conn)
+            if position is None:
+                conn.execute("ROLLBACK")
+                return 0
+
+            if span is not None and position == tuple(span[0]):
+                purchases, position = records, span[1]
+            else:
+                purchases, position = get_purchase_journal().read_since(position)
+                purchases = purchases.to_dict('records')
+            for record in purchases:
+                self._apply_one(conn, record)
+            conn.execute(
+                "UPDATE rollup_meta SET value = ? WHERE key = 'journal_position'",
+                (json.dumps(list(position)),)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return len(purchases)
+
+    @staticmethod
+    def _apply_one(conn, record):
+        """Actualiza cada agregado con una compra (requiere transacción abierta)"""
+        units = int(record['quantity'])
+        revenue = float(record['total'])
+
+        conn.execute(
+            """
+            INSERT INTO rollup_products VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT(product_id) DO UPDATE SET
+                units = units + excluded.units,
+                revenue = revenue + excluded.revenue,
+                transactions = transactions + 1
+            """,
+            (int(record['product_id']), str(record['product_name']), units, revenue)
+        )
+        conn.execute(
+            """
+            INSERT INTO rollup_categories VALUES (?, ?, 1)
+            ON CONFLICT(category) DO UPDATE SET
+                revenue = revenue + excluded.revenue,
+                transactions = transactions + 1
+            """,
+            (str(record['category']), revenue)
+        )
+        conn.execute(
+            """
+            INSERT INTO rollup_months VALUES (?, ?, 1)
+            ON CONFLICT(month) DO UPDATE SET
+                revenue = revenue + excluded.revenue,
+                transactions = transactions + 1
+            """,
+            (str(record['timestamp'])[:7], revenue)
+        )
+
+        # Mover al usuario de nivel de actividad si su número de compras lo cruza
+        user_id = int(record['user_id'])
+        row = conn.execute("SELECT transactions FROM rollup_users WHERE user_id = ?", (user_id,)).fetchone()
+        previous = row[0] if row is not None else 0
+        conn.execute(
+            """
+            INSERT INTO rollup_users VALUES (?, 1)
+            ON CONFLICT(user_id) DO UPDATE SET transactions = transactions + 1
+            """,
+            (user_id,)
+        )
+
+        old_level, new_level = activity_level([previous, previous + 1]).tolist()
+        if previous == 0 or old_level != new_level:
+            conn.execute(
+                """
+                INSERT INTO rollup_activity VALUES (?, 1)
+                ON CONFLICT(level) DO UPDATE SET users = users + 1
+                """,
+                (new_level,)
+            )
+            if previous > 0:
+                conn.execute("UPDATE rollup_activity SET users = users - 1 WHERE level = ?", (old_level,))
+
+        conn.execute(
+            """
+            UPDATE rollup_totals SET
+                users = users + ?,
+                transactions = transactions + 1,
+                revenue = revenue + ?
+            WHERE id = 1
+            """,
+            (1 if previous == 0 else 0, revenue)
+        )
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def totals(self):
+        """Usuarios, transacciones e ingresos totales"""
+        row = self._connection().execute(
+            "SELECT users, transactions, revenue FROM rollup_totals WHERE id = 1"
+        ).fetchone()
+        users, transactions, revenue = row if row is not None else (0, 0, 0.0)
+        return {'users': users, 'transactions': transactions, 'revenue': revenue}
+
+    def _query(self, sql, columns, params=()):
+        rows = self._connection().execute(sql, params).fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def top_products(self, n=10):
+        """Productos con más unidades vendidas"""
+        return self._query(
+            "SELECT product_name, units, revenue FROM rollup_products ORDER BY units DESC LIMIT ?",
+            ['product_name', 'units', 'revenue'], (n,)
+        )
+
+    def category_revenue(self):
+        """Ingresos por categoría, de mayor a menor"""
+        return self._query(
+            "SELECT category, revenue FROM rollup_categories ORDER BY revenue DESC",
+            ['category', 'revenue']
+        )
+
+    def monthly_sales(self):
+        """Ingresos y transacciones por mes, en orden cronológico"""
+        return self._query(
+            "SELECT month, revenue, transactions FROM rollup_months ORDER BY month",
+            ['month', 'revenue', 'transactions']
+        )
+
+    def activity_distribution(self):
+        """Usuarios por nivel de actividad (solo niveles con usuarios)"""
+        df = self._query(
+            "SELECT level, users FROM rollup_activity WHERE users > 0 ORDER BY level",
+            ['level', 'users']
+        )
+        df['label'] = [ACTIVITY_LABELS[level] for level in df['level']]
+        return df
+
+
+def get_dashboard_rollups():
+    """Obtiene los agregados del dashboard, construyéndolos si hace falta"""
+    global _rollups
+
+    with _rollups_lock:
+        if _rollups is None:
+            _rollups = DashboardRollups(DATA_CONFIG['rollups_path'])
+        _rollups.ensure_built()
+
+    return _rollups
+
+
+def apply_purchases_to_rollups(records=None, span=None):
+    """
+    Aplica las compras nuevas del diario a los agregados si ya están construidos
+
+    No construye los agregados: eso ocurre al abrir el dashboard.
+
+    Args:
+        records: Compras recién anexadas (opcional)
+        span: Posiciones (antes, después) devueltas por append_many
+    """
+    global _rollups
+
+    with _rollups_lock:
+        if _rollups is None:
+            if not os.path.exists(DATA_CONFIG['rollups_path']):
+                return
+            _rollups = DashboardRollups(DATA_CONFIG['rollups_path'])
+
+    _rollups.apply_purchases(records, span)
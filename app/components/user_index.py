@@ -0,0 +1,121 @@
+"""
+Índice persistente de nombres de usuario para el login
+Mapea el nombre en minúsculas al user_id para que autenticar cueste una
+búsqueda en un diccionario en lugar de regenerar y recorrer todos los nombres.
+"""
+import os
+import threading
+import joblib
+import numpy as np
+from src.utils import generate_user_name_array
+from src.data_store import load_table, csv_path, parquet_path, DATA_CACHE
+
+
+class UserNameIndex:
+    """
+    Índice nombre (minúsculas) -> (user_id, nombre) guardado en disco
+
+    Varios usuarios pueden compartir nombre; como en la búsqueda lineal
+    original, el login resuelve siempre al menor user_id. Cuando la tabla
+    de interacciones cambia solo se generan los nombres de los usuarios
+    nuevos y se fusionan con el índice existente; si cambia la tabla de
+    nombres (user_names) el índice se reconstruye.
+    """
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: Archivo .pkl donde se guarda el índice
+        """
+        self.filepath = filepath
+        self.names = {}
+        self.user_ids = np.array([], dtype=np.int64)
+        self.source_version = None
+        self._lock = threading.Lock()
+
+        if os.path.exists(filepath):
+            state = joblib.load(filepath)
+            self.names = state['names']
+            self.user_ids = state['user_ids']
+            self.source_version = state['source_version']
+
+    def add_users(self, user_ids, reset=False):
+        """
+        Agrega al índice los usuarios que aún no están registrados
+
+        Args:
+            user_ids: IDs de usuario (pueden incluir ya conocidos)
+            reset: Descartar el índice actual y construirlo solo con user_ids
+                (el nuevo se arma aparte, los logins concurrentes no lo ven vacío)
+
+        Returns:
+            Número de usuarios nuevos agregados
+        """
+        known = np.array([], dtype=np.int64) if reset else self.user_ids
+        index = {} if reset else self.names
+        new_ids = np.setdiff1d(np.asarray(user_ids, dtype=np.int64), known)
+        if len(new_ids) == 0 and not reset:
+            return 0
+
+        # new_ids viene ordenado: la primera aparición de cada nombre es el menor ID
+        names, first = np.unique(generate_user_name_array(new_ids).astype(str), return_index=True)
+        for name, user_id in zip(names.tolist(), new_ids[first].tolist()):
+            key = name.lower()
+            current = index.get(key)
+            if current is None or user_id < current[0]:
+                index[key] = (user_id, name)
+
+        self.names = index
+        self.user_ids = np.union1d(known, new_ids)
+        return len(new_ids)
+
+    @staticmethod
+    def _source_paths():
+        """Archivos de los que depende el índice: interactions y la tabla de nombres"""
+        return [csv_path('interactions'), parquet_path('interactions'),
+                csv_path('user_names'), parquet_path('user_names')]
+
+    def refresh(self):
+        """
+        Pone el índice al día si interactions o la tabla de nombres cambiaron
+
+        Usuarios nuevos en interactions se fusionan; si cambió user_names,
+        los nombres de usuarios ya indexados pueden ser otros y el índice
+        se reconstruye completo.
+        """
+        paths = self._source_paths()
+        version = DATA_CACHE.file_version(paths)
+        if version == self.source_version:
+            return
+
+        with self._lock:
+            if version == self.source_version:
+                return
+
+            names_changed = self.source_version is None or tuple(self.source_version[2:]) != version[2:]
+            interactions = load_table('interactions', columns=['user_id'])
+            self.add_users(interactions['user_id'].unique(), reset=names_changed)
+            self.source_version = DATA_CACHE.file_version(paths)
+            self.save()
+
+    def save(self):
+        """Guarda el índice con reemplazo atómico"""
+        tmp_path = f'{self.filepath}.{os.getpid()}.tmp'
+        joblib.dump({
+            'names': self.names,
+            'user_ids': self.user_ids,
+            'source_version': self.source_version
+        }, tmp_path)
+        os.replace(tmp_path, self.filepath)
+
+    def lookup(self, username):
+        """
+        Busca un usuario por nombre sin distinguir mayúsculas
+
+        Args:
+            username: Nombre completo ingresado en el login
+
+        Returns:
+            (user_id, nombre) o None si no existe
+        """
+        return self.names.get(username.lower())
@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
-from src.model import ProductRecommendationANN
+from src.runtime import load_runtime
+from src.batch_recommend import load_batch_store, recommend_with_store
 from src.utils import generate_user_names, load_data
+from src.data_store import get_cache_stats, load_table
+from src.recommendation_cache import RECOMMENDATION_CACHE, get_recommendation_cache_stats
+from src.serving_client import RecommendationClient, ServiceUnavailableError
+from src.micro_batching import MicroBatchScheduler
 from app.components.auth import show_login
 from app.components.styles import get_custom_css
 from app.components.recommendations import (
@@ -13,7 +18,7 @@ from app.components.balance import get_user_balance, deduct_balance
 from app.components.profile import show_profile_view
 from app.components.history import show_purchase_history
 from app.components.balance import get_user_balance
-from app.components.purchases import save_purchase
+from app.components.purchases import save_purchase, get_purchased_index
 from app.components.dashboard import show_global_dashboard
 from app.components.cart import (
     add_to_cart,
@@ -21,7 +26,7 @@ from app.components.cart import (
     show_cart_badge,
     get_cart_count
 )
-from config.settings import APP_CONFIG, MODEL_CONFIG, GRADIENTS
+from config.settings import APP_CONFIG, MODEL_CONFIG, SERVING_CONFIG, BATCHING_CONFIG, RECOMMENDATION_CACHE_CONFIG, GRADIENTS
 
 # Configuración de la página
 st.set_page_config(
@@ -40,16 +45,109 @@ st.markdown(get_custom_css(), unsafe_allow_html=True)
 
 @st.cache_resource
 def load_model():
-    """Carga el modelo de recomendación"""
+    """Carga el modelo de recomendación exportado (runtime NumPy, sin TensorFlow)"""
     try:
-        model = ProductRecommendationANN(n_users=1, n_products=1)
-        model.load_model(MODEL_CONFIG['model_path'])
+        model = load_runtime(MODEL_CONFIG['model_path'])
+        if model.popularity is None:
+            # Modelo guardado antes de persistir el respaldo por popularidad
+            model.build_popularity(load_table('interactions', columns=['product_id', 'category', 'rating']))
         return model
     except Exception as e:
         st.error(f"❌ Error al cargar modelo: {e}")
         st.info("💡 Ejecuta: `python scripts/train_model.py`")
         return None
 
+@st.cache_resource
+def load_recommendation_store():
+    """Abre las recomendaciones precalculadas por el job offline (si existen)"""
+    try:
+        return load_batch_store()
+    except Exception as e:
+        print(f"Error al abrir recomendaciones precalculadas: {e}")
+        return None
+
+@st.cache_resource
+def load_serving_client():
+    """Cliente del servicio HTTP de recomendaciones (si está habilitado)"""
+    return RecommendationClient() if SERVING_CONFIG['enabled'] else None
+
+@st.cache_resource
+def load_scheduler():
+    """Planificador de micro-lotes compartido por las sesiones (si está habilitado)"""
+    model = load_model()
+    if not BATCHING_CONFIG['enabled'] or model is None:
+        return None
+    return MicroBatchScheduler(model)
+
+def get_recommendations(model, user_id, products_df, category, top_n, purchased_ids, precomputed=False):
+    """
+    Recomendaciones con caché por usuario; los reruns sirven el ranking guardado
+
+    Args:
+        model: Modelo cargado en este proceso (respaldo)
+        user_id: ID del usuario
+        products_df: Catálogo ya filtrado por categoría
+        category: Categoría seleccionada (None = todas)
+        top_n: Número de recomendaciones
+        purchased_ids: product_ids a excluir
+        precomputed: Consultar primero el job offline
+
+    Returns:
+        DataFrame con las recomendaciones
+    """
+    if not RECOMMENDATION_CACHE_CONFIG['enabled']:
+        return compute_recommendations(model, user_id, products_df, category, top_n, purchased_ids, precomputed)
+    
+    variant = 'precomputed' if precomputed else 'live'
+    model_version = model.version if model is not None else None
+    
+    cached = RECOMMENDATION_CACHE.get(user_id, category, variant, model_version, top_n)
+    if cached is not None:
+        return cached
+    
+    # Calcular el ranking completo una vez; los top_n menores se recortan de él.
+    # El job offline solo guarda su top-N: pedirle más forzaría el scoring en vivo
+    depth = top_n if precomputed else max(top_n, RECOMMENDATION_CACHE_CONFIG['depth'])
+    ranked = compute_recommendations(model, user_id, products_df, category, depth, purchased_ids, precomputed)
+    RECOMMENDATION_CACHE.put(user_id, category, variant, model_version, ranked, depth)
+    
+    return ranked.head(top_n).copy()
+
+def compute_recommendations(model, user_id, products_df, category, top_n, purchased_ids, precomputed=False):
+    """
+    Recomendaciones desde el servicio HTTP o, si no está disponible, en local
+
+    Args: los mismos que get_recommendations
+
+    Returns:
+        DataFrame con las recomendaciones
+    """
+    client = load_serving_client()
+    if client is not None:
+        try:
+            return client.recommend(user_id, top_n, category, purchased_ids, precomputed)
+        except ServiceUnavailableError as e:
+            print(f"Servicio de recomendaciones no disponible, se usa el modelo local: {e}")
+
+    if precomputed:
+        return recommend_with_store(
+            model,
+            load_recommendation_store(),
+            user_id=user_id,
+            products_df=products_df,
+            top_n=top_n,
+            exclude_purchased=purchased_ids
+        )
+
+    # Sesiones concurrentes: el scoring se agrupa en un solo lote
+    scheduler = load_scheduler()
+    return (scheduler or model).recommend_products(
+        user_id=user_id,
+        products_df=products_df,
+        top_n=top_n,
+        exclude_purchased=purchased_ids
+    )
+
 def get_user_history(user_id, interactions, products):
     """Obtiene el historial de compras de un usuario"""
     user_purchases = interactions[interactions['user_id'] == user_id]
@@ -158,8 +256,7 @@ def show_client_view():
             )
         
         # Obtener productos ya comprados
-        user_purchases = get_user_history(user_id, interactions, products)
-        purchased_ids = user_purchases['product_id'].tolist() if len(user_purchases) > 0 else []
+        purchased_ids = get_purchased_index().get(user_id)
         
         # Filtrar por categoría
         if selected_category != 'Todas':
@@ -169,11 +266,13 @@ def show_client_view():
         
         # Generar recomendaciones
         with st.spinner('🤖 Generando recomendaciones personalizadas...'):
-            recommendations = model.recommend_products(
+            recommendations = get_recommendations(
+                model,
                 user_id=user_id,
                 products_df=products_filtered,
+                category=None if selected_category == 'Todas' else selected_category,
                 top_n=n_recommendations,
-                exclude_purchased=purchased_ids
+                purchased_ids=purchased_ids
             )
         
         if len(recommendations) > 0:
@@ -342,6 +441,19 @@ def show_director_view():
         **Transacciones**: {len(interactions)}  
         **Categorías**: {len(products['category'].unique())}
         """)
+        
+        cache_stats = get_cache_stats()
+        st.caption(
+            f"🗄️ Caché de datos: {cache_stats['hits']} aciertos / "
+            f"{cache_stats['misses']} fallos ({cache_stats['hit_rate']:.0%})"
+        )
+
+        ranking_stats = get_recommendation_cache_stats()
+        st.caption(
+            f"🎯 Caché de recomendaciones: {ranking_stats['hits']} aciertos / "
+            f"{ranking_stats['misses']} fallos ({ranking_stats['hit_rate']:.0%}) | "
+            f"{ranking_stats['invalidations']} invalidadas por compras"
+        )
     
     # Usuario seleccionado
     st.markdown(f"""
@@ -373,19 +485,22 @@ def show_director_view():
     with tab1:
         st.markdown("### 🎁 Recomendaciones para Usuario Seleccionado")
         
-        user_purchases = get_user_history(user_id, interactions, products)
-        purchased_ids = user_purchases['product_id'].tolist() if len(user_purchases) > 0 else []
+        purchased_ids = get_purchased_index().get(user_id)
         
         if selected_category != 'Todas':
             products_filtered = products[products['category'] == selected_category]
         else:
             products_filtered = products
         
-        recommendations = model.recommend_products(
+        # Lookup O(1) en el job offline; scoring en vivo si el usuario no está
+        recommendations = get_recommendations(
+            model,
             user_id=user_id,
             products_df=products_filtered,
+            category=None if selected_category == 'Todas' else selected_category,
             top_n=n_recommendations,
-            exclude_purchased=purchased_ids
+            purchased_ids=purchased_ids,
+            precomputed=True
         )
         
         if len(recommendations) > 0:
@@ -406,7 +521,7 @@ def show_director_view():
     
     # TAB 4: DASHBOARD GLOBAL
     with tab4:
-        show_global_dashboard(interactions, products, user_stats)
+        show_global_dashboard(products)
 
 # ============================================================================
 # FUNCIÓN PRINCIPAL
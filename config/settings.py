@@ -15,7 +15,15 @@ MODEL_CONFIG = {
     'embedding_dim': 50,
     'model_path': 'models/recommendation_model',
     'epochs': 30,
-    'batch_size': 64
+    'batch_size': 64,
+    'streaming_batch_size': 1024,
+    'incremental_epochs': 3,
+    'incremental_learning_rate': 0.0001,
+    'purchase_rating': 4.0,
+    'popularity_prior_weight': 10,
+    'ann_min_catalog': 10000,
+    'ann_candidates': 1000,
+    'batch_top_n': 50
 }
 
 # Configuración de datos
@@ -23,7 +31,36 @@ DATA_CONFIG = {
     'interactions_path': 'data/interactions.csv',
     'products_path': 'data/products.csv',
     'user_stats_path': 'data/user_stats.csv',
-    'user_balances_path': 'data/user_balances.csv'
+    'user_balances_path': 'data/user_balances.csv',
+    'user_names_path': 'data/user_names.csv',
+    'training_shards_path': 'data/training_shards',
+    'rollups_path': 'data/dashboard_rollups.db',
+    'balance_backend': 'sqlite'
+}
+
+# Servicio HTTP de recomendaciones (python -m src.serving)
+SERVING_CONFIG = {
+    'enabled': False,
+    'host': '127.0.0.1',
+    'port': 8601,
+    'workers': 0,
+    'backlog': 1024,
+    'timeout': 2.0
+}
+
+# Micro-batching de inferencia entre sesiones concurrentes
+BATCHING_CONFIG = {
+    'enabled': False,
+    'max_batch_size': 32,
+    'max_wait_ms': 0.5
+}
+
+# Caché de rankings por usuario (reruns de Streamlit)
+RECOMMENDATION_CACHE_CONFIG = {
+    'enabled': True,
+    'max_entries': 10000,
+    'ttl_seconds': 600,
+    'depth': 50
 }
 
 # Configuración de usuarios
@@ -0,0 +1,95 @@
+"""
+Utilidades compartidas por los benchmarks de scripts/
+Al importarse agrega la raíz del repositorio a sys.path. Los datasets de
+prueba se generan con src.generate_data, el mismo generador de data/, así
+todos los benchmarks miden sobre el esquema y las reglas de la aplicación.
+
+Uso (desde un script de scripts/): from _bench_utils import ROOT, timed, report
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+
+# Fecha más reciente de los datasets de prueba (fija: resultados reproducibles)
+FIXTURE_END_DATE = '2025-12-31'
+
+
+def timed(fn, repeats=5, warmup=False):
+    """
+    Mediana de latencia de fn
+
+    Args:
+        fn: Función sin argumentos
+        repeats: Número de llamadas medidas
+        warmup: Llamar una vez antes de medir (p. ej. trazado del grafo)
+
+    Returns:
+        Mediana en milisegundos
+    """
+    if warmup:
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def report(label, before_ms, after_ms, before='antes', after='ahora'):
+    """Imprime una comparación de latencias con la aceleración"""
+    print(f"{label:<30} {before} {before_ms:9.1f} ms | {after} {after_ms:8.2f} ms "
+          f"({before_ms / after_ms:,.1f}x)")
+
+
+def run_child(args):
+    """
+    Ejecuta python con args en un proceso nuevo (desde ROOT)
+
+    Sirve para aislar memoria residente o importaciones de cada medición;
+    el proceso hijo imprime sus métricas como JSON en la última línea.
+
+    Returns:
+        Diccionario de la última línea de la salida
+    """
+    output = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def write_interactions(output_dir, n_rows, n_users=100_000, file_format='parquet', seed=42,
+                       traffic=None, **overrides):
+    """
+    Genera un dataset de prueba en output_dir y apunta DATA_CONFIG a él
+
+    Escribe interactions (CSV o Parquet con epoch_day), products.csv y
+    user_stats.csv con src.generate_data.write_synthetic_data.
+
+    Args:
+        output_dir: Carpeta del dataset (normalmente temporal)
+        n_rows: Interacciones
+        n_users: Usuarios
+        file_format: 'csv' o 'parquet'
+        seed: Semilla del generador
+        traffic: Perfil de TRAFFIC_PROFILES (por defecto 'uniform')
+        **overrides: Parámetros de tráfico, p. ej. history_days
+
+    Returns:
+        Ruta del archivo de interacciones
+    """
+    from config.settings import DATA_CONFIG
+    from src.generate_data import write_synthetic_data, resolve_traffic
+
+    for table in ('interactions', 'products', 'user_stats'):
+        DATA_CONFIG[f'{table}_path'] = os.path.join(output_dir, f'{table}.csv')
+
+    return write_synthetic_data(n_users, n_rows, output_dir=output_dir, file_format=file_format,
+                                seed=seed, traffic=resolve_traffic(traffic, **overrides),
+                                end_date=FIXTURE_END_DATE)
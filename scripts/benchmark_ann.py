@@ -0,0 +1,99 @@
+"""
+Recall@k y latencia del índice IVF de candidatos frente al scoring exhaustivo
+
+Ejecutar con: python scripts/benchmark_ann.py
+"""
+import time
+import _bench_utils  # noqa: F401 (agrega la raíz del repositorio a sys.path)
+
+import numpy as np
+import pandas as pd
+from src.model import ProductRecommendationANN
+
+CATALOG_SIZES = [20_000, 200_000]
+N_USERS = 500
+N_QUERIES = 100
+TOP_K = 10
+N_CLUSTERS = 64
+CANDIDATE_COUNTS = [300, 1_000, 3_000]
+
+
+def build_benchmark_model(n_products, seed=0):
+    """
+    Crea un modelo con embeddings sintéticos agrupados
+
+    Los pesos aleatorios de Keras no tienen estructura; aquí los productos
+    se generan alrededor de N_CLUSTERS centros para imitar un catálogo real.
+    """
+    rng = np.random.default_rng(seed)
+    model = ProductRecommendationANN(n_users=N_USERS, n_products=n_products)
+    model.build_model()
+
+    centers = rng.normal(0, 1, (N_CLUSTERS, model.embedding_dim))
+    product_embeddings = (
+        centers[rng.integers(N_CLUSTERS, size=n_products)]
+        + rng.normal(0, 0.3, (n_products, model.embedding_dim))
+    )
+    user_embeddings = rng.normal(0, 1, (N_USERS, model.embedding_dim))
+
+    model.model.get_layer('product_embedding').set_weights([product_embeddings])
+    model.model.get_layer('user_embedding').set_weights([user_embeddings])
+    model.user_encoder.fit(np.arange(1, N_USERS + 1))
+    model.product_encoder.fit(np.arange(1, n_products + 1))
+
+    products_df = pd.DataFrame({
+        'product_id': np.arange(1, n_products + 1),
+        'product_name': [f'Producto {i}' for i in range(1, n_products + 1)],
+        'category': rng.choice(['A', 'B', 'C', 'D', 'E'], n_products),
+        'price': np.round(rng.uniform(10, 500, n_products), 2)
+    })
+
+    return model, products_df
+
+
+def run_benchmark():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Índice IVF de candidatos (recall@{TOP_K})")
+    print("=" * 60)
+
+    for n_products in CATALOG_SIZES:
+        model, products_df = build_benchmark_model(n_products)
+
+        start = time.perf_counter()
+        model.build_inference_engine()
+        build_s = time.perf_counter() - start
+
+        product_ids = products_df['product_id'].values
+        all_encoded = np.arange(n_products)
+        users = np.random.default_rng(1).integers(1, N_USERS + 1, N_QUERIES)
+
+        # Top-k exacto de referencia
+        exact_tops, exact_ms = [], []
+        for user_id in users:
+            start = time.perf_counter()
+            exact_scores = model.engine.score(user_id - 1, all_encoded)
+            exact_tops.append(set(np.argpartition(-exact_scores, TOP_K)[:TOP_K] + 1))
+            exact_ms.append((time.perf_counter() - start) * 1000)
+
+        print(f"\n📦 Catálogo: {n_products:,} productos")
+        print(f"   - Listas IVF: {model.candidate_index.n_lists} (construcción: {build_s:.2f} s)")
+        print(f"   - Exhaustivo: {np.median(exact_ms):.2f} ms/consulta")
+
+        for n_candidates in CANDIDATE_COUNTS:
+            model.n_candidates = n_candidates
+            recalls, ann_ms = [], []
+
+            for user_id, exact_top in zip(users, exact_tops):
+                start = time.perf_counter()
+                ann_ids, ann_scores = model.predict_ratings(user_id, product_ids)
+                ann_top = set(ann_ids[np.argsort(-ann_scores)[:TOP_K]])
+                ann_ms.append((time.perf_counter() - start) * 1000)
+
+                recalls.append(len(exact_top & ann_top) / TOP_K)
+
+            print(f"   - IVF {n_candidates:>5,} candidatos: recall@{TOP_K} {np.mean(recalls):.3f}"
+                  f" | {np.median(ann_ms):.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,112 @@
+"""
+Latencia del checkout del carrito según su tamaño
+Compara el flujo anterior (débito del total + save_purchase por item, con
+reescritura completa de los CSV) con save_purchases_batch
+
+Ejecutar con: python scripts/benchmark_checkout.py
+"""
+import os
+import tempfile
+from datetime import datetime
+from _bench_utils import ROOT, timed
+
+import numpy as np
+import pandas as pd
+
+CART_SIZES = [1, 5, 10, 25, 50]
+HISTORY_ROWS = 20_000
+REPEATS = 5
+USER_ID = 1
+
+
+def make_cart(n_items):
+    return [{
+        'product_id': i,
+        'product_name': f'Producto {i}',
+        'category': 'Electrónica',
+        'price': 1.0,
+        'quantity': 1
+    } for i in range(1, n_items + 1)]
+
+
+def seed_history(balance_csv, purchases_csv):
+    """Historial previo para que el costo de reescritura sea realista"""
+    pd.DataFrame({
+        'user_id': np.arange(HISTORY_ROWS) % 500 + 1,
+        'balance': 1e9,
+        'last_updated': '2025-01-01 00:00:00'
+    }).drop_duplicates('user_id').to_csv(balance_csv, index=False)
+
+    pd.DataFrame({
+        'user_id': np.arange(HISTORY_ROWS) % 500 + 1,
+        'product_id': np.arange(HISTORY_ROWS) % 50 + 1,
+        'product_name': 'Producto',
+        'category': 'Electrónica',
+        'price': 1.0,
+        'quantity': 1,
+        'total': 1.0,
+        'timestamp': '2025-01-01 00:00:00'
+    }).to_csv(purchases_csv, index=False)
+
+
+def legacy_update_balance(balance_csv, user_id, amount):
+    df = pd.read_csv(balance_csv)
+    df.loc[df['user_id'] == user_id, 'balance'] -= amount
+    df.loc[df['user_id'] == user_id, 'last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    df.to_csv(balance_csv, index=False)
+
+
+def legacy_checkout(balance_csv, purchases_csv, cart):
+    """Flujo anterior: débito del total y luego save_purchase (con débito propio) por item"""
+    legacy_update_balance(balance_csv, USER_ID, sum(i['price'] * i['quantity'] for i in cart))
+
+    for item in cart:
+        total = item['price'] * item['quantity']
+        legacy_update_balance(balance_csv, USER_ID, total)
+
+        new_purchase = pd.DataFrame({
+            'user_id': [USER_ID],
+            'product_id': [item['product_id']],
+            'product_name': [item['product_name']],
+            'category': [item['category']],
+            'price': [item['price']],
+            'quantity': [item['quantity']],
+            'total': [total],
+            'timestamp': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+        })
+        df = pd.read_csv(purchases_csv)
+        df = pd.concat([df, new_purchase], ignore_index=True)
+        df.to_csv(purchases_csv, index=False)
+
+
+def run_benchmark():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Checkout del carrito ({HISTORY_ROWS:,} compras previas)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs('data')
+
+        legacy_balance, legacy_purchases = 'data/legacy_balance.csv', 'data/legacy_purchases.csv'
+        seed_history(legacy_balance, legacy_purchases)
+        seed_history('data/user_balance.csv', 'data/user_purchases.csv')
+
+        from app.components.purchases import save_purchases_batch
+        save_purchases_batch(USER_ID, make_cart(1))  # abrir backend y diario
+
+        for n_items in CART_SIZES:
+            cart = make_cart(n_items)
+            legacy_ms = timed(lambda: legacy_checkout(legacy_balance, legacy_purchases, cart), REPEATS)
+            batch_ms = timed(lambda: save_purchases_batch(USER_ID, cart), REPEATS)
+
+            print(f"\n🛒 Carrito de {n_items} producto(s)")
+            print(f"   - Flujo anterior: {legacy_ms:,.1f} ms ({2 * n_items + 1} reescrituras de CSV)")
+            print(f"   - Transacción única: {batch_ms:,.2f} ms")
+            print(f"   - Aceleración: {legacy_ms / batch_ms:,.0f}x")
+
+        os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,66 @@
+"""
+Arranque en frío y memoria: modelo Keras frente al runtime NumPy exportado
+Cada variante se mide en un intérprete nuevo, desde el inicio del proceso
+hasta tener la primera recomendación
+
+Ejecutar con: python scripts/benchmark_cold_start.py [--runs 3]
+"""
+import argparse
+from _bench_utils import ROOT, run_child
+
+import numpy as np
+
+CHILD = '''
+import time
+start = time.perf_counter()
+import sys, json, resource
+sys.path.insert(0, {root!r})
+from src.data_store import load_table
+{load}
+products = load_table('products')
+model.recommend_products(int(model.user_encoder.classes_[0]), products, 10)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'tensorflow': 'tensorflow' in sys.modules
+}}))
+'''
+
+LOADERS = {
+    'Keras (load_model)': '''
+from src.model import ProductRecommendationANN
+model = ProductRecommendationANN(n_users=1, n_products=1)
+model.load_model()
+''',
+    'NumPy (load_runtime)': '''
+from src.runtime import load_runtime
+model = load_runtime()
+'''
+}
+
+
+def measure(load):
+    """Ejecuta una variante en un proceso nuevo y devuelve sus métricas"""
+    return run_child(['-c', CHILD.format(root=ROOT, load=load)])
+
+
+def run_benchmark(runs):
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Arranque en frío ({runs} ejecuciones por variante)")
+    print("=" * 60)
+
+    for label, load in LOADERS.items():
+        results = [measure(load) for _ in range(runs)]
+        seconds = np.median([r['seconds'] for r in results])
+        rss = np.median([r['rss_mb'] for r in results])
+        print(f"{label:<22} {seconds:6.2f} s hasta la primera recomendación | "
+              f"pico RSS {rss:6.0f} MB | TensorFlow importado: {results[0]['tensorflow']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de arranque en frío')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args.runs)
@@ -0,0 +1,93 @@
+"""
+Latencia del dashboard global: agregados materializados frente a groupby completos
+Genera una tabla de interacciones sintética, mide los cálculos que hacía
+show_global_dashboard en cada render y las lecturas de los agregados
+
+Ejecutar con: python scripts/benchmark_dashboard.py [--rows 10000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+from _bench_utils import timed, write_interactions, FIXTURE_END_DATE
+
+import numpy as np
+import pandas as pd
+
+N_USERS = 1_000_000
+PURCHASES = 1_000
+RENDERS = 5
+
+
+def legacy_render(interactions, user_stats):
+    """Cálculos que show_global_dashboard repetía en cada render"""
+    sorted(interactions['user_id'].unique())
+    interactions['total_spent'].sum()
+    interactions.groupby('product_name', observed=True).agg({
+        'purchase_count': 'sum', 'total_spent': 'sum'
+    }).sort_values('purchase_count', ascending=False).head(10)
+    interactions.groupby('category', observed=True)['total_spent'].sum().sort_values(ascending=False)
+    dates = pd.to_datetime(interactions['purchase_date'])
+    interactions.groupby(dates.dt.to_period('M')).agg({'total_spent': 'sum', 'product_id': 'count'})
+    pd.cut(user_stats['num_interactions'], bins=[0, 5, 10, 20, float('inf')]).value_counts()
+
+
+def rollup_render(rollups):
+    """Lecturas del dashboard desde los agregados"""
+    rollups.totals()
+    rollups.top_products(10)
+    rollups.category_revenue()
+    rollups.monthly_sales()
+    rollups.activity_distribution()
+
+
+def run_benchmark(n_rows):
+    from config.settings import DATA_CONFIG
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Dashboard global con {n_rows:,} interacciones")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        DATA_CONFIG['rollups_path'] = os.path.join(tmp, 'dashboard_rollups.db')
+        write_interactions(tmp, n_rows, n_users=N_USERS)
+
+        from app.components import purchases
+        from app.components.rollups import get_dashboard_rollups
+        from src.data_store import load_table
+
+        purchases.PURCHASES_FILE = os.path.join(tmp, 'user_purchases.csv')
+        purchases.PURCHASE_SEGMENTS_DIR = os.path.join(tmp, 'purchase_segments')
+        journal = purchases.get_purchase_journal()
+
+        start = time.perf_counter()
+        rollups = get_dashboard_rollups()
+        print(f"\n🏗️  Construcción inicial de agregados: {time.perf_counter() - start:.1f} s (una sola vez)")
+
+        rollup_ms = timed(lambda: rollup_render(get_dashboard_rollups()), RENDERS * 20)
+        print(f"⚡ Render con agregados: {rollup_ms:.2f} ms")
+
+        products = load_table('products')
+        rng = np.random.default_rng(0)
+        records = [{
+            'user_id': int(rng.integers(1, N_USERS + 1)), **product, 'quantity': 1,
+            'total': product['price'], 'timestamp': f'{FIXTURE_END_DATE} 10:00:00'
+        } for product in products.sample(PURCHASES, replace=True, random_state=0).to_dict('records')]
+        start = time.perf_counter()
+        for record in records:
+            rollups.apply_purchases([record], journal.append(record))
+        print(f"🛒 Compra anexada y aplicada: {(time.perf_counter() - start) / PURCHASES * 1000:.2f} ms")
+
+        interactions = load_table('interactions')
+        user_stats = load_table('user_stats')
+        legacy_ms = timed(lambda: legacy_render(interactions.copy(), user_stats.copy()), RENDERS)
+        print(f"🐢 Render con groupby completos: {legacy_ms:,.0f} ms "
+              f"({legacy_ms / rollup_ms:,.0f}x más lento)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del dashboard global')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    run_benchmark(args.rows)
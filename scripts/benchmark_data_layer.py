@@ -0,0 +1,106 @@
+"""
+Tiempo de carga y memoria residente: CSV frente a la capa columnar
+Cada medición se ejecuta en un proceso nuevo para aislar la memoria residente
+
+Ejecutar con: python scripts/benchmark_data_layer.py [--sizes 5000 1000000 50000000]
+"""
+import os
+import time
+import json
+import argparse
+import resource
+import tempfile
+from _bench_utils import run_child, write_interactions
+
+import pandas as pd
+
+DEFAULT_SIZES = [5_000, 1_000_000, 50_000_000]
+N_USERS = 500
+
+# (nombre, formato, columnas)
+SCENARIOS = [
+    ('CSV completo (antes)', 'csv', None),
+    ('Parquet completo', 'parquet', None),
+    ('Parquet solo user_id (login)', 'parquet', ['user_id']),
+    ('Parquet user_id + product_id', 'parquet', ['user_id', 'product_id']),
+]
+
+
+def current_rss_mb():
+    """Memoria residente actual del proceso (Linux); pico de RSS en otros sistemas"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(fmt, path, columns):
+    """Se ejecuta en el proceso hijo: carga la tabla e imprime tiempo y RSS"""
+    import pyarrow  # noqa: F401  (excluir el costo de importación de la medición)
+    baseline = current_rss_mb()
+    start = time.perf_counter()
+
+    if fmt == 'csv':
+        df = pd.read_csv(path, usecols=columns)
+    else:
+        df = pd.read_parquet(path, columns=columns)
+
+    elapsed = time.perf_counter() - start
+    rss = current_rss_mb()
+
+    print(json.dumps({
+        'seconds': elapsed,
+        'rss_mb': rss - baseline,
+        'frame_mb': df.memory_usage(deep=True).sum() / 1024 ** 2
+    }))
+
+
+def run_measure(fmt, path, columns):
+    args = [os.path.abspath(__file__), '--measure', fmt, path]
+    if columns:
+        args += ['--columns', *columns]
+    return run_child(args)
+
+
+def run_benchmark(sizes):
+    from src.data_store import import_csv
+
+    print("=" * 60)
+    print("⏱️  BENCHMARK - Capa de datos columnar")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            csv_file = write_interactions(tmp, n_rows, n_users=N_USERS, file_format='csv')
+            start = time.perf_counter()
+            parquet_file = import_csv('interactions')
+            import_s = time.perf_counter() - start
+
+            csv_mb = os.path.getsize(csv_file) / 1024 ** 2
+            parquet_mb = os.path.getsize(parquet_file) / 1024 ** 2
+
+            print(f"\n📂 {n_rows:,} interacciones")
+            print(f"   - Disco: CSV {csv_mb:,.1f} MB | Parquet {parquet_mb:,.1f} MB"
+                  f" (importación: {import_s:.2f} s)")
+
+            for name, fmt, columns in SCENARIOS:
+                result = run_measure(fmt, csv_file if fmt == 'csv' else parquet_file, columns)
+                print(f"   - {name}: {result['seconds']:.3f} s | RSS +{result['rss_mb']:,.1f} MB"
+                      f" | DataFrame {result['frame_mb']:,.1f} MB")
+
+            os.remove(csv_file)
+            os.remove(parquet_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de la capa de datos')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--measure', nargs=2, metavar=('FORMAT', 'PATH'))
+    parser.add_argument('--columns', nargs='+')
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure, args.columns)
+    else:
+        run_benchmark(args.sizes)
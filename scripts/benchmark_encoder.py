@@ -0,0 +1,73 @@
+"""
+IDEncoder frente a LabelEncoder: codificación en bloque, IDs desconocidos y carga
+Ejecutar con: python scripts/benchmark_encoder.py [--ids 1000000]
+"""
+import os
+import argparse
+import tempfile
+from _bench_utils import timed
+
+import joblib
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+from src.id_encoder import IDEncoder
+
+SINGLE_CALLS = 10_000
+BULK_QUERIES = 1_000_000
+
+
+def label_encoder_lookup(encoder, user_id):
+    """Camino anterior de predict_rating: transform con excepción para desconocidos"""
+    try:
+        return encoder.transform([user_id])[0]
+    except ValueError:
+        return None
+
+
+def run_benchmark(n_ids):
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Codificador de IDs ({n_ids:,} IDs)")
+    print("=" * 60)
+
+    rng = np.random.default_rng(42)
+    ids = np.unique(rng.integers(1, n_ids * 4, n_ids))
+    queries = rng.choice(ids, BULK_QUERIES)
+    unknown = np.arange(-SINGLE_CALLS, 0)
+
+    label_encoder = LabelEncoder().fit(ids)
+    id_encoder = IDEncoder().fit(ids)
+
+    print(f"\n📦 Codificación en bloque ({BULK_QUERIES:,} IDs)")
+    print(f"   - LabelEncoder.transform: {timed(lambda: label_encoder.transform(queries), 1):,.1f} ms")
+    print(f"   - IDEncoder.encode: {timed(lambda: id_encoder.encode(queries), 1):,.1f} ms")
+
+    print(f"\n🔁 Llamadas individuales (µs por llamada)")
+    single = queries[:SINGLE_CALLS]
+    le_known = timed(lambda: [label_encoder_lookup(label_encoder, i) for i in single], 1) / SINGLE_CALLS
+    id_known = timed(lambda: [id_encoder.encode([i]) for i in single], 1) / SINGLE_CALLS
+    le_unknown = timed(lambda: [label_encoder_lookup(label_encoder, i) for i in unknown], 1) / SINGLE_CALLS
+    id_unknown = timed(lambda: [id_encoder.encode([i]) for i in unknown], 1) / SINGLE_CALLS
+    print(f"   - ID conocido: LabelEncoder {le_known * 1e3:,.1f} | IDEncoder {id_known * 1e3:,.1f}")
+    print(f"   - ID desconocido: LabelEncoder {le_unknown * 1e3:,.1f} (ValueError) | IDEncoder {id_unknown * 1e3:,.1f}")
+
+    new_ids = ids.max() + 1 + np.arange(1_000)
+    grow = timed(lambda: IDEncoder(id_encoder.classes_).add(new_ids), 1)
+    print(f"\n➕ Agregar 1,000 IDs nuevos: {grow:,.1f} ms (los códigos existentes no cambian)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        joblib.dump(label_encoder, os.path.join(tmp, 'user_encoder.pkl'))
+        id_encoder.save(tmp, 'user_encoder')
+
+        pkl_ms = timed(lambda: joblib.load(os.path.join(tmp, 'user_encoder.pkl')), repeats=3)
+        npy_ms = timed(lambda: IDEncoder.load(tmp, 'user_encoder').encode(queries[:1]), repeats=3)
+        print(f"\n💾 Carga + primera consulta")
+        print(f"   - user_encoder.pkl: {pkl_ms:,.1f} ms")
+        print(f"   - user_encoder.npy (mmap): {npy_ms:,.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del codificador de IDs')
+    parser.add_argument('--ids', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    run_benchmark(args.ids)
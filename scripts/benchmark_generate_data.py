@@ -0,0 +1,140 @@
+"""
+Velocidad del generador de datos sintéticos: bucle por fila frente a
+arreglos NumPy por bloques, con la distribución de ratings de ambos para
+comprobar que conservan las mismas reglas, escalado de la generación
+por shards con el número de procesos y concentración de cada perfil de
+tráfico (cuánto calienta una caché LRU de usuarios)
+
+Ejecutar con: python scripts/benchmark_generate_data.py [--rows 20000000] [--legacy-rows 5000] [--max-workers N]
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+from collections import OrderedDict
+import _bench_utils  # noqa: F401 (agrega la raíz del repositorio a sys.path)
+
+import numpy as np
+import pandas as pd
+
+
+def legacy_generate(products_df, n_users, n_interactions, seed=42):
+    """Bucle por fila del generador anterior (sin perfiles de gasto)"""
+    random.seed(seed)
+    categories = products_df['category'].unique().tolist()
+    user_profiles = [random.sample(categories, k=random.randint(1, 3)) for _ in range(n_users)]
+    ratings = []
+
+    for _ in range(n_interactions):
+        favorites = random.choice(user_profiles)
+        if random.random() < 0.7:
+            available = products_df[products_df['category'] == random.choice(favorites)]
+        else:
+            available = products_df
+        product = available.sample(1).iloc[0]
+        if product['category'] in favorites:
+            ratings.append(random.choices([3, 4, 5], weights=[0.1, 0.3, 0.6])[0])
+        else:
+            ratings.append(random.choices([1, 2, 3, 4, 5], weights=[0.1, 0.2, 0.4, 0.2, 0.1])[0])
+
+    return pd.Series(ratings, name='rating')
+
+
+def rating_share(ratings):
+    shares = ratings.value_counts(normalize=True).sort_index()
+    return ' '.join(f"{rating}:{share:.1%}" for rating, share in shares.items())
+
+
+def lru_hit_rate(keys, capacity):
+    """Tasa de aciertos de una caché LRU de capacity claves sobre la secuencia keys"""
+    cache = OrderedDict()
+    hits = 0
+    for key in keys:
+        if key in cache:
+            hits += 1
+            cache.move_to_end(key)
+        else:
+            cache[key] = True
+            if len(cache) > capacity:
+                cache.popitem(last=False)
+    return hits / len(keys)
+
+
+def run_traffic(n_users, n_rows):
+    """Concentración de usuarios, productos y días de cada perfil de tráfico"""
+    from src.generate_data import TRAFFIC_PROFILES, iter_synthetic_interactions
+
+    print(f"\n🔥 Perfiles de tráfico ({n_rows:,} filas, {n_users:,} usuarios)")
+    for name in TRAFFIC_PROFILES:
+        _, chunks = iter_synthetic_interactions(n_users, n_rows, traffic=name)
+        df = pd.concat(chunks)
+        users = df['user_id'].value_counts()
+        products = df['product_id'].value_counts()
+        days = df['purchase_date'].value_counts()
+        hit_rate = lru_hit_rate(df['user_id'].to_numpy()[:200_000].tolist(), n_users // 100)
+        print(f"   {name:<10} top 1% usuarios {users.head(n_users // 100).sum() / n_rows:6.1%} | "
+              f"top 5 productos {products.head(5).sum() / n_rows:6.1%} | "
+              f"día pico {days.max() / days.mean():4.1f}x la media | "
+              f"LRU 1% usuarios {hit_rate:6.1%}")
+
+
+def run_scaling(n_rows, max_workers):
+    """Filas/s de write_sharded_data con 1, 2, 4... procesos (4 shards por proceso)"""
+    from src.generate_data import write_sharded_data
+
+    print(f"\n🧵 Generación por shards ({n_rows:,} filas, {os.cpu_count()} núcleos disponibles)")
+    workers = 1
+    baseline = None
+    while workers <= max_workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = write_sharded_data(n_rows // 20, n_rows, workers * 4, output_dir=tmp, workers=workers)
+        rate = n_rows / manifest['seconds']
+        baseline = baseline or rate
+        print(f"   {workers:>3} procesos: {rate:12,.0f} filas/s (x{rate / baseline:.2f})")
+        workers *= 2
+
+
+def run_benchmark(n_rows, legacy_rows, max_workers):
+    from src.generate_data import build_products, iter_synthetic_interactions, write_synthetic_data
+
+    print("=" * 60)
+    print("⏱️  BENCHMARK - Generador de datos sintéticos")
+    print("=" * 60)
+
+    products_df = build_products(np.random.default_rng(42))
+    start = time.perf_counter()
+    legacy_ratings = legacy_generate(products_df, 500, legacy_rows)
+    legacy_rate = legacy_rows / (time.perf_counter() - start)
+    print(f"\n🐢 Bucle por fila:      {legacy_rate:12,.0f} filas/s ({legacy_rows:,} filas)")
+
+    _, chunks = iter_synthetic_interactions(500, legacy_rows, seed=42)
+    start = time.perf_counter()
+    vector_ratings = pd.concat(chunks)['rating']
+    vector_rate = legacy_rows / (time.perf_counter() - start)
+    print(f"⚡ Vectorizado:         {vector_rate:12,.0f} filas/s ({legacy_rows:,} filas)")
+
+    print(f"\n📊 Ratings bucle:       {rating_share(legacy_ratings)}")
+    print(f"📊 Ratings vectorizado: {rating_share(vector_ratings.astype(int))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_format in ('parquet', 'csv'):
+            rows = n_rows if file_format == 'parquet' else min(n_rows, 2_000_000)
+            start = time.perf_counter()
+            path = write_synthetic_data(rows // 20, rows, output_dir=tmp, file_format=file_format)
+            elapsed = time.perf_counter() - start
+            print(f"💾 {file_format:<8} {rows:>12,} filas en {elapsed:6.1f} s "
+                  f"({rows / elapsed:,.0f} filas/s, {os.path.getsize(path) / 1e6:,.0f} MB)")
+
+    run_traffic(100_000, 1_000_000)
+    run_scaling(n_rows, max_workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del generador de datos')
+    parser.add_argument('--rows', type=int, default=20_000_000)
+    parser.add_argument('--legacy-rows', type=int, default=5_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.legacy_rows, args.max_workers)
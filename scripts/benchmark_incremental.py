@@ -0,0 +1,91 @@
+"""
+Tiempo de actualización incremental frente a reentrenamiento completo
+Simula compras nuevas (con usuarios y productos no vistos) sobre una copia
+del modelo guardado y compara ambos caminos
+
+Ejecutar con: python scripts/benchmark_incremental.py [--purchases 500]
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from _bench_utils import ROOT
+
+import numpy as np
+import pandas as pd
+
+NEW_USERS = 25
+NEW_PRODUCTS = 5
+
+
+def make_delta(interactions, n_purchases, seed=42):
+    """Compras nuevas: mayoría de usuarios/productos conocidos y algunos nuevos"""
+    from src.model import purchases_to_interactions
+
+    rng = np.random.default_rng(seed)
+    user_ids = rng.choice(interactions['user_id'].unique(), n_purchases)
+    product_ids = rng.choice(interactions['product_id'].unique(), n_purchases)
+
+    user_ids[:NEW_USERS] = interactions['user_id'].max() + 1 + np.arange(NEW_USERS)
+    product_ids[:NEW_PRODUCTS] = interactions['product_id'].max() + 1 + np.arange(NEW_PRODUCTS)
+
+    return purchases_to_interactions(pd.DataFrame({'user_id': user_ids, 'product_id': product_ids}))
+
+
+def run_benchmark(n_purchases):
+    from src.model import ProductRecommendationANN
+    from config.settings import MODEL_CONFIG
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Actualización con {n_purchases} compras nuevas")
+    print("=" * 60)
+
+    interactions = pd.read_csv(os.path.join(ROOT, 'data/interactions.csv'))
+    delta = make_delta(interactions, n_purchases)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, 'model')
+        shutil.copytree(os.path.join(ROOT, MODEL_CONFIG['model_path']), model_dir)
+
+        # Incremental: cargar checkpoint, ampliar embeddings, ajustar el delta y guardar
+        start = time.perf_counter()
+        model = ProductRecommendationANN(n_users=1, n_products=1)
+        model.load_model(model_dir)
+        known_users = model.user_encoder.classes_[:20]
+        before = np.array([model.predict_ratings(u, model.product_encoder.classes_)[1] for u in known_users])
+
+        fit_start = time.perf_counter()
+        model.incremental_update(delta, verbose=0)
+        fit_s = time.perf_counter() - fit_start
+        model.save_model(model_dir)
+        incremental_s = time.perf_counter() - start
+
+        after = np.array([model.predict_ratings(u, model.product_encoder.classes_[:before.shape[1]])[1]
+                          for u in known_users])
+        new_user = delta['user_id'].iloc[0]
+        cold = model.predict_ratings(new_user, model.product_encoder.classes_)[1]
+
+        # Completo: reajustar encoders y entrenar desde cero como train_and_save_model
+        start = time.perf_counter()
+        full = ProductRecommendationANN(n_users=1, n_products=1)
+        full.train(pd.concat([interactions, delta], ignore_index=True),
+                   epochs=MODEL_CONFIG['epochs'], batch_size=MODEL_CONFIG['batch_size'], verbose=0)
+        full.save_model(os.path.join(tmp, 'full'))
+        full_s = time.perf_counter() - start
+
+    print(f"\n🔁 Incremental: {incremental_s:.1f} s "
+          f"(modelo: {len(model.user_encoder.classes_)} usuarios, {len(model.product_encoder.classes_)} productos)")
+    print(f"   - Ampliación de embeddings + ajuste: {fit_s:.1f} s (el resto es cargar y guardar)")
+    print(f"🏗️  Reentrenamiento completo: {full_s:.1f} s")
+    print(f"⚡ Aceleración: {full_s / incremental_s:.1f}x")
+    print(f"📏 Cambio medio en predicciones de usuarios existentes: {np.abs(after - before).mean():.3f}")
+    print(f"🆕 Usuario nuevo {new_user}: predicciones en [{cold.min():.2f}, {cold.max():.2f}]")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de la actualización incremental')
+    parser.add_argument('--purchases', type=int, default=500)
+    args = parser.parse_args()
+
+    run_benchmark(args.purchases)
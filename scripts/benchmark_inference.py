@@ -0,0 +1,66 @@
+"""
+Paridad y latencia del motor de torres precalculadas frente a model.predict
+
+Ejecutar con: python scripts/benchmark_inference.py
+"""
+import time
+import _bench_utils  # noqa: F401 (agrega la raíz del repositorio a sys.path)
+
+import numpy as np
+from src.model import ProductRecommendationANN
+from config.settings import MODEL_CONFIG
+
+REPEATS = 50
+TOLERANCE = 1e-4
+
+
+def run_benchmark():
+    print("=" * 60)
+    print("⏱️  BENCHMARK - Motor de inferencia NumPy")
+    print("=" * 60)
+
+    model = ProductRecommendationANN(n_users=1, n_products=1)
+    model.load_model(MODEL_CONFIG['model_path'])
+    engine = model.engine
+
+    n_users = len(model.user_encoder.classes_)
+    n_products = len(model.product_encoder.classes_)
+    products = np.arange(n_products)
+
+    # Paridad numérica para todos los pares usuario-producto
+    max_error = 0.0
+    for user in range(n_users):
+        keras_scores = model.model.predict(
+            [np.full(n_products, user), products], verbose=0
+        )[:, 0]
+        engine_scores = engine.score(user, products)
+        max_error = max(max_error, float(np.abs(keras_scores - engine_scores).max()))
+
+    print(f"\n🎯 Paridad ({n_users * n_products:,} pares):")
+    print(f"   - Error absoluto máximo: {max_error:.2e}")
+    print(f"   - Dentro de tolerancia ({TOLERANCE:.0e}): {'✅' if max_error < TOLERANCE else '❌'}")
+
+    # Latencia por request (un usuario, catálogo completo)
+    timings = {'keras': [], 'engine': []}
+    for _ in range(REPEATS):
+        user = np.random.randint(n_users)
+
+        start = time.perf_counter()
+        model.model.predict([np.full(n_products, user), products], verbose=0)
+        timings['keras'].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        engine.score(user, products)
+        timings['engine'].append((time.perf_counter() - start) * 1000)
+
+    keras_ms = np.median(timings['keras'])
+    engine_ms = np.median(timings['engine'])
+
+    print(f"\n⚡ Latencia mediana ({n_products} productos):")
+    print(f"   - model.predict: {keras_ms:.3f} ms")
+    print(f"   - Torres NumPy: {engine_ms:.3f} ms")
+    print(f"   - Aceleración: {keras_ms / engine_ms:,.0f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
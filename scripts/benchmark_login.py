@@ -0,0 +1,82 @@
+"""
+Throughput del login con el índice de nombres frente a la búsqueda lineal
+La búsqueda anterior regeneraba todos los nombres y los recorría en cada login
+
+Ejecutar con: python scripts/benchmark_login.py [--users 1000000]
+"""
+import os
+import time
+import argparse
+import tempfile
+from _bench_utils import write_interactions
+
+LOGINS = 100_000
+NEW_USERS = 1_000
+INTERACTIONS_PER_USER = 3
+
+
+def legacy_authenticate(username):
+    """Login anterior: regenerar todos los nombres y recorrerlos"""
+    from src.utils import generate_user_names
+    from src.data_store import load_table
+
+    interactions = load_table('interactions', columns=['user_id'])
+    user_ids = sorted(interactions['user_id'].unique())
+    for user_id, name in generate_user_names(user_ids).items():
+        if name.lower() == username.lower():
+            return user_id
+    return None
+
+
+def run_benchmark(n_users):
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Login con {n_users:,} usuarios")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_interactions(tmp, n_users * INTERACTIONS_PER_USER, n_users=n_users, file_format='csv')
+
+        from app.components.user_index import UserNameIndex
+        index_file = os.path.join(tmp, 'user_index.pkl')
+
+        start = time.perf_counter()
+        index = UserNameIndex(index_file)
+        index.refresh()
+        build_s = time.perf_counter() - start
+        print(f"\n🏗️  Construcción inicial: {build_s:.2f} s ({len(index.names):,} nombres distintos)")
+
+        start = time.perf_counter()
+        UserNameIndex(index_file).refresh()
+        print(f"💾 Recarga desde disco: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        names = [name for _, name in index.names.values()]
+        queries = [names[i % len(names)] for i in range(LOGINS)]
+
+        start = time.perf_counter()
+        for username in queries:
+            index.refresh()
+            index.lookup(username)
+        elapsed = time.perf_counter() - start
+        print(f"🔑 Índice: {LOGINS / elapsed:,.0f} logins/s ({elapsed / LOGINS * 1e6:.1f} µs por login)")
+
+        start = time.perf_counter()
+        legacy_authenticate(names[-1])
+        legacy_s = time.perf_counter() - start
+        print(f"🐢 Búsqueda lineal: {1 / legacy_s:,.3f} logins/s ({legacy_s:.2f} s por login)")
+
+        # Usuarios nuevos: solo se generan sus nombres
+        known = len(index.user_ids)
+        total = n_users + NEW_USERS
+        write_interactions(tmp, total * INTERACTIONS_PER_USER, n_users=total, file_format='csv')
+        start = time.perf_counter()
+        index.refresh()
+        print(f"➕ {len(index.user_ids) - known:,} usuarios nuevos: {time.perf_counter() - start:.2f} s"
+              f" (incluye reimportar la tabla)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del login')
+    parser.add_argument('--users', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    run_benchmark(args.users)
@@ -0,0 +1,106 @@
+"""
+Throughput y latencia de cola del micro-batching de inferencia
+Simula sesiones concurrentes que piden ratings para todo el catálogo y
+compara llamadas directas al modelo con distintos max_batch_size / max_wait_ms
+
+Ejecutar con: python scripts/benchmark_micro_batching.py [--clients 16] [--seconds 5] [--backend numpy]
+"""
+import time
+import argparse
+import threading
+import _bench_utils  # noqa: F401 (agrega la raíz del repositorio a sys.path)
+
+import numpy as np
+
+# (max_batch_size, max_wait_ms) evaluados
+CONFIGS = [(32, 0.0), (8, 0.5), (32, 1.0), (32, 2.0), (64, 5.0), (128, 10.0)]
+
+
+def drive(predict, user_ids, product_ids, clients, seconds):
+    """
+    Lanza clientes concurrentes que llaman predict(user_id, product_ids)
+
+    Returns:
+        (QPS, latencias en ms)
+    """
+    latencies = [[] for _ in range(clients)]
+    deadline = time.perf_counter() + seconds
+
+    def client(slot):
+        rng = np.random.default_rng(slot)
+        while time.perf_counter() < deadline:
+            user_id = user_ids[rng.integers(len(user_ids))]
+            start = time.perf_counter()
+            predict(user_id, product_ids)
+            latencies[slot].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.asarray(lat) for lat in latencies]) * 1000
+    return len(latencies) / elapsed, latencies
+
+
+def report(label, qps, latencies, extra=''):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"{label:<22} {qps:>9,.0f} QPS | p50 {p50:7.2f} ms | p95 {p95:7.2f} ms | "
+          f"p99 {p99:7.2f} ms{extra}")
+
+
+def run_benchmark(clients, seconds, backend):
+    from src.model import ProductRecommendationANN
+    from src.micro_batching import MicroBatchScheduler
+    from src.data_store import load_table
+    from config.settings import MODEL_CONFIG
+
+    model = ProductRecommendationANN(n_users=1, n_products=1)
+    model.load_model(MODEL_CONFIG['model_path'])
+    if backend == 'keras':
+        model.engine = None
+        model.candidate_index = None
+
+    user_ids = model.user_encoder.classes_
+    product_ids = load_table('products')['product_id'].to_numpy()
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Micro-batching ({backend}, {clients} clientes, "
+          f"{len(product_ids)} productos por petición)")
+    print("=" * 60)
+
+    # Calentamiento (grafo de Keras y cachés de NumPy)
+    model.predict_ratings_batch([(user_ids[0], product_ids)] * 4)
+    model.predict_ratings(user_ids[0], product_ids)
+
+    # Sin micro-batching: cada sesión hace su propia pasada
+    lock = threading.Lock() if backend == 'keras' else None
+
+    def direct(user_id, candidates):
+        if lock is None:
+            return model.predict_ratings(user_id, candidates)
+        with lock:
+            return model.predict_ratings(user_id, candidates)
+
+    report('directo', *drive(direct, user_ids, product_ids, clients, seconds))
+
+    for max_batch_size, max_wait_ms in CONFIGS:
+        scheduler = MicroBatchScheduler(model, max_batch_size, max_wait_ms)
+        qps, latencies = drive(scheduler.predict_ratings, user_ids, product_ids, clients, seconds)
+        scheduler.close()
+        stats = scheduler.stats()
+        report(f"lote {max_batch_size:>3} / {max_wait_ms:>4} ms", qps, latencies,
+               f" | lote medio {stats['avg_batch_size']:5.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del micro-batching')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--backend', choices=['numpy', 'keras'], default='numpy')
+    args = parser.parse_args()
+
+    run_benchmark(args.clients, args.seconds, args.backend)
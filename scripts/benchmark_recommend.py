@@ -0,0 +1,86 @@
+"""
+Benchmark de latencia de recommend_products por tamaño de catálogo
+Compara el scoring vectorizado con el bucle original producto a producto
+
+Ejecutar con: python scripts/benchmark_recommend.py
+"""
+from _bench_utils import timed
+
+import numpy as np
+import pandas as pd
+from src.model import ProductRecommendationANN
+
+CATALOG_SIZES = [50, 5_000, 100_000]
+N_USERS = 500
+REPEATS = 5
+
+# El bucle original tarda minutos con catálogos grandes
+LEGACY_MAX_CATALOG = 50
+
+
+def build_benchmark_model(n_products):
+    """Crea un modelo (sin entrenar) con encoders ajustados a un catálogo sintético"""
+    model = ProductRecommendationANN(n_users=N_USERS, n_products=n_products)
+    model.build_model()
+    model.user_encoder.fit(np.arange(1, N_USERS + 1))
+    model.product_encoder.fit(np.arange(1, n_products + 1))
+
+    products_df = pd.DataFrame({
+        'product_id': np.arange(1, n_products + 1),
+        'product_name': [f'Producto {i}' for i in range(1, n_products + 1)],
+        'category': np.random.choice(['A', 'B', 'C', 'D', 'E'], n_products),
+        'price': np.round(np.random.uniform(10, 500, n_products), 2)
+    })
+
+    return model, products_df
+
+
+def legacy_recommend(model, user_id, products_df, top_n=10):
+    """Implementación anterior: una llamada a predict_rating por producto"""
+    predictions = []
+    for product_id in products_df['product_id'].unique():
+        rating = model.predict_rating(user_id, product_id)
+        if rating is not None:
+            predictions.append({'product_id': product_id, 'predicted_rating': rating})
+
+    recommendations = pd.DataFrame(predictions)
+    return recommendations.sort_values('predicted_rating', ascending=False).head(top_n)
+
+
+def run_benchmark():
+    print("=" * 60)
+    print("⏱️  BENCHMARK - recommend_products")
+    print("=" * 60)
+
+    for n_products in CATALOG_SIZES:
+        model, products_df = build_benchmark_model(n_products)
+        user_id = 1
+
+        vectorized_ms = timed(
+            lambda: model.recommend_products(user_id, products_df, top_n=10),
+            REPEATS, warmup=True
+        )
+
+        print(f"\n📦 Catálogo: {n_products:,} productos")
+        print(f"   - Vectorizado: {vectorized_ms:,.1f} ms/request")
+
+        if n_products <= LEGACY_MAX_CATALOG:
+            legacy_ms = timed(
+                lambda: legacy_recommend(model, user_id, products_df, top_n=10),
+                1, warmup=True
+            )
+
+            # Verificar que el ranking sea idéntico
+            expected = legacy_recommend(model, user_id, products_df, top_n=10)
+            actual = model.recommend_products(user_id, products_df, top_n=10)
+            same_ranking = list(expected['product_id']) == list(actual['product_id'])
+
+            print(f"   - Bucle original: {legacy_ms:,.1f} ms/request")
+            print(f"   - Aceleración: {legacy_ms / vectorized_ms:,.1f}x")
+            print(f"   - Mismo ranking: {'✅' if same_ranking else '❌'}")
+        else:
+            print(f"   - Bucle original: omitido (> {LEGACY_MAX_CATALOG} productos)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
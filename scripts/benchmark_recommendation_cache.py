@@ -0,0 +1,101 @@
+"""
+Latencia y tasa de aciertos de la caché de recomendaciones por usuario
+Simula reruns de Streamlit: varias sesiones que cambian de pestaña, mueven
+el slider de cantidad, filtran por categoría y compran de vez en cuando
+
+Ejecutar con: python scripts/benchmark_recommendation_cache.py [--reruns 20000] [--sessions 200]
+"""
+import time
+import argparse
+import _bench_utils  # noqa: F401 (agrega la raíz del repositorio a sys.path)
+
+import numpy as np
+
+PURCHASE_PROBABILITY = 0.02
+CATEGORY_CHANGE_PROBABILITY = 0.05
+
+
+def simulate(model, products, user_ids, reruns, cache, seed=42):
+    """
+    Ejecuta los reruns y devuelve la latencia (ms) de cada uno
+
+    Args:
+        model: ProductRecommendationANN cargado
+        products: Catálogo completo
+        user_ids: Usuarios de las sesiones simuladas
+        reruns: Número total de reruns
+        cache: RecommendationCache o None (sin caché)
+    """
+    from config.settings import RECOMMENDATION_CACHE_CONFIG
+
+    rng = np.random.default_rng(seed)
+    categories = [None] + sorted(products['category'].unique())
+    session_category = {user_id: None for user_id in user_ids}
+    purchased = {user_id: [] for user_id in user_ids}
+    latencies = np.empty(reruns)
+
+    for i in range(reruns):
+        user_id = user_ids[rng.integers(len(user_ids))]
+        if rng.random() < CATEGORY_CHANGE_PROBABILITY:
+            session_category[user_id] = categories[rng.integers(len(categories))]
+        category = session_category[user_id]
+        top_n = int(rng.integers(6, 19))
+        candidates = products if category is None else products[products['category'] == category]
+
+        start = time.perf_counter()
+        result = cache.get(user_id, category, 'live', model.version, top_n) if cache is not None else None
+        if result is None:
+            depth = max(top_n, RECOMMENDATION_CACHE_CONFIG['depth']) if cache is not None else top_n
+            ranked = model.recommend_products(user_id, candidates, depth, purchased[user_id])
+            if cache is not None:
+                cache.put(user_id, category, 'live', model.version, ranked, depth)
+            result = ranked.head(top_n)
+        latencies[i] = (time.perf_counter() - start) * 1000
+
+        if rng.random() < PURCHASE_PROBABILITY and len(result):
+            purchased[user_id].append(result['product_id'].iloc[0])
+            if cache is not None:
+                cache.invalidate_user(user_id)
+
+    return latencies
+
+
+def report(label, latencies):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{label:<12} media {latencies.mean():6.3f} ms | p50 {p50:6.3f} ms | p99 {p99:6.3f} ms")
+
+
+def run_benchmark(reruns, sessions):
+    from src.model import ProductRecommendationANN
+    from src.recommendation_cache import RecommendationCache
+    from src.data_store import load_table
+    from config.settings import MODEL_CONFIG
+
+    model = ProductRecommendationANN(n_users=1, n_products=1)
+    model.load_model(MODEL_CONFIG['model_path'])
+    model.build_popularity(load_table('interactions', columns=['product_id', 'category', 'rating']))
+    products = load_table('products')
+    user_ids = model.user_encoder.classes_[:sessions]
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Caché de recomendaciones ({reruns:,} reruns, {len(user_ids)} sesiones)")
+    print("=" * 60)
+
+    report('sin caché', simulate(model, products, user_ids, reruns, None))
+
+    cache = RecommendationCache()
+    report('con caché', simulate(model, products, user_ids, reruns, cache))
+
+    stats = cache.stats()
+    print(f"\n🎯 Tasa de aciertos: {stats['hit_rate']:.1%} "
+          f"({stats['hits']:,} aciertos / {stats['misses']:,} fallos, "
+          f"{stats['invalidations']:,} invalidaciones por compra)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de la caché de recomendaciones')
+    parser.add_argument('--reruns', type=int, default=20_000)
+    parser.add_argument('--sessions', type=int, default=200)
+    args = parser.parse_args()
+
+    run_benchmark(args.reruns, args.sessions)
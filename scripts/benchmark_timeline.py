@@ -0,0 +1,70 @@
+"""
+Consultas temporales: cadenas de fecha parseadas en cada render frente al
+dataset de interacciones con epoch_day particionado por mes
+Mide la serie mensual global, un rango de 30 días y la línea de tiempo de
+un usuario (desde epoch_day de su historial en memoria, como el perfil)
+
+Ejecutar con: python scripts/benchmark_timeline.py [--rows 10000000] [--years 5]
+"""
+import time
+import argparse
+import tempfile
+from _bench_utils import timed, report, write_interactions, FIXTURE_END_DATE
+
+import numpy as np
+import pandas as pd
+
+
+def run_benchmark(n_rows, years):
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Consultas temporales con {n_rows:,} interacciones ({years} años)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_interactions(tmp, n_rows, history_days=365 * years)
+
+        from src.data_store import (load_table, import_timeline, monthly_totals, load_interactions_range,
+                                    epoch_months)
+
+        start = time.perf_counter()
+        import_timeline()
+        print(f"\n🏗️  Escritura particionada por mes: {time.perf_counter() - start:.1f} s (una sola vez)\n")
+
+        interactions = load_table('interactions', columns=['user_id', 'total_spent', 'purchase_date', 'epoch_day'])
+
+        def legacy_monthly():
+            dates = pd.to_datetime(interactions['purchase_date'])
+            return interactions.groupby(dates.dt.to_period('M'))['total_spent'].agg(['size', 'sum'])
+
+        report('Serie mensual global', timed(legacy_monthly), timed(monthly_totals), 'cadenas', 'particionado')
+
+        last_day = FIXTURE_END_DATE
+        first_day = str(np.datetime64(FIXTURE_END_DATE) - 29)
+
+        def legacy_range():
+            dates = pd.to_datetime(interactions['purchase_date'])
+            return interactions[(dates >= first_day) & (dates <= last_day)]
+
+        report('Rango de 30 días', timed(legacy_range),
+               timed(lambda: load_interactions_range(first_day, last_day)), 'cadenas', 'particionado')
+
+        def legacy_user():
+            user_purchases = interactions[interactions['user_id'] == 1]
+            dates = pd.to_datetime(user_purchases['purchase_date'])
+            return user_purchases.groupby(dates.dt.to_period('M')).size()
+
+        # El perfil ya tiene el historial del usuario en memoria: basta epoch_day
+        def epoch_user():
+            user_purchases = interactions[interactions['user_id'] == 1]
+            return pd.Series(epoch_months(user_purchases['epoch_day'])).value_counts().sort_index()
+
+        report('Línea de tiempo de un usuario', timed(legacy_user), timed(epoch_user), 'cadenas', 'epoch_day')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark de consultas temporales')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--years', type=int, default=5)
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.years)
@@ -0,0 +1,80 @@
+"""
+Pico de memoria y muestras/s: entrenamiento en memoria frente a streaming
+Cada modo se ejecuta en un proceso nuevo para aislar el pico de memoria
+
+Ejecutar con: python scripts/benchmark_training.py [--sizes 1000000 4000000]
+"""
+import os
+import json
+import argparse
+import tempfile
+from _bench_utils import run_child, write_interactions
+
+import pandas as pd
+
+DEFAULT_SIZES = [1_000_000, 4_000_000]
+N_USERS = 100_000
+BATCH_SIZE = 1024
+EPOCHS = 2
+
+
+def measure(mode, csv_file):
+    """Se ejecuta en el proceso hijo: entrena e imprime métricas por época"""
+    from config.settings import DATA_CONFIG
+    from src.model import ProductRecommendationANN
+    from src.training_data import peak_rss_mb
+
+    DATA_CONFIG['interactions_path'] = csv_file
+    model = ProductRecommendationANN(n_users=1, n_products=1)
+
+    if mode == 'streaming':
+        shard_dir = os.path.join(os.path.dirname(csv_file), 'shards')
+        history = model.train_streaming(epochs=EPOCHS, batch_size=BATCH_SIZE,
+                                        shard_dir=shard_dir, verbose=0)
+        samples_per_sec = history.history['samples_per_sec']
+    else:
+        from src.training_data import EpochThroughputCallback
+        interactions = pd.read_csv(csv_file)
+        model.n_users = interactions['user_id'].nunique()
+        model.n_products = interactions['product_id'].nunique()
+        throughput = EpochThroughputCallback(int(len(interactions) * 0.8))
+        model._training_callbacks = lambda: [throughput]
+        history = model.train(interactions, epochs=EPOCHS, batch_size=BATCH_SIZE, verbose=0)
+        samples_per_sec = history.history['samples_per_sec']
+
+    print(json.dumps({'samples_per_sec': samples_per_sec, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def run_measure(mode, csv_file):
+    return run_child([os.path.abspath(__file__), '--measure', mode, csv_file])
+
+
+def run_benchmark(sizes):
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Entrenamiento ({EPOCHS} épocas, batch {BATCH_SIZE})")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            csv_file = write_interactions(tmp, n_rows, n_users=N_USERS, file_format='csv')
+            csv_mb = os.path.getsize(csv_file) / 1024 ** 2
+
+            print(f"\n📂 {n_rows:,} interacciones (CSV {csv_mb:,.0f} MB)")
+            for name, mode in [('En memoria (train)', 'memory'), ('Streaming (train_streaming)', 'streaming')]:
+                result = run_measure(mode, csv_file)
+                epochs = ' | '.join(f"{sps:,.0f}" for sps in result['samples_per_sec'])
+                print(f"   - {name}: pico {result['peak_rss_mb']:,.0f} MB | muestras/s por época: {epochs}")
+
+            os.remove(csv_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark del entrenamiento')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--measure', nargs=2, metavar=('MODE', 'CSV'))
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+    else:
+        run_benchmark(args.sizes)
@@ -0,0 +1,134 @@
+"""
+Prueba de carga del servicio HTTP de recomendaciones
+Levanta python -m src.serving con N workers, lo bombardea con clientes
+concurrentes y reporta latencia p50/p95/p99 y QPS por núcleo
+
+Ejecutar con: python scripts/load_test_serving.py [--workers 1 2 4] [--clients 8] [--seconds 10]
+"""
+import sys
+import os
+import time
+import json
+import signal
+import argparse
+import subprocess
+import http.client
+import multiprocessing as mp
+from _bench_utils import ROOT
+
+import numpy as np
+
+HOST = '127.0.0.1'
+STARTUP_TIMEOUT_S = 120
+
+
+def wait_until_ready(port, process):
+    """Espera a que /health responda o a que el servidor termine"""
+    deadline = time.time() + STARTUP_TIMEOUT_S
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"El servicio terminó con código {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("El servicio no respondió a tiempo")
+
+
+def client_loop(port, user_ids, seconds, top_n, precomputed, seed, results):
+    """Un cliente: peticiones secuenciales sobre una conexión por petición"""
+    rng = np.random.default_rng(seed)
+    latencies = []
+    errors = 0
+    suffix = '&precomputed=1' if precomputed else ''
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        user_id = int(rng.choice(user_ids))
+        start = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection(HOST, port, timeout=10)
+            conn.request('GET', f'/recommend?user_id={user_id}&top_n={top_n}{suffix}')
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status != 200:
+                errors += 1
+                continue
+        except OSError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+
+    results.put((latencies, errors))
+
+
+def run_load(port, workers, clients, seconds, top_n, precomputed, user_ids):
+    """Levanta el servicio, aplica la carga y lo detiene"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.serving', '--workers', str(workers), '--port', str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(port, process)
+
+        results = mp.Queue()
+        procs = [mp.Process(target=client_loop,
+                            args=(port, user_ids, seconds, top_n, precomputed, seed, results))
+                 for seed in range(clients)]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        collected = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+    latencies = np.concatenate([np.asarray(lat) for lat, _ in collected]) * 1000
+    errors = sum(err for _, err in collected)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    qps = len(latencies) / elapsed
+
+    return {'workers': workers, 'requests': len(latencies), 'errors': errors, 'qps': qps,
+            'qps_per_worker': qps / workers, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+
+
+def run_benchmark(worker_counts, clients, seconds, top_n, precomputed, port):
+    from src.data_store import load_table
+
+    print("=" * 60)
+    print(f"⏱️  PRUEBA DE CARGA - {clients} clientes, {seconds} s por configuración")
+    print(f"   Núcleos disponibles: {os.cpu_count()} | "
+          f"modo: {'precalculado' if precomputed else 'scoring en vivo'}")
+    print("=" * 60)
+
+    user_ids = load_table('interactions', columns=['user_id'])['user_id'].unique()
+
+    rows = []
+    for workers in worker_counts:
+        row = run_load(port, workers, clients, seconds, top_n, precomputed, user_ids)
+        rows.append(row)
+        print(f"\n👷 {workers} workers: {row['qps']:,.0f} QPS ({row['qps_per_worker']:,.0f} por worker) | "
+              f"p50 {row['p50_ms']:.1f} ms | p95 {row['p95_ms']:.1f} ms | p99 {row['p99_ms']:.1f} ms | "
+              f"errores {row['errors']}")
+
+    print("\n" + json.dumps(rows, indent=2, default=float))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Prueba de carga del servicio de recomendaciones')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--precomputed', action='store_true')
+    parser.add_argument('--port', type=int, default=8611)
+    args = parser.parse_args()
+
+    run_benchmark(args.workers, args.clients, args.seconds, args.top_n, args.precomputed, args.port)
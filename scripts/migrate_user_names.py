@@ -0,0 +1,53 @@
+"""
+Migración única de nombres de usuario
+Guarda el nombre que el generador anterior (np.random.seed por usuario)
+asignaba a cada usuario existente, para que no cambie con el generador por hash
+"""
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from src.utils import NOMBRES, APELLIDOS
+from config.settings import DATA_CONFIG
+
+
+def legacy_user_name(user_id):
+    """Nombre del generador anterior, sin modificar el estado global de np.random"""
+    rng = np.random.RandomState(user_id)
+    nombre = rng.choice(NOMBRES)
+    apellido = rng.choice(APELLIDOS)
+    return f"{nombre} {apellido}"
+
+
+def migrate_user_names():
+    """Crea la tabla de nombres para todos los usuarios conocidos"""
+    os.chdir(ROOT)
+    user_ids = set(pd.read_csv(DATA_CONFIG['interactions_path'], usecols=['user_id'])['user_id'])
+    user_ids |= set(pd.read_csv(DATA_CONFIG['user_stats_path'], usecols=['user_id'])['user_id'])
+    if os.path.exists(DATA_CONFIG['user_balances_path']):
+        user_ids |= set(pd.read_csv(DATA_CONFIG['user_balances_path'], usecols=['user_id'])['user_id'])
+
+    if os.path.exists(DATA_CONFIG['user_names_path']):
+        # Nunca renombrar usuarios ya migrados
+        existing = pd.read_csv(DATA_CONFIG['user_names_path'])
+        user_ids -= set(existing['user_id'])
+    else:
+        existing = pd.DataFrame(columns=['user_id', 'user_name'])
+
+    migrated = pd.DataFrame({
+        'user_id': sorted(int(user_id) for user_id in user_ids),
+    })
+    migrated['user_name'] = [legacy_user_name(user_id) for user_id in migrated['user_id']]
+
+    table = pd.concat([existing, migrated], ignore_index=True).sort_values('user_id')
+    table.to_csv(DATA_CONFIG['user_names_path'], index=False)
+
+    print(f"✅ Nombres conservados para {len(migrated)} usuarios")
+    print(f"📁 Archivo guardado: {DATA_CONFIG['user_names_path']} ({len(table)} usuarios)")
+
+
+if __name__ == "__main__":
+    migrate_user_names()
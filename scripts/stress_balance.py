@@ -0,0 +1,102 @@
+"""
+Prueba de estrés de concurrencia para los backends de saldo
+Lanza muchas sesiones en paralelo (procesos x hilos) que debitan el mismo
+usuario y verifica que no se pierdan actualizaciones
+
+Ejecutar con: python scripts/stress_balance.py
+"""
+import sys
+import os
+import time
+import tempfile
+import threading
+from multiprocessing import Pool
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.components.balance_store import SQLiteBalanceStore, CSVBalanceStore
+
+N_PROCESSES = 8
+N_THREADS = 8
+DEBITS_PER_SESSION = 25
+AMOUNT = 1.0
+USER_ID = 1
+
+
+def open_store(backend, path):
+    if backend == 'sqlite':
+        return SQLiteBalanceStore(path, initial_balance=0.0)
+    return CSVBalanceStore(path, initial_balance=0.0)
+
+
+def run_sessions(args):
+    """Un proceso con N_THREADS sesiones debitando en paralelo"""
+    backend, path = args
+    store = open_store(backend, path)
+    successes = []
+
+    def session():
+        count = 0
+        for _ in range(DEBITS_PER_SESSION):
+            try:
+                ok, _ = store.debit(USER_ID, AMOUNT)
+                count += ok
+            except Exception:
+                pass
+        successes.append(count)
+
+    threads = [threading.Thread(target=session) for _ in range(N_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return sum(successes)
+
+
+def stress(backend, initial_balance):
+    """
+    Ejecuta todas las sesiones y compara el saldo final con los débitos aceptados
+
+    Returns:
+        (aceptados, saldo_final, esperado, segundos)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'balances.db' if backend == 'sqlite' else 'balances.csv')
+        open_store(backend, path).set(USER_ID, initial_balance)
+
+        start = time.perf_counter()
+        with Pool(N_PROCESSES) as pool:
+            accepted = sum(pool.map(run_sessions, [(backend, path)] * N_PROCESSES))
+        elapsed = time.perf_counter() - start
+
+        final_balance = open_store(backend, path).get(USER_ID)
+
+    return accepted, final_balance, initial_balance - accepted * AMOUNT, elapsed
+
+
+def run_stress_test():
+    total = N_PROCESSES * N_THREADS * DEBITS_PER_SESSION
+
+    print("=" * 60)
+    print("🧪 ESTRÉS DE CONCURRENCIA - Saldos")
+    print(f"   {N_PROCESSES} procesos x {N_THREADS} hilos x {DEBITS_PER_SESSION} débitos = {total}")
+    print("=" * 60)
+
+    scenarios = [
+        ('Saldo suficiente', float(total)),
+        ('Saldo para la mitad', float(total // 2)),
+    ]
+
+    for backend in ('sqlite', 'csv'):
+        print(f"\n💾 Backend: {backend}")
+        for name, initial_balance in scenarios:
+            accepted, final_balance, expected, elapsed = stress(backend, initial_balance)
+            consistent = abs(final_balance - expected) < 1e-6 and final_balance >= 0
+
+            print(f"   - {name}: {accepted} débitos aceptados, saldo final {final_balance:.2f}"
+                  f" (esperado {expected:.2f}) {'✅' if consistent else '❌ actualizaciones perdidas'}"
+                  f" | {total / elapsed:,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    run_stress_test()
@@ -0,0 +1,122 @@
+"""
+Índice aproximado de candidatos (IVF) sobre la torre de productos
+Agrupa los productos con k-means en NumPy para preseleccionar unos pocos
+cientos de candidatos antes del scoring denso
+"""
+
+import numpy as np
+
+
+class IVFCandidateIndex:
+    """
+    Índice de listas invertidas (IVF) para recuperación de candidatos
+
+    Cada producto se asigna al centroide más cercano de su vector en
+    product_tower. En consulta, los centroides se puntúan con el mismo
+    scorer denso que los productos y se recorren las listas de mayor a
+    menor score hasta reunir suficientes candidatos.
+    """
+
+    def __init__(self, n_lists=None, n_iter=10, sample_per_list=256, seed=42):
+        """
+        Inicializa el índice
+
+        Args:
+            n_lists: Número de listas (por defecto ~sqrt(n_productos))
+            n_iter: Iteraciones de k-means
+            sample_per_list: Muestras por lista usadas para entrenar k-means
+            seed: Semilla del generador aleatorio
+        """
+        self.n_lists = n_lists
+        self.n_iter = n_iter
+        self.sample_per_list = sample_per_list
+        self.seed = seed
+        self.centroids = None
+        self.list_offsets = None
+        self.list_items = None
+
+    def fit(self, vectors):
+        """
+        Entrena los centroides y construye las listas invertidas
+
+        Args:
+            vectors: Matriz (n_productos, dim), una fila por producto codificado
+
+        Returns:
+            self
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_items = len(vectors)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n_items)))
+        n_lists = min(n_lists, n_items)
+        rng = np.random.default_rng(self.seed)
+
+        # k-means sobre una muestra para acotar el costo de entrenamiento
+        sample_size = min(n_items, n_lists * self.sample_per_list)
+        sample = vectors[rng.choice(n_items, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignments = self._assign(sample, centroids)
+            counts = np.bincount(assignments, minlength=n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+
+            # Las listas vacías conservan su centroide anterior
+            non_empty = counts > 0
+            centroids[non_empty] = sums[non_empty] / counts[non_empty, None]
+
+        # Listas invertidas en formato CSR: items ordenados por lista
+        assignments = self._assign(vectors, centroids)
+        self.list_items = np.argsort(assignments, kind='stable')
+        self.list_offsets = np.concatenate((
+            [0], np.cumsum(np.bincount(assignments, minlength=n_lists))
+        ))
+        self.centroids = centroids
+        self.n_lists = n_lists
+
+        return self
+
+    @staticmethod
+    def _assign(vectors, centroids, chunk_size=65536):
+        """Asigna cada vector a su centroide más cercano (distancia euclídea)"""
+        centroid_norms = (centroids ** 2).sum(axis=1)
+        assignments = np.empty(len(vectors), dtype=np.int64)
+
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            distances = centroid_norms - 2 * chunk @ centroids.T
+            assignments[start:start + chunk_size] = distances.argmin(axis=1)
+
+        return assignments
+
+    def shortlist(self, centroid_scores, n_candidates, allowed=None):
+        """
+        Preselecciona candidatos recorriendo las listas mejor puntuadas
+
+        Args:
+            centroid_scores: Score del usuario para cada centroide
+            n_candidates: Número mínimo de candidatos a reunir
+            allowed: Máscara booleana opcional sobre productos codificados
+
+        Returns:
+            Arreglo con índices codificados de los candidatos
+        """
+        collected = []
+        total = 0
+
+        for list_id in np.argsort(-centroid_scores):
+            items = self.list_items[self.list_offsets[list_id]:self.list_offsets[list_id + 1]]
+            if allowed is not None:
+                items = items[allowed[items]]
+
+            collected.append(items)
+            total += len(items)
+
+            if total >= n_candidates:
+                break
+
+        if not collected:
+            return np.empty(0, dtype=np.int64)
+
+        return np.concatenate(collected)
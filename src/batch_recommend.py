@@ -0,0 +1,267 @@
+"""
+Job offline de recomendaciones para todos los usuarios
+Calcula el top-N de cada usuario en un barrido vectorizado y lo guarda en
+arreglos .npy que la app abre con memoria mapeada
+
+Ejecutar con: python -m src.batch_recommend
+"""
+
+import numpy as np
+import pandas as pd
+import joblib
+import os
+import time
+import argparse
+from datetime import datetime
+from src.data_store import load_table
+from config.settings import MODEL_CONFIG
+
+BATCH_DIR = 'batch'
+PRODUCTS_FILE = 'top_products.npy'
+SCORES_FILE = 'top_scores.npy'
+META_FILE = 'meta.pkl'
+
+
+class BatchRecommendationStore:
+    """
+    Resultados del job offline abiertos con memoria mapeada
+
+    La fila i de cada arreglo corresponde al usuario codificado i, por lo
+    que una consulta es un acceso directo sin leer el archivo completo.
+    meta.pkl guarda la versión del modelo y el user_id de cada fila para
+    no servir el ranking de otro usuario tras un reentrenamiento.
+    """
+
+    def __init__(self, filepath):
+        """
+        Abre los arreglos generados por run_batch_job
+
+        Args:
+            filepath: Carpeta con top_products.npy, top_scores.npy y meta.pkl
+        """
+        self.products = np.load(os.path.join(filepath, PRODUCTS_FILE), mmap_mode='r')
+        self.scores = np.load(os.path.join(filepath, SCORES_FILE), mmap_mode='r')
+        self.meta = joblib.load(os.path.join(filepath, META_FILE))
+        self.user_ids = self.meta.get('user_ids')
+
+    def matches(self, model):
+        """
+        Indica si los resultados se calcularon con este modelo
+
+        Args:
+            model: Modelo cargado (RecommendationRuntime o ProductRecommendationANN)
+
+        Returns:
+            True si coinciden la versión y los usuarios de cada fila
+        """
+        if self.user_ids is None or self.meta.get('model_version') != model.version:
+            return False
+
+        # El encoder solo agrega usuarios al final: las filas guardadas son un prefijo
+        classes = model.user_encoder.classes_
+        return len(self.user_ids) <= len(classes) and np.array_equal(self.user_ids, classes[:len(self.user_ids)])
+
+    def lookup(self, user_encoded, user_id=None):
+        """
+        Obtiene el ranking precalculado de un usuario
+
+        Args:
+            user_encoded: Índice codificado del usuario
+            user_id: ID esperado en esa fila (si se indica, se comprueba)
+
+        Returns:
+            (product_ids, scores) ordenados por score, o None si no existe
+        """
+        if user_encoded >= len(self.products):
+            return None
+        if user_id is not None and (self.user_ids is None or self.user_ids[user_encoded] != user_id):
+            return None
+
+        product_ids = np.asarray(self.products[user_encoded])
+        valid = product_ids >= 0
+        return product_ids[valid], np.asarray(self.scores[user_encoded])[valid]
+
+
+def load_batch_store(filepath=None, model=None):
+    """
+    Abre el almacén de recomendaciones precalculadas si existe
+
+    Args:
+        filepath: Carpeta del job (por defecto models/.../batch)
+        model: Modelo cargado; si se indica, se descarta un almacén
+            calculado con otra versión del modelo
+
+    Returns:
+        BatchRecommendationStore o None si el job no se ha ejecutado o no
+        corresponde al modelo
+    """
+    filepath = filepath or os.path.join(MODEL_CONFIG['model_path'], BATCH_DIR)
+
+    if not os.path.exists(os.path.join(filepath, META_FILE)):
+        return None
+
+    store = BatchRecommendationStore(filepath)
+    if model is not None and not store.matches(model):
+        print("⚠️  Recomendaciones precalculadas de otra versión del modelo: se usará scoring en vivo")
+        return None
+
+    return store
+
+
+def recommend_with_store(model, store, user_id, products_df, top_n=10, exclude_purchased=None):
+    """
+    Sirve recomendaciones desde el almacén offline con respaldo en vivo
+
+    Usa el ranking precalculado si se calculó con la versión actual del
+    modelo, la fila corresponde al usuario y quedan suficientes productos
+    tras aplicar filtros; en otro caso delega en model.recommend_products.
+
+    Args:
+        model: ProductRecommendationANN cargado
+        store: BatchRecommendationStore o None
+        user_id: ID del usuario
+        products_df: DataFrame con productos (posiblemente filtrado por categoría)
+        top_n: Número de recomendaciones a retornar
+        exclude_purchased: Lista de product_ids ya comprados (opcional)
+
+    Returns:
+        DataFrame con el mismo formato que recommend_products
+    """
+    user_encoded, known = model.encode_ids(model.user_encoder, [user_id])
+    stored = None
+    if store is not None and known[0] and store.meta.get('model_version') == model.version:
+        stored = store.lookup(user_encoded[0], user_id)
+
+    if stored is not None:
+        product_ids, scores = stored
+        keep = np.isin(product_ids, products_df['product_id'].values)
+        if exclude_purchased is not None:
+            keep &= ~np.isin(product_ids, exclude_purchased)
+
+        # Un ranking completo es exacto aunque queden menos de top_n productos
+        if keep.sum() >= top_n or store.meta['complete']:
+            recommendations = pd.DataFrame({
+                'product_id': product_ids[keep][:top_n],
+                'predicted_rating': np.clip(scores[keep][:top_n], 0, 5)
+            })
+            return recommendations.merge(
+                products_df[['product_id', 'product_name', 'category', 'price']],
+                on='product_id',
+                how='left'
+            )
+
+    return model.recommend_products(
+        user_id=user_id,
+        products_df=products_df,
+        top_n=top_n,
+        exclude_purchased=exclude_purchased
+    )
+
+
+def run_batch_job(model, interactions_df, top_n=50, chunk_users=1024, filepath=None):
+    """
+    Calcula y guarda el top-N de todos los usuarios conocidos por el modelo
+
+    Args:
+        model: ProductRecommendationANN con motor de inferencia
+        interactions_df: DataFrame con user_id y product_id para excluir compras
+        top_n: Número de productos guardados por usuario
+        chunk_users: Usuarios puntuados por bloque
+        filepath: Carpeta destino (por defecto models/.../batch)
+
+    Returns:
+        Ruta de la carpeta generada
+    """
+    filepath = filepath or os.path.join(MODEL_CONFIG['model_path'], BATCH_DIR)
+    os.makedirs(filepath, exist_ok=True)
+
+    engine = model.engine
+    n_users = len(model.user_encoder.classes_)
+    n_products = len(model.product_encoder.classes_)
+    product_classes = model.product_encoder.classes_
+    all_products = np.arange(n_products)
+    top_n = min(top_n, n_products)
+
+    # Compras previas como índices codificados (usuario, producto)
+    users_enc, users_known = model.encode_ids(model.user_encoder, interactions_df['user_id'].values)
+    products_enc, products_known = model.encode_ids(model.product_encoder, interactions_df['product_id'].values)
+    known = users_known & products_known
+    purchased_users, purchased_products = users_enc[known], products_enc[known]
+    order = np.argsort(purchased_users, kind='stable')
+    purchased_users, purchased_products = purchased_users[order], purchased_products[order]
+    offsets = np.searchsorted(purchased_users, np.arange(n_users + 1))
+
+    products_out = np.lib.format.open_memmap(
+        os.path.join(filepath, PRODUCTS_FILE), mode='w+',
+        dtype=product_classes.dtype, shape=(n_users, top_n)
+    )
+    scores_out = np.lib.format.open_memmap(
+        os.path.join(filepath, SCORES_FILE), mode='w+',
+        dtype=np.float32, shape=(n_users, top_n)
+    )
+
+    for start in range(0, n_users, chunk_users):
+        users = np.arange(start, min(start + chunk_users, n_users))
+        scores = engine.score_matrix(users, all_products)
+
+        # Excluir productos ya comprados
+        rows = np.repeat(users - start, np.diff(offsets[users[0]:users[-1] + 2]))
+        cols = purchased_products[offsets[users[0]]:offsets[users[-1] + 1]]
+        scores[rows, cols] = -np.inf
+
+        # Top-N por fila: selección parcial y orden dentro del top
+        top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        top_products = product_classes[top]
+        top_products[np.isneginf(top_scores)] = -1
+
+        products_out[users] = top_products
+        scores_out[users] = top_scores
+
+    products_out.flush()
+    scores_out.flush()
+
+    joblib.dump({
+        'n_users': n_users,
+        'n_products': n_products,
+        'top_n': top_n,
+        'complete': top_n == n_products,
+        'model_version': model.version,
+        'user_ids': np.array(model.user_encoder.classes_),
+        'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }, os.path.join(filepath, META_FILE))
+
+    return filepath
+
+
+def main():
+    """Punto de entrada del job offline"""
+    parser = argparse.ArgumentParser(description='Job offline de recomendaciones')
+    parser.add_argument('--top-n', type=int, default=MODEL_CONFIG['batch_top_n'])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🗂️  SISTEMA DE RECOMENDACIÓN - JOB OFFLINE")
+    print("=" * 60)
+
+    from src.model import ProductRecommendationANN
+
+    model = ProductRecommendationANN(n_users=1, n_products=1)
+    model.load_model(MODEL_CONFIG['model_path'])
+    interactions = load_table('interactions', columns=['user_id', 'product_id'])
+
+    start = time.perf_counter()
+    filepath = run_batch_job(model, interactions, top_n=args.top_n)
+    elapsed = time.perf_counter() - start
+
+    n_users = len(model.user_encoder.classes_)
+    print(f"✅ Top-{args.top_n} calculado para {n_users} usuarios en {elapsed:.2f} s")
+    print(f"💾 Resultados guardados en: {filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,697 @@
+"""
+Capa de acceso a datos columnar
+Guarda interactions, products y user_stats como Parquet tipado (columnas
+categóricas para category y product_name) y lee solo las columnas pedidas.
+Los CSV siguen siendo la fuente de importación. Las tablas cargadas se
+guardan en una caché compartida por todas las sesiones del proceso.
+
+Las interacciones llevan además la fecha como día desde 1970-01-01
+(epoch_day, int32) y se guardan particionadas por mes, para que las
+consultas por rango de fechas y los agregados mensuales lean solo los
+meses pedidos sin volver a parsear cadenas de fecha.
+"""
+import os
+import json
+import shutil
+import itertools
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from config.settings import DATA_CONFIG
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se coordinan los hilos del proceso
+    fcntl = None
+
+# Esquema tipado de cada tabla
+TABLE_SCHEMAS = {
+    'interactions': {
+        'user_id': 'int32',
+        'product_id': 'int32',
+        'product_name': 'category',
+        'category': 'category',
+        'rating': 'int8',
+        'purchase_count': 'int16',
+        'price': 'float64',
+        'total_spent': 'float64',
+        'purchase_date': 'string',
+        'epoch_day': 'int32'
+    },
+    'products': {
+        'product_id': 'int32',
+        'product_name': 'category',
+        'category': 'category',
+        'price': 'float64'
+    },
+    'user_stats': {
+        'user_id': 'int32',
+        'avg_rating': 'float64',
+        'total_purchases': 'int32',
+        'total_spent': 'float64',
+        'num_interactions': 'int32'
+    },
+    'user_names': {
+        'user_id': 'int32',
+        'user_name': 'string'
+    }
+}
+
+# Columnas que no vienen en el CSV: (columna de origen, función) que las
+# calcula una sola vez al importar
+DERIVED_COLUMNS = {
+    'interactions': {
+        'epoch_day': ('purchase_date', lambda dates: epoch_days(dates))
+    }
+}
+
+# Columnas del dataset de interacciones particionado por mes
+TIMELINE_COLUMNS = ['user_id', 'product_id', 'category', 'rating',
+                    'purchase_count', 'total_spent', 'epoch_day']
+
+_timeline_lock = threading.Lock()
+
+# Parquet cuyo esquema ya se comprobó (ruta -> versión del archivo)
+_schema_checked = {}
+
+
+class DataCache:
+    """
+    Caché de DataFrames compartida por todas las sesiones del proceso
+
+    Cada entrada guarda la versión (mtime y tamaño) de los archivos de los
+    que se cargó; si alguno cambia, la siguiente lectura recarga. Las
+    lecturas devuelven una copia para que una sesión no modifique los
+    datos de otra. Quien escribe puede parchear las entradas en lugar de
+    invalidarlas.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.patches = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def file_version(paths):
+        """Versión de un conjunto de archivos: (mtime_ns, tamaño) de cada uno"""
+        version = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                version.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def get(self, name, key, paths, loader):
+        """
+        Devuelve una copia del DataFrame en caché o lo carga con loader
+
+        Args:
+            name: Nombre de la fuente (p. ej. 'interactions')
+            key: Variante dentro de la fuente (p. ej. columnas pedidas)
+            paths: Archivos cuya versión valida la entrada
+            loader: Función sin argumentos que carga el DataFrame
+        """
+        version = self.file_version(paths)
+
+        with self._lock:
+            entry = self._entries.get((name, key))
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1].copy()
+            self.misses += 1
+
+        df = loader()
+
+        with self._lock:
+            self._entries[(name, key)] = (version, df)
+
+        return df.copy()
+
+    def patch(self, name, paths, previous_version, update):
+        """
+        Aplica una escritura conocida a las entradas de una fuente
+
+        Solo se parchean las entradas cargadas desde previous_version (la
+        versión de los archivos justo antes de escribir); el resto se
+        descarta porque alguien más modificó los archivos.
+
+        Args:
+            name: Nombre de la fuente
+            paths: Archivos de la fuente
+            previous_version: file_version(paths) antes de la escritura
+            update: Función DataFrame -> DataFrame con el cambio aplicado
+        """
+        version = self.file_version(paths)
+
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == name]:
+                entry_version, df = self._entries[key]
+                if entry_version == previous_version:
+                    self._entries[key] = (version, update(df))
+                    self.patches += 1
+                else:
+                    del self._entries[key]
+                    self.invalidations += 1
+
+    def invalidate(self, name=None):
+        """Descarta las entradas de una fuente (o todas)"""
+        with self._lock:
+            for key in [k for k in self._entries if name is None or k[0] == name]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def stats(self):
+        """Contadores de uso de la caché"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'patches': self.patches,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries)
+            }
+
+
+# Caché de datos compartida por todo el proceso
+DATA_CACHE = DataCache()
+
+
+def get_cache_stats():
+    """Contadores de aciertos y fallos de la caché de datos"""
+    return DATA_CACHE.stats()
+
+
+def csv_path(table):
+    """Ruta del CSV de origen de una tabla"""
+    return DATA_CONFIG[f'{table}_path']
+
+
+def parquet_path(table):
+    """Ruta del archivo Parquet de una tabla"""
+    return os.path.splitext(csv_path(table))[0] + '.parquet'
+
+
+def shard_manifest_path(table):
+    """Manifiesto de la tabla generada por shards (src.generate_data.write_sharded_data)"""
+    return os.path.join(os.path.splitext(csv_path(table))[0] + '_shards', 'manifest.json')
+
+
+def source_path(table):
+    """Fuente de importación de una tabla: el CSV o, sin él, el manifiesto de shards"""
+    source = csv_path(table)
+    if not os.path.exists(source) and os.path.exists(shard_manifest_path(table)):
+        return shard_manifest_path(table)
+    return source
+
+
+def read_csv_table(table, columns=None, path=None, chunksize=None):
+    """
+    Lee una tabla desde CSV aplicando el esquema tipado
+
+    Args:
+        table: Nombre de la tabla ('interactions', 'products', 'user_stats')
+        columns: Columnas a leer (por defecto todas)
+        path: Ruta alternativa del CSV
+        chunksize: Filas por bloque; si se indica devuelve un iterador
+
+    Returns:
+        DataFrame tipado (o iterador de DataFrames)
+    """
+    schema = TABLE_SCHEMAS[table]
+    derived = DERIVED_COLUMNS.get(table, {})
+
+    # Las columnas derivadas se calculan a partir de su columna de origen
+    wanted = [col for col in columns if col in derived] if columns is not None else list(derived)
+    usecols = None
+    if columns is not None:
+        usecols = [col for col in columns if col not in derived]
+        usecols += [derived[col][0] for col in wanted if derived[col][0] not in usecols]
+
+    dtypes = {col: dtype for col, dtype in schema.items()
+              if col not in derived and (usecols is None or col in usecols)}
+
+    def add_derived(df):
+        for col in wanted:
+            source, compute = derived[col]
+            df[col] = compute(df[source])
+        return df[columns] if columns is not None else df
+
+    reader = pd.read_csv(path or csv_path(table), usecols=usecols, dtype=dtypes, chunksize=chunksize)
+    if chunksize is not None:
+        return (add_derived(chunk) for chunk in reader)
+    return add_derived(reader)
+
+
+def import_csv(table, path=None):
+    """
+    Importa el CSV de una tabla al formato columnar
+
+    Args:
+        table: Nombre de la tabla
+        path: Ruta alternativa del CSV
+
+    Returns:
+        Ruta del archivo Parquet generado
+    """
+    df = read_csv_table(table, path=path)
+    target = parquet_path(table)
+    tmp_path = f'{target}.tmp'
+
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, target)
+
+    return target
+
+
+def import_shards(table):
+    """
+    Une los shards Parquet de una tabla en su archivo Parquet
+
+    Los shards se copian row group a row group, sin cargarlos completos.
+
+    Args:
+        table: Nombre de la tabla
+
+    Returns:
+        Ruta del archivo Parquet generado
+    """
+    manifest_path = shard_manifest_path(table)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    target = parquet_path(table)
+    tmp_path = f'{target}.tmp'
+    shard_dir = os.path.dirname(manifest_path)
+    writer = None
+    try:
+        for shard in manifest['shards']:
+            parquet = pq.ParquetFile(os.path.join(shard_dir, shard['file']))
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, parquet.schema_arrow)
+            for group in range(parquet.num_row_groups):
+                writer.write_table(parquet.read_row_group(group))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_path, target)
+    return target
+
+
+def import_source(table):
+    """Importa la tabla desde su fuente (CSV o shards) al formato columnar"""
+    if source_path(table) == shard_manifest_path(table):
+        return import_shards(table)
+    return import_csv(table)
+
+
+def _parquet_is_current(table):
+    """El Parquet existe y no es más antiguo que su fuente (CSV o shards)"""
+    target = parquet_path(table)
+    if not os.path.exists(target):
+        return False
+
+    source = source_path(table)
+    if not os.path.exists(source):
+        return True
+    if os.path.getmtime(target) < os.path.getmtime(source):
+        return False
+
+    # Un Parquet importado antes de añadir columnas derivadas se reimporta.
+    # El esquema se lee una vez por versión del archivo, no en cada carga
+    version = DATA_CACHE.file_version([target])
+    if _schema_checked.get(target) != version:
+        if not set(DERIVED_COLUMNS.get(table, {})) <= set(pq.read_schema(target).names):
+            return False
+        _schema_checked[target] = version
+    return True
+
+
+def load_table(table, columns=None):
+    """
+    Carga una tabla (o un subconjunto de columnas) en formato tipado
+
+    Lee el Parquet si está al día; si no, importa primero el CSV (o los
+    shards de write_sharded_data si no hay CSV). El
+    resultado se sirve desde DATA_CACHE mientras los archivos no cambien.
+
+    Args:
+        table: Nombre de la tabla
+        columns: Lista de columnas a cargar (por defecto todas)
+
+    Returns:
+        DataFrame tipado (copia propia del llamador)
+    """
+    key = tuple(columns) if columns is not None else None
+
+    if not _parquet_is_current(table):
+        try:
+            import_source(table)
+        except OSError:
+            # Carpeta de solo lectura: leer directamente del CSV
+            return DATA_CACHE.get(
+                table, key, [csv_path(table)],
+                lambda: read_csv_table(table, columns)
+            )
+
+    return DATA_CACHE.get(
+        table, key, [parquet_path(table)],
+        lambda: pd.read_parquet(parquet_path(table), columns=columns)
+    )
+
+
+def iter_table_batches(table, columns=None, batch_rows=1_000_000):
+    """
+    Recorre una tabla por bloques sin cargarla completa en memoria
+
+    Lee el Parquet si está al día y, si no, el CSV de origen por bloques
+    (sin importarlo, ya que la importación carga la tabla entera). Los
+    shards sí se importan antes, porque se copian por row groups.
+
+    Args:
+        table: Nombre de la tabla
+        columns: Columnas a leer (por defecto todas)
+        batch_rows: Filas máximas por bloque
+
+    Yields:
+        DataFrames tipados de hasta batch_rows filas
+    """
+    if not _parquet_is_current(table) and source_path(table) == shard_manifest_path(table):
+        import_shards(table)
+
+    if _parquet_is_current(table):
+        parquet = pq.ParquetFile(parquet_path(table))
+        for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from read_csv_table(table, columns, chunksize=batch_rows)
+
+
+def epoch_days(dates):
+    """
+    Convierte fechas ISO ('YYYY-MM-DD' o con hora) a días desde 1970-01-01
+
+    Args:
+        dates: Serie o arreglo de cadenas de fecha
+
+    Returns:
+        Arreglo int32 de días
+    """
+    parsed = pd.to_datetime(pd.Series(dates), format='ISO8601').to_numpy()
+    return parsed.astype('datetime64[D]').astype(np.int32)
+
+
+def day_number(date):
+    """Día desde 1970-01-01 de una fecha (cadena, date, Timestamp o entero)"""
+    if isinstance(date, (int, np.integer)):
+        return int(date)
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+
+def epoch_months(epoch_day):
+    """Mes (meses desde 1970-01) de cada epoch_day, sin pasar por cadenas"""
+    days = np.asarray(epoch_day, dtype=np.int64).astype('datetime64[D]')
+    return days.astype('datetime64[M]').astype(np.int32)
+
+
+def month_labels(months):
+    """Etiquetas 'YYYY-MM' de índices de mes devueltos por epoch_months"""
+    return np.datetime_as_string(np.asarray(months, dtype=np.int64).astype('datetime64[M]'))
+
+
+def timeline_path():
+    """
+    Carpeta raíz del dataset de interacciones particionado por mes
+
+    Cada reconstrucción se escribe en una versión nueva (vNNNNNN) y el
+    archivo CURRENT apunta a la vigente; se cambia con os.replace, así
+    otro proceso ve la versión anterior completa o la nueva completa,
+    nunca una carpeta a medio borrar.
+    """
+    return os.path.splitext(csv_path('interactions'))[0] + '_by_month'
+
+
+def interactions_source_version():
+    """Versión de la fuente de interactions (CSV o, sin él, el Parquet): si cambia, los derivados se reconstruyen"""
+    source = csv_path('interactions')
+    if not os.path.exists(source):
+        source = parquet_path('interactions')
+    return repr(DATA_CACHE.file_version([source]))
+
+
+def _timeline_pointer():
+    return os.path.join(timeline_path(), 'CURRENT')
+
+
+def _read_pointer():
+    """Nombre de la versión a la que apunta CURRENT (None si no hay)"""
+    try:
+        with open(_timeline_pointer()) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _current_timeline():
+    """
+    Carpeta de la versión vigente del dataset particionado
+
+    Returns:
+        Ruta de la versión o None si no existe o se construyó desde otra
+        versión de la fuente
+    """
+    name = _read_pointer()
+    if name is None:
+        return None
+
+    version_dir = os.path.join(timeline_path(), name)
+    try:
+        # Los archivos que empiezan por '_' no forman parte del dataset
+        with open(os.path.join(version_dir, '_SOURCE')) as f:
+            return version_dir if f.read() == interactions_source_version() else None
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _timeline_file_lock():
+    """Bloqueo exclusivo entre procesos (fcntl) para reconstruir el dataset particionado"""
+    os.makedirs(timeline_path(), exist_ok=True)
+    with open(os.path.join(timeline_path(), 'LOCK'), 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _timeline_batches(batch_rows):
+    """Bloques de interactions con la columna de partición 'month'"""
+    for batch in iter_table_batches('interactions', TIMELINE_COLUMNS, batch_rows):
+        batch['category'] = batch['category'].astype(str)
+        months, codes = np.unique(epoch_months(batch['epoch_day']), return_inverse=True)
+        batch['month'] = pd.Categorical.from_codes(codes, month_labels(months))
+        yield from pa.Table.from_pandas(batch, preserve_index=False).to_batches()
+
+
+def import_timeline(batch_rows=1_000_000, row_group_rows=131_072):
+    """
+    Escribe interactions particionado por mes (carpetas month=YYYY-MM)
+
+    Recorre la tabla por bloques, así no necesita cargarla completa. La
+    escritura toma el bloqueo de archivo, así dos procesos no reconstruyen
+    a la vez.
+
+    Args:
+        batch_rows: Filas por bloque
+        row_group_rows: Filas mínimas por row group de cada mes (cada
+            bloque se reparte entre todos los meses y sin acumular dejaría
+            row groups diminutos)
+
+    Returns:
+        Ruta de la carpeta de la nueva versión del dataset
+    """
+    with _timeline_file_lock():
+        return _write_timeline(batch_rows, row_group_rows)
+
+
+def _write_timeline(batch_rows=1_000_000, row_group_rows=131_072):
+    """Escribe una versión nueva del dataset y la publica (requiere el bloqueo de archivo)"""
+    if not _parquet_is_current('interactions') and os.path.exists(source_path('interactions')):
+        import_source('interactions')
+
+    version = interactions_source_version()
+    root = timeline_path()
+    previous = _read_pointer()
+    numbers = [int(name[1:]) for name in os.listdir(root) if name[:1] == 'v' and name[1:].isdigit()]
+    name = f'v{max(numbers, default=0) + 1:06d}'
+    target = os.path.join(root, name)
+
+    batches = _timeline_batches(batch_rows)
+    first = next(batches, None)
+    if first is None:
+        os.makedirs(target)
+    else:
+        ds.write_dataset(
+            itertools.chain([first], batches),
+            target, schema=first.schema, format='parquet',
+            partitioning=['month'], partitioning_flavor='hive',
+            basename_template='part-{i}.parquet',
+            min_rows_per_group=row_group_rows,
+            max_rows_per_group=max(row_group_rows, batch_rows)
+        )
+
+    with open(os.path.join(target, '_SOURCE'), 'w') as f:
+        f.write(version)
+
+    pointer_tmp = f'{_timeline_pointer()}.tmp'
+    with open(pointer_tmp, 'w') as f:
+        f.write(name)
+    os.replace(pointer_tmp, _timeline_pointer())
+
+    # La versión anterior se conserva hasta la próxima reconstrucción: un
+    # lector de otro proceso puede seguir recorriéndola. El resto (versiones
+    # viejas, escrituras interrumpidas, el formato sin versiones) se borra.
+    for entry in os.listdir(root):
+        if entry in (name, previous, 'CURRENT', 'LOCK'):
+            continue
+        path = os.path.join(root, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+    return target
+
+
+def _timeline_dataset():
+    """
+    Dataset particionado de interactions, reconstruido si la fuente cambió
+
+    En una carpeta de solo lectura se arma en memoria desde load_table:
+    mismas consultas, sin la poda de particiones.
+    """
+    with _timeline_lock:
+        version_dir = _current_timeline()
+        if version_dir is None:
+            try:
+                with _timeline_file_lock():
+                    # Otro proceso pudo reconstruirlo mientras se esperaba el bloqueo
+                    version_dir = _current_timeline() or _write_timeline()
+            except OSError:
+                df = load_table('interactions', columns=TIMELINE_COLUMNS)
+                df['category'] = df['category'].astype(str)
+                df['month'] = month_labels(epoch_months(df['epoch_day']))
+                return ds.dataset(pa.Table.from_pandas(df, preserve_index=False))
+
+    return ds.dataset(
+        version_dir, format='parquet',
+        partitioning=ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive')
+    )
+
+
+def _all_of(*conditions):
+    """Conjunción de expresiones de filtro, ignorando las None"""
+    expression = None
+    for condition in conditions:
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _timeline_filter(start=None, end=None, user_id=None):
+    """
+    Filtros de un rango de días (y usuario)
+
+    Returns:
+        (filtro de particiones por mes, filtro de filas); cualquiera puede
+        ser None si no restringe nada
+    """
+    months = []
+    rows = []
+    if start is not None:
+        start = day_number(start)
+        months.append(ds.field('month') >= str(month_labels(epoch_months([start]))[0]))
+        rows.append(ds.field('epoch_day') >= start)
+    if end is not None:
+        end = day_number(end)
+        months.append(ds.field('month') <= str(month_labels(epoch_months([end]))[0]))
+        rows.append(ds.field('epoch_day') <= end)
+    if user_id is not None:
+        rows.append(ds.field('user_id') == int(user_id))
+
+    return _all_of(*months), _all_of(*rows)
+
+
+def load_interactions_range(start=None, end=None, columns=None, user_id=None):
+    """
+    Carga las interacciones de un rango de fechas leyendo solo sus meses
+
+    Args:
+        start: Primer día incluido (fecha o epoch_day; por defecto sin límite)
+        end: Último día incluido (fecha o epoch_day; por defecto sin límite)
+        columns: Columnas de TIMELINE_COLUMNS a cargar (por defecto todas)
+        user_id: Limitar a un usuario
+
+    Returns:
+        DataFrame con las interacciones del rango
+    """
+    table = _timeline_dataset().to_table(
+        columns=columns or TIMELINE_COLUMNS,
+        filter=_all_of(*_timeline_filter(start, end, user_id))
+    )
+    return table.to_pandas()
+
+
+def monthly_totals(start=None, end=None, user_id=None):
+    """
+    Compras e ingresos por mes de un rango de fechas
+
+    Cada mes se agrega por separado leyendo solo total_spent (y las
+    columnas del filtro); el mes sale de la carpeta de la partición.
+
+    Args:
+        start: Primer día incluido (fecha o epoch_day)
+        end: Último día incluido (fecha o epoch_day)
+        user_id: Limitar a un usuario
+
+    Returns:
+        DataFrame con columnas month ('YYYY-MM'), purchases y total_spent
+    """
+    dataset = _timeline_dataset()
+    month_filter, row_filter = _timeline_filter(start, end, user_id)
+    totals = {}
+
+    if isinstance(dataset, ds.FileSystemDataset):
+        for fragment in dataset.get_fragments(filter=month_filter):
+            month = ds.get_partition_keys(fragment.partition_expression)['month']
+            spent = fragment.to_table(columns=['total_spent'], filter=row_filter)['total_spent']
+            purchases, total = totals.get(month, (0, 0.0))
+            totals[month] = (purchases + len(spent), total + (pc.sum(spent).as_py() or 0.0))
+    else:
+        # Dataset en memoria (carpeta de solo lectura): sin particiones
+        table = dataset.to_table(columns=['month', 'total_spent'],
+                                 filter=_all_of(month_filter, row_filter))
+        grouped = table.group_by('month').aggregate([('total_spent', 'count'), ('total_spent', 'sum')])
+        for row in grouped.to_pylist():
+            totals[row['month']] = (row['total_spent_count'], row['total_spent_sum'])
+
+    return pd.DataFrame(
+        [(month, purchases, total) for month, (purchases, total) in sorted(totals.items())
+         if purchases > 0],
+        columns=['month', 'purchases', 'total_spent']
+    )
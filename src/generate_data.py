@@ -1,20 +1,31 @@
 """
 Generador de Dataset Sintético para Sistema de Recomendación
 Este script crea datos realistas de comercio electrónico para entrenar el modelo
+
+Las interacciones se generan por bloques de arreglos NumPy (usuarios,
+categorías, productos, ratings y fechas de una sola vez), así se pueden
+escribir datasets de cientos de millones de filas sin cargarlos en memoria.
+Con el perfil de tráfico 'realistic' la actividad de los usuarios y la
+popularidad de los productos siguen leyes de potencias (Zipf) y hay días
+de promoción con picos de compras.
 """
 
-import pandas as pd
+import os
+import glob
+import json
+import math
+import time
+import argparse
 import numpy as np
-from datetime import datetime, timedelta
-import random
-
-# Configuración de semilla para reproducibilidad
-np.random.seed(42)
-random.seed(42)
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import date, datetime
+from multiprocessing import Pool
 
 # Definir productos por categoría
 PRODUCTS = {
-    'Electrónica': ['Laptop HP', 'Mouse Inalámbrico', 'Teclado Mecánico', 'Monitor 24"', 
+    'Electrónica': ['Laptop HP', 'Mouse Inalámbrico', 'Teclado Mecánico', 'Monitor 24"',
                     'Auriculares Bluetooth', 'Webcam HD', 'Tablet Android', 'Cargador USB-C',
                     'Hub USB', 'Mousepad Gaming'],
     'Ropa': ['Camiseta Deportiva', 'Jeans Clásicos', 'Zapatillas Running', 'Chaqueta Invierno',
@@ -31,131 +42,683 @@ PRODUCTS = {
                'Clean Code', 'El Principito']
 }
 
-def generate_synthetic_data(n_users=500, n_interactions=5000):
+CATEGORIES = list(PRODUCTS.keys())
+
+# Probabilidad de comprar de una categoría favorita
+FAVORITE_PROBABILITY = 0.7
+
+# Distribución de ratings (valores, pesos) según si la categoría es favorita
+FAVORITE_RATINGS = ([3, 4, 5], [0.1, 0.3, 0.6])
+OTHER_RATINGS = ([1, 2, 3, 4, 5], [0.1, 0.2, 0.4, 0.2, 0.1])
+
+# Las compras caen en los últimos HISTORY_DAYS días (parámetro history_days)
+HISTORY_DAYS = 180
+
+# Perfiles de tráfico. user_zipf y product_zipf son los exponentes de la
+# ley de potencias de la actividad por usuario y de la popularidad por
+# producto (0: uniforme). bursts días de promoción multiplican las compras
+# por 1 + burst_intensity y el efecto decae con burst_decay_days.
+# history_days es el largo del historial en días.
+TRAFFIC_PROFILES = {
+    'uniform': {
+        'user_zipf': 0.0,
+        'product_zipf': 0.0,
+        'bursts': 0,
+        'burst_intensity': 0.0,
+        'burst_decay_days': 1.0,
+        'history_days': HISTORY_DAYS
+    },
+    'realistic': {
+        'user_zipf': 0.8,
+        'product_zipf': 1.0,
+        'bursts': 6,
+        'burst_intensity': 4.0,
+        'burst_decay_days': 3.0,
+        'history_days': HISTORY_DAYS
+    }
+}
+
+# Generación por shards: carpeta (dentro de la de salida) y manifiesto
+SHARD_DIR = 'interactions_shards'
+MANIFEST_FILE = 'manifest.json'
+
+
+def build_products(rng):
+    """
+    Crea el catálogo con IDs, categorías y precios
+
+    Args:
+        rng: numpy.random.Generator
+
+    Returns:
+        DataFrame de productos ordenado por categoría
+    """
+    names = [item for items in PRODUCTS.values() for item in items]
+    categories = [category for category, items in PRODUCTS.items() for _ in items]
+
+    return pd.DataFrame({
+        'product_id': np.arange(1, len(names) + 1),
+        'product_name': names,
+        'category': categories,
+        'price': rng.uniform(10, 500, len(names)).round(2)
+    })
+
+
+def build_user_profiles(n_users, rng):
+    """
+    Genera las preferencias de cada usuario: 1-3 categorías favoritas
+
+    Args:
+        n_users: Número de usuarios
+        rng: numpy.random.Generator
+
+    Returns:
+        Diccionario con 'order' (categorías de cada usuario en orden
+        aleatorio, las favoritas primero) y 'n_favorites'
+    """
+    order = np.argsort(rng.random((n_users, len(CATEGORIES))), axis=1).astype(np.int8)
+    n_favorites = rng.integers(1, 4, n_users).astype(np.int8)
+    return {'order': order, 'n_favorites': n_favorites}
+
+
+def _choice(values, weights, size, rng):
+    """Equivalente vectorizado de random.choices con pesos"""
+    cumulative = np.cumsum(weights) / np.sum(weights)
+    index = np.searchsorted(cumulative, rng.random(size), side='right')
+    return np.asarray(values, dtype=np.int8)[np.minimum(index, len(values) - 1)]
+
+
+def resolve_traffic(traffic=None, **overrides):
+    """
+    Parámetros de tráfico a partir de un perfil de TRAFFIC_PROFILES
+
+    Args:
+        traffic: Nombre del perfil o diccionario de parámetros (por defecto 'uniform')
+        **overrides: Parámetros que reemplazan a los del perfil (None se ignora)
+
+    Returns:
+        Diccionario completo de parámetros
+    """
+    if traffic is None or isinstance(traffic, str):
+        traffic = TRAFFIC_PROFILES[traffic or 'uniform']
+    params = {**TRAFFIC_PROFILES['uniform'], **traffic}
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def build_traffic_model(n_users, products_df, params, rng):
+    """
+    Precalcula lo que necesita el muestreo sesgado
+
+    - Usuarios: el rango de actividad r se asigna al usuario (a * r + b) mod
+      n_users, una permutación que no necesita memoria por usuario
+    - Productos: pesos rank^-product_zipf con los rangos al azar, como CDF
+      global y como CDF por categoría desplazada por el código de categoría
+    - Fechas: peso de cada día (índice days_ago) con las promociones
+
+    Args:
+        n_users: Número de usuarios
+        products_df: Catálogo de build_products (ordenado por categoría)
+        params: Parámetros de resolve_traffic
+        rng: numpy.random.Generator
+
+    Returns:
+        Diccionario con el modelo de tráfico
+    """
+    model = {'params': params}
+
+    multiplier = int(rng.integers(1, max(n_users, 2)))
+    while math.gcd(multiplier, n_users) != 1:
+        multiplier = int(rng.integers(1, max(n_users, 2)))
+    model['user_permutation'] = (multiplier, int(rng.integers(0, n_users)))
+
+    ranks = rng.permutation(len(products_df)) + 1
+    weights = ranks.astype(np.float64) ** -params['product_zipf']
+    category_codes = pd.Categorical(products_df['category'], categories=CATEGORIES).codes
+    category_totals = np.bincount(category_codes, weights, minlength=len(CATEGORIES))
+    within = np.zeros(len(weights))
+    for code in range(len(CATEGORIES)):
+        members = category_codes == code
+        within[members] = np.cumsum(weights[members]) / category_totals[code]
+    model['product_cdf'] = np.cumsum(weights) / weights.sum()
+    model['category_cdf'] = category_codes + within
+
+    # Calendario de más antiguo (0) a más reciente (history_days)
+    history_days = params['history_days']
+    calendar = np.arange(history_days + 1)
+    day_weights = np.ones(history_days + 1)
+    for start in rng.integers(0, history_days + 1, params['bursts']):
+        elapsed = calendar - start
+        day_weights += np.where(
+            elapsed >= 0,
+            params['burst_intensity'] * np.exp(-np.maximum(elapsed, 0) / params['burst_decay_days']),
+            0.0
+        )
+    model['day_cdf'] = np.cumsum(day_weights[::-1]) / day_weights.sum()
+
+    return model
+
+
+def _power_law_ranks(n, exponent, size, rng):
+    """
+    Rangos 0..n-1 con P(r) aproximadamente proporcional a (r + 1)^-exponent
+
+    Inversa de la CDF de una ley de potencias continua acotada en [1, n + 1),
+    sin tablas de tamaño n.
+    """
+    u = rng.random(size)
+    if exponent == 1:
+        x = (n + 1.0) ** u
+    else:
+        x = (1 + u * ((n + 1.0) ** (1 - exponent) - 1)) ** (1 / (1 - exponent))
+    return np.minimum(x.astype(np.int64), n) - 1
+
+
+def generate_interactions(n_rows, products_df, profiles, rng, end_date=None, traffic=None):
+    """
+    Genera un bloque de interacciones con arreglos completos
+
+    Mismas reglas que el generador original: usuario al azar, 70% de
+    compras en una de sus categorías favoritas, rating más alto en las
+    favoritas, 1-3 unidades y fecha en los últimos history_days días.
+
+    Args:
+        n_rows: Filas del bloque
+        products_df: Catálogo de build_products
+        profiles: Perfiles de build_user_profiles
+        rng: numpy.random.Generator
+        end_date: Fecha más reciente (por defecto hoy)
+        traffic: Modelo de build_traffic_model (por defecto todo uniforme)
+
+    Returns:
+        DataFrame con las columnas de interactions más epoch_day
+    """
+    order = profiles['order']
+    n_favorites = profiles['n_favorites']
+    n_users = len(n_favorites)
+
+    category_codes = pd.Categorical(products_df['category'], categories=CATEGORIES).codes
+    category_start = np.searchsorted(category_codes, np.arange(len(CATEGORIES)))
+    category_size = np.bincount(category_codes, minlength=len(CATEGORIES))
+
+    params = traffic['params'] if traffic is not None else TRAFFIC_PROFILES['uniform']
+
+    if params['user_zipf'] > 0:
+        multiplier, offset = traffic['user_permutation']
+        ranks = _power_law_ranks(n_users, params['user_zipf'], n_rows, rng)
+        user_index = (ranks * multiplier + offset) % n_users
+    else:
+        user_index = rng.integers(0, n_users, n_rows)
+
+    # Producto: de una categoría favorita o de todo el catálogo
+    from_favorite = rng.random(n_rows) < FAVORITE_PROBABILITY
+    favorite_rank = (rng.random(n_rows) * n_favorites[user_index]).astype(np.int64)
+    favorite_category = order[user_index, favorite_rank]
+    if params['product_zipf'] > 0:
+        product_index = np.where(
+            from_favorite,
+            np.searchsorted(traffic['category_cdf'], favorite_category + rng.random(n_rows), side='right'),
+            np.searchsorted(traffic['product_cdf'], rng.random(n_rows), side='right')
+        )
+        product_index = np.minimum(product_index, len(products_df) - 1)
+    else:
+        in_category = (rng.random(n_rows) * category_size[favorite_category]).astype(np.int64)
+        product_index = np.where(
+            from_favorite,
+            category_start[favorite_category] + in_category,
+            rng.integers(0, len(products_df), n_rows)
+        )
+
+    # Rating según si la categoría del producto es favorita del usuario
+    product_category = category_codes[product_index]
+    category_rank = np.argmax(order[user_index] == product_category[:, None], axis=1)
+    is_favorite = category_rank < n_favorites[user_index]
+    rating = np.where(
+        is_favorite,
+        _choice(*FAVORITE_RATINGS, n_rows, rng),
+        _choice(*OTHER_RATINGS, n_rows, rng)
+    )
+
+    purchase_count = rng.integers(1, 4, n_rows).astype(np.int16)
+
+    # Fecha: las cadenas se forman una vez por día posible, no por fila
+    history_days = params['history_days']
+    last_day = np.datetime64(end_date or date.today(), 'D')
+    days = last_day - np.arange(history_days + 1)
+    if params['bursts'] > 0:
+        days_ago = np.searchsorted(traffic['day_cdf'], rng.random(n_rows), side='right')
+        days_ago = np.minimum(days_ago, history_days)
+    else:
+        days_ago = rng.integers(0, history_days + 1, n_rows)
+    day_labels = np.datetime_as_string(days)
+
+    price = products_df['price'].to_numpy()[product_index]
+    names = pd.Categorical(products_df['product_name'])
+
+    return pd.DataFrame({
+        'user_id': (user_index + 1).astype(np.int32),
+        'product_id': products_df['product_id'].to_numpy()[product_index].astype(np.int32),
+        'product_name': pd.Categorical.from_codes(names.codes[product_index], names.categories),
+        'category': pd.Categorical.from_codes(product_category, CATEGORIES),
+        'rating': rating,
+        'purchase_count': purchase_count,
+        'price': price,
+        'total_spent': (price * purchase_count).round(2),
+        'purchase_date': pd.arrays.ArrowStringArray(pa.array(day_labels).take(pa.array(days_ago))),
+        'epoch_day': days.astype(np.int32)[days_ago]
+    })
+
+
+class UserStatsAccumulator:
+    """Estadísticas por usuario acumuladas bloque a bloque con bincount"""
+
+    def __init__(self, n_users):
+        self.rating_sum = np.zeros(n_users + 1)
+        self.purchases = np.zeros(n_users + 1, dtype=np.int64)
+        self.spent = np.zeros(n_users + 1)
+        self.interactions = np.zeros(n_users + 1, dtype=np.int64)
+
+    def add(self, chunk):
+        """Suma un bloque de interacciones"""
+        users = chunk['user_id'].to_numpy()
+        size = len(self.interactions)
+        self.rating_sum += np.bincount(users, chunk['rating'].to_numpy(), size)
+        self.purchases += np.bincount(users, chunk['purchase_count'].to_numpy(), size).astype(np.int64)
+        self.spent += np.bincount(users, chunk['total_spent'].to_numpy(), size)
+        self.interactions += np.bincount(users, minlength=size)
+
+    def to_frame(self):
+        """DataFrame con las columnas de user_stats.csv (usuarios con compras)"""
+        user_ids = np.flatnonzero(self.interactions)
+        return pd.DataFrame({
+            'user_id': user_ids,
+            'avg_rating': self.rating_sum[user_ids] / self.interactions[user_ids],
+            'total_purchases': self.purchases[user_ids],
+            'total_spent': self.spent[user_ids].round(2),
+            'num_interactions': self.interactions[user_ids]
+        })
+
+
+def _seed_stream(seed, stream):
+    """
+    Semilla independiente número stream derivada de seed
+
+    El flujo 0 genera el catálogo y los perfiles, el flujo i + 1 las
+    interacciones del shard i; cada shard es reproducible por sí solo.
+    """
+    return np.random.SeedSequence(seed, spawn_key=(stream,))
+
+
+def _build_world(n_users, seed, traffic):
+    """Catálogo, perfiles y modelo de tráfico, siempre desde el flujo 0"""
+    rng = np.random.default_rng(_seed_stream(seed, 0))
+    products_df = build_products(rng)
+    profiles = build_user_profiles(n_users, rng)
+    return products_df, profiles, build_traffic_model(n_users, products_df, traffic, rng)
+
+
+def _iter_chunks(n_rows, chunk_rows, world, rng, end_date):
+    """Bloques de hasta chunk_rows interacciones"""
+    products_df, profiles, traffic = world
+    for start in range(0, n_rows, chunk_rows):
+        yield generate_interactions(min(chunk_rows, n_rows - start), products_df, profiles,
+                                    rng, end_date, traffic)
+
+
+def iter_synthetic_interactions(n_users, n_interactions, chunk_rows=1_000_000, seed=42, end_date=None,
+                                traffic=None):
+    """
+    Genera interacciones por bloques
+
+    Args:
+        n_users: Número de usuarios
+        n_interactions: Total de interacciones
+        chunk_rows: Filas máximas por bloque
+        seed: Semilla del generador
+        end_date: Fecha más reciente (por defecto hoy)
+        traffic: Perfil de TRAFFIC_PROFILES o diccionario de parámetros
+
+    Returns:
+        (products_df, iterador de DataFrames de interacciones)
+    """
+    world = _build_world(n_users, seed, resolve_traffic(traffic))
+    shard_rng = np.random.default_rng(_seed_stream(seed, 1))
+    return world[0], _iter_chunks(n_interactions, chunk_rows, world, shard_rng, end_date)
+
+
+def generate_synthetic_data(n_users=500, n_interactions=5000, seed=42, traffic=None):
     """
     Genera un dataset sintético de interacciones usuario-producto
-    
+
     Args:
         n_users: Número de usuarios a generar
         n_interactions: Número de interacciones (compras/ratings) a generar
-    
+        seed: Semilla del generador
+        traffic: Perfil de TRAFFIC_PROFILES ('uniform' por defecto, 'realistic'
+            con usuarios y productos Zipf y días de promoción) o diccionario
+
     Returns:
         DataFrame con el dataset completo
     """
-    
-    # Crear lista de todos los productos con IDs y categorías
-    products_list = []
-    product_id = 1
-    
-    for category, items in PRODUCTS.items():
-        for item in items:
-            products_list.append({
-                'product_id': product_id,
-                'product_name': item,
-                'category': category,
-                'price': round(random.uniform(10, 500), 2)
-            })
-            product_id += 1
-    
-    products_df = pd.DataFrame(products_list)
-    
-    # Generar perfiles de usuario (cada usuario tiene preferencias por ciertas categorías)
-    user_profiles = []
-    categories = list(PRODUCTS.keys())
-    
-    for user_id in range(1, n_users + 1):
-        # Cada usuario tiene 1-3 categorías favoritas
-        favorite_categories = random.sample(categories, k=random.randint(1, 3))
-        user_profiles.append({
-            'user_id': user_id,
-            'favorite_categories': favorite_categories,
-            'spending_power': random.choice(['bajo', 'medio', 'alto'])
-        })
-    
-    # Generar interacciones basadas en los perfiles
-    interactions = []
-    
-    for _ in range(n_interactions):
-        # Seleccionar usuario aleatorio
-        user = random.choice(user_profiles)
-        user_id = user['user_id']
-        
-        # 70% de probabilidad de comprar de categoría favorita
-        if random.random() < 0.7 and user['favorite_categories']:
-            category = random.choice(user['favorite_categories'])
-            available_products = products_df[products_df['category'] == category]
-        else:
-            available_products = products_df
-        
-        # Seleccionar producto
-        product = available_products.sample(1).iloc[0]
-        
-        # Generar rating basado en si es categoría favorita
-        if product['category'] in user['favorite_categories']:
-            rating = random.choices([3, 4, 5], weights=[0.1, 0.3, 0.6])[0]
-        else:
-            rating = random.choices([1, 2, 3, 4, 5], weights=[0.1, 0.2, 0.4, 0.2, 0.1])[0]
-        
-        # Cantidad comprada (1-3 unidades)
-        purchase_count = random.randint(1, 3)
-        
-        # Fecha aleatoria en los últimos 6 meses
-        days_ago = random.randint(0, 180)
-        purchase_date = datetime.now() - timedelta(days=days_ago)
-        
-        interactions.append({
-            'user_id': user_id,
-            'product_id': product['product_id'],
-            'product_name': product['product_name'],
-            'category': product['category'],
-            'rating': rating,
-            'purchase_count': purchase_count,
-            'price': product['price'],
-            'total_spent': round(product['price'] * purchase_count, 2),
-            'purchase_date': purchase_date.strftime('%Y-%m-%d')
-        })
-    
-    # Crear DataFrame final
-    interactions_df = pd.DataFrame(interactions)
-    
-    # Agregar algunas estadísticas por usuario
-    user_stats = interactions_df.groupby('user_id').agg({
-        'rating': 'mean',
-        'purchase_count': 'sum',
-        'total_spent': 'sum',
-        'product_id': 'count'
-    }).reset_index()
-    
-    user_stats.columns = ['user_id', 'avg_rating', 'total_purchases', 
-                          'total_spent', 'num_interactions']
-    
+    products_df, chunks = iter_synthetic_interactions(
+        n_users, n_interactions, max(n_interactions, 1), seed, traffic=traffic
+    )
+    interactions_df = pd.concat(chunks, ignore_index=True).drop(columns='epoch_day')
+
+    stats = UserStatsAccumulator(n_users)
+    stats.add(interactions_df)
+    user_stats = stats.to_frame()
+
     print(f"✅ Dataset generado exitosamente!")
     print(f"📊 Usuarios: {n_users}")
     print(f"📦 Productos únicos: {len(products_df)}")
     print(f"🛒 Interacciones: {len(interactions_df)}")
-    print(f"📈 Categorías: {len(categories)}")
-    
+    print(f"📈 Categorías: {len(CATEGORIES)}")
+
     return interactions_df, products_df, user_stats
 
+
+def _write_chunks(target, chunks, file_format, stats, progress=None):
+    """
+    Escribe bloques de interacciones en un archivo (vía .tmp + os.replace)
+
+    Args:
+        target: Ruta final
+        chunks: Iterador de DataFrames de generate_interactions
+        file_format: 'csv' (sin epoch_day) o 'parquet'
+        stats: UserStatsAccumulator que suma cada bloque
+        progress: Total de filas para mostrar el avance (None: sin avance)
+
+    Returns:
+        Filas escritas
+    """
+    tmp_path = f'{target}.tmp'
+    writer = None
+    written = 0
+    try:
+        for chunk in chunks:
+            stats.add(chunk)
+            if file_format == 'parquet':
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.drop(columns='epoch_day').to_csv(
+                    tmp_path, mode='a' if written else 'w', header=not written, index=False
+                )
+            written += len(chunk)
+            if progress:
+                print(f"   🛒 {written:,}/{progress:,} interacciones", end='\r', flush=True)
+    finally:
+        if writer is not None:
+            writer.close()
+    if progress:
+        print()
+
+    os.replace(tmp_path, target)
+    return written
+
+
+def write_synthetic_data(n_users, n_interactions, output_dir='data', file_format='csv',
+                         chunk_rows=1_000_000, seed=42, traffic=None, end_date=None):
+    """
+    Genera el dataset y lo escribe bloque a bloque
+
+    Con file_format='parquet' las interacciones se escriben como
+    interactions.parquet (con epoch_day) en lugar de interactions.csv,
+    mucho más rápido y compacto para datasets grandes. products.csv y
+    user_stats.csv siempre se escriben en CSV.
+
+    Args:
+        n_users: Número de usuarios
+        n_interactions: Total de interacciones
+        output_dir: Carpeta de salida
+        file_format: 'csv' o 'parquet'
+        chunk_rows: Filas por bloque
+        seed: Semilla del generador
+        traffic: Perfil de TRAFFIC_PROFILES o diccionario de parámetros
+        end_date: Fecha más reciente (por defecto hoy)
+
+    Returns:
+        Ruta del archivo de interacciones
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    products_df, chunks = iter_synthetic_interactions(n_users, n_interactions, chunk_rows, seed,
+                                                      end_date=end_date, traffic=traffic)
+    stats = UserStatsAccumulator(n_users)
+
+    csv_file = os.path.join(output_dir, 'interactions.csv')
+    target = os.path.join(output_dir, 'interactions.parquet') if file_format == 'parquet' else csv_file
+
+    _write_chunks(target, chunks, file_format, stats, progress=n_interactions)
+
+    if file_format == 'parquet' and os.path.exists(csv_file):
+        # Un CSV anterior seguiría siendo la fuente de interactions
+        os.remove(csv_file)
+
+    products_df.to_csv(os.path.join(output_dir, 'products.csv'), index=False)
+    stats.to_frame().to_csv(os.path.join(output_dir, 'user_stats.csv'), index=False)
+
+    return target
+
+
+def _write_shard(task):
+    """
+    Genera y escribe un shard (se ejecuta en un proceso del pool)
+
+    Cada proceso reconstruye el catálogo, los perfiles y el modelo de
+    tráfico desde el flujo 0, así no hay que enviarle arreglos grandes.
+
+    Returns:
+        (entrada del manifiesto, arreglos de UserStatsAccumulator)
+    """
+    world = _build_world(task['n_users'], task['seed'], task['traffic'])
+    shard_rng = np.random.default_rng(_seed_stream(task['seed'], task['shard_id'] + 1))
+    chunks = _iter_chunks(task['rows'], task['chunk_rows'], world, shard_rng, task['end_date'])
+
+    stats = UserStatsAccumulator(task['n_users'])
+    start = time.perf_counter()
+    rows = _write_chunks(os.path.join(task['shard_dir'], task['file']), chunks, 'parquet', stats)
+
+    entry = {
+        'file': task['file'],
+        'rows': rows,
+        'spawn_key': [task['shard_id'] + 1],
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+    return entry, (stats.rating_sum, stats.purchases, stats.spent, stats.interactions)
+
+
+def write_sharded_data(n_users, n_interactions, n_shards, output_dir='data', workers=None,
+                       chunk_rows=1_000_000, seed=42, end_date=None, traffic=None, overwrite=False):
+    """
+    Genera el dataset en n_shards archivos Parquet en paralelo
+
+    Los shards se reparten entre un pool de procesos; cada uno tiene su
+    propio flujo de semillas (SeedSequence con spawn_key), por lo que el
+    resultado no depende del número de procesos. Los shards quedan en
+    output_dir/interactions_shards junto a manifest.json, que se escribe
+    al final: si existe, el dataset está completo. Los shards pasan a ser
+    la fuente de src.data_store.load_table('interactions') (y con ella
+    del entrenamiento y el dashboard), por lo que interactions.csv e
+    interactions.parquet de output_dir se borran; si existen, solo con
+    overwrite=True.
+
+    Args:
+        n_users: Número de usuarios
+        n_interactions: Total de interacciones
+        n_shards: Número de shards
+        output_dir: Carpeta de salida
+        workers: Procesos del pool (por defecto os.cpu_count())
+        chunk_rows: Filas por bloque dentro de cada shard
+        seed: Semilla del dataset
+        end_date: Fecha más reciente (por defecto hoy, fijada para todos los shards)
+        traffic: Perfil de TRAFFIC_PROFILES o diccionario de parámetros
+        overwrite: Reemplazar el dataset de interactions existente en output_dir
+
+    Returns:
+        Diccionario del manifiesto
+    """
+    # Seguirían siendo la fuente de interactions en lugar de los shards
+    stale = [os.path.join(output_dir, name) for name in ('interactions.csv', 'interactions.parquet')]
+    stale = [path for path in stale if os.path.exists(path)]
+    if stale and not overwrite:
+        raise FileExistsError(
+            f"{', '.join(stale)} ya existe: los shards lo reemplazarían como fuente de "
+            f"interactions. Usar overwrite=True (--overwrite) u otra carpeta de salida."
+        )
+
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(shard_dir, 'shard_*.parquet')) + [os.path.join(shard_dir, MANIFEST_FILE)]:
+        if os.path.exists(path):
+            os.remove(path)
+
+    end_date = str(np.datetime64(end_date or date.today(), 'D'))
+    traffic = resolve_traffic(traffic)
+    base, extra = divmod(n_interactions, n_shards)
+    tasks = [{
+        'shard_id': shard_id,
+        'file': f'shard_{shard_id:05d}.parquet',
+        'rows': base + (shard_id < extra),
+        'n_users': n_users,
+        'seed': seed,
+        'chunk_rows': chunk_rows,
+        'end_date': end_date,
+        'traffic': traffic,
+        'shard_dir': shard_dir
+    } for shard_id in range(n_shards)]
+
+    workers = min(workers or os.cpu_count(), n_shards)
+    stats = UserStatsAccumulator(n_users)
+    shards = []
+    start = time.perf_counter()
+
+    with Pool(workers) as pool:
+        # imap (en orden de shard): las sumas de user_stats no dependen de qué proceso acaba antes
+        for entry, arrays in pool.imap(_write_shard, tasks):
+            for total, partial in zip((stats.rating_sum, stats.purchases, stats.spent, stats.interactions), arrays):
+                total += partial
+            shards.append(entry)
+            print(f"   📦 {len(shards)}/{n_shards} shards", end='\r', flush=True)
+    print()
+
+    for path in stale:
+        os.remove(path)
+
+    products_df = build_products(np.random.default_rng(_seed_stream(seed, 0)))
+    products_df.to_csv(os.path.join(output_dir, 'products.csv'), index=False)
+    stats.to_frame().to_csv(os.path.join(output_dir, 'user_stats.csv'), index=False)
+
+    manifest = {
+        'format': 'parquet',
+        'seed': seed,
+        'n_users': n_users,
+        'n_interactions': n_interactions,
+        'end_date': end_date,
+        'traffic': traffic,
+        'workers': workers,
+        'seconds': round(time.perf_counter() - start, 3),
+        'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'shards': shards
+    }
+    tmp_path = os.path.join(shard_dir, f'{MANIFEST_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(shard_dir, MANIFEST_FILE))
+
+    return manifest
+
+
+def read_manifest(output_dir='data'):
+    """
+    Lee el manifiesto de un dataset generado con write_sharded_data
+
+    Returns:
+        (manifiesto, rutas de los shards en orden)
+    """
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    with open(os.path.join(shard_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    return manifest, [os.path.join(shard_dir, shard['file']) for shard in manifest['shards']]
+
+
 if __name__ == "__main__":
-    # Generar datos
-    interactions, products, user_stats = generate_synthetic_data(
-        n_users=500, 
-        n_interactions=5000
+    parser = argparse.ArgumentParser(description='Generador de dataset sintético')
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--interactions', type=int, default=5000)
+    parser.add_argument('--output-dir', default='data')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--shards', type=int, default=0,
+                        help='Generar en N shards Parquet en paralelo (0: un solo archivo)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos para --shards (por defecto todos los núcleos)')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Con --shards, reemplazar interactions.csv/.parquet existentes')
+    parser.add_argument('--traffic', choices=sorted(TRAFFIC_PROFILES), default='uniform',
+                        help='Perfil de tráfico: uniform o realistic (Zipf y promociones)')
+    parser.add_argument('--user-zipf', type=float, default=None)
+    parser.add_argument('--product-zipf', type=float, default=None)
+    parser.add_argument('--bursts', type=int, default=None)
+    parser.add_argument('--burst-intensity', type=float, default=None)
+    parser.add_argument('--burst-decay-days', type=float, default=None)
+    parser.add_argument('--history-days', type=int, default=None)
+    args = parser.parse_args()
+
+    traffic = resolve_traffic(
+        args.traffic, user_zipf=args.user_zipf, product_zipf=args.product_zipf, bursts=args.bursts,
+        burst_intensity=args.burst_intensity, burst_decay_days=args.burst_decay_days,
+        history_days=args.history_days
     )
-    
-    # Guardar en CSV
-    interactions.to_csv('data/interactions.csv', index=False)
-    products.to_csv('data/products.csv', index=False)
-    user_stats.to_csv('data/user_stats.csv', index=False)
-    
-    print("\n📁 Archivos guardados en carpeta 'data/':")
-    print("   - interactions.csv")
-    print("   - products.csv")
-    print("   - user_stats.csv")
-    
+
+    # Generar y guardar por bloques
+    if args.shards:
+        manifest = write_sharded_data(
+            n_users=args.users,
+            n_interactions=args.interactions,
+            n_shards=args.shards,
+            output_dir=args.output_dir,
+            workers=args.workers,
+            chunk_rows=args.chunk_rows,
+            seed=args.seed,
+            traffic=traffic,
+            overwrite=args.overwrite
+        )
+        path = read_manifest(args.output_dir)[1][0]
+        outputs = [f"{SHARD_DIR}/ ({args.shards} shards + {MANIFEST_FILE})"]
+        print(f"⚡ {args.interactions / manifest['seconds']:,.0f} interacciones/s "
+              f"con {manifest['workers']} procesos")
+    else:
+        path = write_synthetic_data(
+            n_users=args.users,
+            n_interactions=args.interactions,
+            output_dir=args.output_dir,
+            file_format=args.format,
+            chunk_rows=args.chunk_rows,
+            seed=args.seed,
+            traffic=traffic
+        )
+        outputs = [os.path.basename(path)]
+
+    print(f"✅ Dataset generado exitosamente!")
+    print(f"📊 Usuarios: {args.users:,}")
+    print(f"📦 Productos únicos: {sum(len(items) for items in PRODUCTS.values())}")
+    print(f"🛒 Interacciones: {args.interactions:,}")
+    print(f"📈 Categorías: {len(CATEGORIES)}")
+
+    print(f"\n📁 Archivos guardados en carpeta '{args.output_dir}/':")
+    for output in outputs + ['products.csv', 'user_stats.csv']:
+        print(f"   - {output}")
+
     # Mostrar ejemplos
+    if path.endswith('.parquet'):
+        interactions = next(pq.ParquetFile(path).iter_batches(batch_size=100_000)).to_pandas()
+    else:
+        interactions = pd.read_csv(path, nrows=100_000)
     print("\n🔍 Vista previa de interacciones:")
     print(interactions.head(10))
-    print(f"\n📊 Distribución de ratings:")
+    print(f"\n📊 Distribución de ratings (muestra):")
     print(interactions['rating'].value_counts().sort_index())
@@ -0,0 +1,150 @@
+"""
+Codificador de IDs de solo anexado
+Reemplaza a LabelEncoder: codifica en bloque sin excepciones para IDs
+desconocidos, crece agregando códigos al final y se guarda como .npy que se
+abre con memoria mapeada
+"""
+import os
+import numpy as np
+
+# Filas del arreglo guardado
+CLASSES_ROW, SORTED_ROW, ORDER_ROW = range(3)
+
+
+class IDEncoder:
+    """
+    Mapea IDs originales a índices consecutivos (filas de un embedding)
+
+    classes_[código] es el ID original. Los códigos nunca cambian: los IDs
+    nuevos se agregan al final, así que las filas de embedding ya entrenadas
+    siguen siendo válidas. Los IDs ordenados y el código de cada uno permiten
+    codificar con búsqueda binaria vectorizada.
+    """
+
+    def __init__(self, classes=None, sorted_ids=None, order=None):
+        """
+        Args:
+            classes: IDs originales en orden de código (opcional)
+            sorted_ids: classes ordenado (se calcula si falta)
+            order: Código de cada elemento de sorted_ids (se calcula si falta)
+        """
+        self.classes_ = np.asarray(classes if classes is not None else [], dtype=np.int64)
+        if order is None:
+            order = np.argsort(self.classes_, kind='stable')
+            sorted_ids = self.classes_[order]
+        self._order = order
+        self._sorted = sorted_ids
+
+    def __len__(self):
+        return len(self.classes_)
+
+    def fit(self, ids):
+        """
+        Reinicia el codificador con los IDs únicos (códigos en orden ascendente,
+        igual que LabelEncoder)
+        """
+        self.__init__(np.unique(np.asarray(ids, dtype=np.int64)))
+        return self
+
+    def fit_transform(self, ids):
+        """Ajusta el codificador y devuelve los códigos de ids"""
+        return self.fit(ids).transform(ids)
+
+    def encode(self, ids):
+        """
+        Codifica un arreglo de IDs en bloque
+
+        Args:
+            ids: Arreglo de IDs originales
+
+        Returns:
+            (encoded, known): códigos y máscara de IDs conocidos; los
+            desconocidos reciben el código 0 y known=False
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self.classes_) == 0:
+            return np.zeros(ids.shape, dtype=np.int64), np.zeros(ids.shape, dtype=bool)
+
+        positions = np.searchsorted(self._sorted, ids)
+        positions = np.minimum(positions, len(self._sorted) - 1)
+        known = self._sorted[positions] == ids
+        encoded = np.where(known, self._order[positions], 0)
+
+        return encoded, known
+
+    def transform(self, ids):
+        """
+        Codifica IDs que deben existir (compatible con LabelEncoder.transform)
+
+        Raises:
+            ValueError: Si algún ID no es conocido
+        """
+        encoded, known = self.encode(ids)
+        if not known.all():
+            raise ValueError(f"IDs desconocidos: {np.asarray(ids)[~known][:10].tolist()}")
+        return encoded
+
+    def inverse_transform(self, encoded):
+        """Devuelve los IDs originales de un arreglo de códigos"""
+        return self.classes_[np.asarray(encoded)]
+
+    def add(self, ids):
+        """
+        Agrega al final los IDs no vistos
+
+        Args:
+            ids: IDs candidatos (pueden incluir conocidos y repetidos)
+
+        Returns:
+            Arreglo con los IDs nuevos, en el orden en que recibieron código
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        _, known = self.encode(ids)
+        new_ids = np.unique(ids[~known])
+        if len(new_ids) == 0:
+            return new_ids
+
+        first_code = len(self.classes_)
+        classes = np.concatenate([self.classes_, new_ids])
+
+        # Fusionar los nuevos en el índice ordenado sin reordenar todo
+        insert_at = np.searchsorted(self._sorted, new_ids)
+        self._sorted = np.insert(self._sorted, insert_at, new_ids)
+        self._order = np.insert(self._order, insert_at, np.arange(first_code, len(classes)))
+        self.classes_ = classes
+
+        return new_ids
+
+    def save(self, filepath, name):
+        """
+        Guarda el codificador como un arreglo .npy de 3 filas
+        (classes_, IDs ordenados, código de cada ID ordenado)
+
+        Args:
+            filepath: Carpeta del modelo
+            name: Nombre base del archivo (p. ej. 'user_encoder')
+        """
+        path = os.path.join(filepath, f'{name}.npy')
+        tmp_path = f'{path}.tmp.npy'
+        np.save(tmp_path, np.stack([self.classes_, self._sorted, self._order]).astype(np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, filepath, name, mmap_mode='r'):
+        """
+        Abre un codificador guardado con save, con memoria mapeada por defecto
+
+        Returns:
+            IDEncoder o None si no existe el archivo
+        """
+        path = os.path.join(filepath, f'{name}.npy')
+        if not os.path.exists(path):
+            return None
+
+        rows = np.load(path, mmap_mode=mmap_mode)
+        return cls(rows[CLASSES_ROW], rows[SORTED_ROW], rows[ORDER_ROW])
+
+    @classmethod
+    def from_label_encoder(cls, label_encoder):
+        """Convierte un LabelEncoder de sklearn conservando sus códigos"""
+        return cls(np.asarray(label_encoder.classes_, dtype=np.int64))
@@ -0,0 +1,183 @@
+"""
+Motor de inferencia en NumPy para el modelo de recomendación
+Precalcula la proyección de embeddings sobre dense1 y evalúa el resto
+de la red con operaciones matriciales, sin pasar por TensorFlow
+"""
+
+import os
+import numpy as np
+
+INFERENCE_FILE = 'inference.npz'
+DENSE_LAYERS = ('dense1', 'dense2', 'dense3', 'output')
+
+
+def keras_weights(model):
+    """
+    Extrae los pesos de inferencia de un modelo Keras entrenado
+
+    Args:
+        model: Modelo construido por ProductRecommendationANN.build_model
+
+    Returns:
+        Diccionario nombre -> np.ndarray con embeddings, kernels y biases
+    """
+    weights = {
+        'user_embedding': model.get_layer('user_embedding').get_weights()[0],
+        'product_embedding': model.get_layer('product_embedding').get_weights()[0]
+    }
+    for name in DENSE_LAYERS:
+        weights[f'{name}_kernel'], weights[f'{name}_bias'] = model.get_layer(name).get_weights()
+    return weights
+
+
+class EmbeddingTowerEngine:
+    """
+    Inferencia precalculada de ProductRecommendationANN
+
+    dense1 recibe concat([user_vec, product_vec]), por lo que su salida se
+    descompone en user_vec @ W_user + product_vec @ W_product + b. Ambas
+    mitades dependen solo del índice codificado, así que se guardan como
+    tablas (n_users x 128) y (n_products x 128) al cargar el modelo.
+    El dropout no interviene en inferencia.
+    """
+
+    def __init__(self, user_embeddings, product_embeddings, dense_layers):
+        """
+        Inicializa el motor a partir de los pesos del modelo
+
+        Args:
+            user_embeddings: Matriz (n_users, embedding_dim)
+            product_embeddings: Matriz (n_products, embedding_dim)
+            dense_layers: Lista [(kernel, bias), ...] de dense1, dense2, dense3 y output
+        """
+        embedding_dim = user_embeddings.shape[1]
+        (w1, b1), *rest = dense_layers
+
+        w1 = w1.astype(np.float32)
+
+        # Torres precalculadas: cada fila es la contribución a dense1
+        self.user_tower = user_embeddings.astype(np.float32) @ w1[:embedding_dim]
+        self.product_tower = (
+            product_embeddings.astype(np.float32) @ w1[embedding_dim:]
+            + b1.astype(np.float32)
+        )
+
+        self.layers = [(w.astype(np.float32), b.astype(np.float32)) for w, b in rest]
+
+    @classmethod
+    def from_weights(cls, weights):
+        """
+        Construye el motor desde el diccionario de keras_weights (o un .npz cargado)
+
+        Args:
+            weights: Mapeo nombre -> np.ndarray
+        """
+        dense_layers = [(weights[f'{name}_kernel'], weights[f'{name}_bias']) for name in DENSE_LAYERS]
+        return cls(weights['user_embedding'], weights['product_embedding'], dense_layers)
+
+    @classmethod
+    def from_keras_model(cls, model):
+        """
+        Construye el motor leyendo los pesos de un modelo Keras entrenado
+
+        Args:
+            model: Modelo construido por ProductRecommendationANN.build_model
+        """
+        return cls.from_weights(keras_weights(model))
+
+    @classmethod
+    def load(cls, path):
+        """Construye el motor desde un .npz escrito por save_weights"""
+        with np.load(path) as weights:
+            return cls.from_weights(weights)
+
+    @staticmethod
+    def save_weights(path, weights):
+        """
+        Guarda los pesos de inferencia como .npz (escritura atómica)
+
+        Args:
+            path: Ruta del archivo .npz
+            weights: Diccionario de keras_weights
+        """
+        tmp_path = f'{path}.tmp.npz'
+        np.savez(tmp_path, **weights)
+        os.replace(tmp_path, path)
+
+    def score(self, user_encoded, product_encoded):
+        """
+        Calcula el rating (sin recortar) para un usuario y varios productos
+
+        Args:
+            user_encoded: Índice codificado del usuario
+            product_encoded: Arreglo de índices codificados de productos
+
+        Returns:
+            Arreglo float32 con un rating por producto
+        """
+        return self.score_towers(user_encoded, self.product_tower[product_encoded])
+
+    def score_pairs(self, users_encoded, product_encoded):
+        """
+        Calcula el rating (sin recortar) de pares usuario-producto arbitrarios
+
+        Args:
+            users_encoded: Arreglo de índices codificados de usuarios
+            product_encoded: Arreglo de índices codificados de productos (misma longitud)
+
+        Returns:
+            Arreglo float32 con un rating por par
+        """
+        return self._forward(self.user_tower[users_encoded] + self.product_tower[product_encoded])
+
+    def score_towers(self, user_encoded, product_rows):
+        """
+        Calcula el rating para un usuario y filas arbitrarias de la torre de productos
+
+        Permite puntuar vectores que no son productos reales, como los
+        centroides del índice de candidatos.
+
+        Args:
+            user_encoded: Índice codificado del usuario
+            product_rows: Matriz (n, 128) en el espacio de product_tower
+
+        Returns:
+            Arreglo float32 con un rating por fila
+        """
+        return self._forward(product_rows + self.user_tower[user_encoded])
+
+    def score_matrix(self, users_encoded, product_encoded, max_rows=1 << 20):
+        """
+        Calcula la matriz de ratings (sin recortar) de varios usuarios por varios productos
+
+        Args:
+            users_encoded: Arreglo de índices codificados de usuarios
+            product_encoded: Arreglo de índices codificados de productos
+            max_rows: Máximo de pares usuario-producto evaluados por bloque
+
+        Returns:
+            Matriz float32 (n_usuarios, n_productos)
+        """
+        users_encoded = np.asarray(users_encoded)
+        product_rows = self.product_tower[product_encoded]
+        scores = np.empty((len(users_encoded), len(product_rows)), dtype=np.float32)
+        chunk = max(1, max_rows // max(1, len(product_rows)))
+
+        for start in range(0, len(users_encoded), chunk):
+            users = users_encoded[start:start + chunk]
+            hidden = self.user_tower[users][:, None, :] + product_rows[None, :, :]
+            hidden = hidden.reshape(-1, product_rows.shape[1])
+            scores[start:start + chunk] = self._forward(hidden).reshape(len(users), -1)
+
+        return scores
+
+    def _forward(self, hidden):
+        """Aplica ReLU a la salida de dense1 y evalúa dense2, dense3 y output"""
+        np.maximum(hidden, 0, out=hidden)
+
+        *hidden_layers, (w_out, b_out) = self.layers
+        for kernel, bias in hidden_layers:
+            hidden = hidden @ kernel + bias
+            np.maximum(hidden, 0, out=hidden)
+
+        return (hidden @ w_out + b_out)[:, 0]
@@ -0,0 +1,158 @@
+"""
+Micro-batching de inferencia para peticiones concurrentes
+Agrupa las peticiones que llegan en una ventana de pocos milisegundos en
+una sola pasada de RecommendationRuntime.predict_ratings_batch y
+devuelve a cada una su parte del resultado
+"""
+
+import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from config.settings import BATCHING_CONFIG
+
+
+class _Request:
+    """Petición pendiente de un usuario y sus productos candidatos"""
+
+    __slots__ = ('user_id', 'product_ids', 'future', 'enqueued_at')
+
+    def __init__(self, user_id, product_ids):
+        self.user_id = user_id
+        self.product_ids = product_ids
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatchScheduler:
+    """
+    Planificador de micro-lotes delante de un RecommendationRuntime
+
+    Un hilo despachador toma la primera petición de la cola y espera hasta
+    max_wait_ms a que lleguen más (o hasta juntar max_batch_size). El lote
+    se puntúa en una sola pasada y cada petición recibe su resultado en un
+    Future, que también puede esperarse desde asyncio con predict_ratings_async.
+    """
+
+    def __init__(self, model, max_batch_size=None, max_wait_ms=None):
+        """
+        Args:
+            model: RecommendationRuntime o ProductRecommendationANN cargado
+            max_batch_size: Máximo de peticiones por lote
+                (por defecto BATCHING_CONFIG['max_batch_size'])
+            max_wait_ms: Espera máxima desde la primera petición del lote
+                (por defecto BATCHING_CONFIG['max_wait_ms'])
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size or BATCHING_CONFIG['max_batch_size']
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else BATCHING_CONFIG['max_wait_ms']
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.requests = 0
+        self.queue_wait_s = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, user_id, product_ids):
+        """
+        Encola una petición de scoring
+
+        Args:
+            user_id: ID del usuario
+            product_ids: Arreglo de IDs de productos candidatos
+
+        Returns:
+            Future que se resuelve con (product_ids, ratings), igual que predict_ratings
+        """
+        request = _Request(user_id, product_ids)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El planificador de micro-lotes está cerrado")
+            self._queue.put(request)
+        return request.future
+
+    def predict_ratings(self, user_id, product_ids, timeout=None):
+        """Versión bloqueante de submit con la firma de predict_ratings"""
+        return self.submit(user_id, product_ids).result(timeout)
+
+    async def predict_ratings_async(self, user_id, product_ids):
+        """Versión asyncio de submit"""
+        return await asyncio.wrap_future(self.submit(user_id, product_ids))
+
+    def recommend_products(self, user_id, products_df, top_n=10, exclude_purchased=None):
+        """recommend_products del modelo con el scoring pasando por el micro-lote"""
+        return self.model.recommend_products(
+            user_id, products_df, top_n, exclude_purchased, scorer=self.predict_ratings
+        )
+
+    def _next_batch(self, first):
+        """Junta peticiones hasta max_batch_size o hasta agotar max_wait_ms"""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Cierre: terminar este lote y avisar al bucle principal
+                self._queue.put(None)
+                break
+            batch.append(request)
+
+        return batch
+
+    def _run(self):
+        """Bucle del hilo despachador"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._next_batch(first)
+            started = time.perf_counter()
+
+            try:
+                results = self.model.predict_ratings_batch(
+                    [(request.user_id, request.product_ids) for request in batch]
+                )
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.queue_wait_s += sum(started - request.enqueued_at for request in batch)
+
+    def close(self):
+        """Procesa lo pendiente y detiene el hilo despachador"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        """Contadores de lotes procesados"""
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'avg_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'avg_queue_wait_ms': self.queue_wait_s / self.requests * 1000 if self.requests else 0.0,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms
+            }
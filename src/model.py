@@ -10,15 +10,24 @@ from tensorflow import keras
 from tensorflow.keras import layers, Model
 from tensorflow.keras.optimizers import Adam
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import joblib
 import os
+import argparse
 from datetime import datetime
+from src.inference import EmbeddingTowerEngine, INFERENCE_FILE, keras_weights
+from src.runtime import RecommendationRuntime
+from src.popularity import PopularityScorer
+from src.data_store import load_table, iter_table_batches
+from src.training_data import (
+    fit_encoders, write_shards, make_dataset, EpochThroughputCallback, TRAIN_DIR, VALIDATION_DIR
+)
+from config.settings import MODEL_CONFIG, DATA_CONFIG
 
-class ProductRecommendationANN:
+class ProductRecommendationANN(RecommendationRuntime):
     """
     Red Neuronal para Recomendación de Productos
-    Usa embeddings para usuarios y productos + capas densas
+    Usa embeddings para usuarios y productos + capas densas.
+    El scoring y el ranking se heredan de RecommendationRuntime.
     """
     
     def __init__(self, n_users, n_products, embedding_dim=50):
@@ -30,13 +39,12 @@ class ProductRecommendationANN:
             n_products: Número total de productos
             embedding_dim: Dimensionalidad de los embeddings
         """
+        super().__init__()
         self.n_users = n_users
         self.n_products = n_products
         self.embedding_dim = embedding_dim
-        self.model = None
-        self.user_encoder = LabelEncoder()
-        self.product_encoder = LabelEncoder()
         self.history = None
+        self.purchases_position = None
         
     def build_model(self):
         """
@@ -161,20 +169,6 @@ class ProductRecommendationANN:
             self.build_model()
             print(self.model.summary())
         
-        # Callbacks
-        early_stopping = keras.callbacks.EarlyStopping(
-            monitor='val_loss',
-            patience=5,
-            restore_best_weights=True
-        )
-        
-        reduce_lr = keras.callbacks.ReduceLROnPlateau(
-            monitor='val_loss',
-            factor=0.5,
-            patience=3,
-            min_lr=0.00001
-        )
-        
         # Entrenar modelo
         print(f"\n🚀 Entrenando modelo ({epochs} épocas)...")
         self.history = self.model.fit(
@@ -183,7 +177,7 @@ class ProductRecommendationANN:
             validation_data=([X_user_test, X_product_test], y_test),
             epochs=epochs,
             batch_size=batch_size,
-            callbacks=[early_stopping, reduce_lr],
+            callbacks=self._training_callbacks(),
             verbose=verbose
         )
         
@@ -197,6 +191,10 @@ class ProductRecommendationANN:
         
         rmse = np.sqrt(test_mse)
         
+        # Los pesos cambiaron: recalcular las torres de inferencia
+        self.build_inference_engine()
+        self.build_popularity(interactions_df)
+        
         print(f"✅ Métricas finales:")
         print(f"   - MAE: {test_mae:.4f}")
         print(f"   - RMSE: {rmse:.4f}")
@@ -204,86 +202,222 @@ class ProductRecommendationANN:
         
         return self.history
     
-    def predict_rating(self, user_id, product_id):
+    def train_streaming(self, table='interactions', epochs=20, batch_size=64,
+                        shard_dir=None, shuffle_buffer=100_000, verbose=1):
         """
-        Predice el rating que un usuario daría a un producto
+        Entrena el modelo leyendo las interacciones en streaming desde disco
+        
+        Las interacciones se recorren por bloques para ajustar los encoders y
+        escribir shards binarios; después tf.data los lee con intercalado,
+        mezcla y precarga, por lo que la memoria no crece con el tamaño de
+        la tabla.
         
         Args:
-            user_id: ID del usuario
-            product_id: ID del producto
+            table: Tabla de interacciones en la capa de datos
+            epochs: Número de épocas de entrenamiento
+            batch_size: Tamaño del batch
+            shard_dir: Carpeta de shards (por defecto DATA_CONFIG['training_shards_path'])
+            shuffle_buffer: Registros en el búfer de mezcla
+            verbose: Nivel de verbosidad
         
         Returns:
-            Rating predicho (0-5)
+            History object con métricas de entrenamiento (incluye
+            samples_per_sec y peak_rss_mb por época)
         """
+        shard_dir = shard_dir or DATA_CONFIG['training_shards_path']
+        
+        print("🔄 Preparando shards de entrenamiento...")
+        fit_encoders(self.user_encoder, self.product_encoder, table)
+        meta = write_shards(self.user_encoder, self.product_encoder, shard_dir, table)
+        
+        self.n_users = meta['n_users']
+        self.n_products = meta['n_products']
+        
+        print(f"✅ Datos preparados:")
+        print(f"   - Usuarios únicos: {self.n_users}")
+        print(f"   - Productos únicos: {self.n_products}")
+        print(f"   - Datos entrenamiento: {meta['n_train']}")
+        print(f"   - Datos validación: {meta['n_validation']}")
+        
+        if self.model is None:
+            print("\n🏗️  Construyendo red neuronal...")
+            self.build_model()
+        
+        train_dataset = make_dataset(shard_dir, TRAIN_DIR, batch_size, shuffle_buffer=shuffle_buffer)
+        validation_dataset = make_dataset(shard_dir, VALIDATION_DIR, batch_size)
+        
+        print(f"\n🚀 Entrenando modelo en streaming ({epochs} épocas)...")
+        self.history = self.model.fit(
+            train_dataset,
+            validation_data=validation_dataset,
+            epochs=epochs,
+            callbacks=self._training_callbacks() + [EpochThroughputCallback(meta['n_train'])],
+            verbose=verbose
+        )
+        
+        print("\n📊 Evaluando modelo...")
+        test_loss, test_mae, test_mse = self.model.evaluate(validation_dataset, verbose=0)
+        
+        # Los pesos cambiaron: recalcular las torres de inferencia
+        self.build_inference_engine()
+        # Respaldo de cold start con otra pasada por bloques (sin cargar la tabla)
+        self.popularity = PopularityScorer.from_batches(
+            iter_table_batches(table, ['product_id', 'category', 'rating'])
+        )
+        
+        print(f"✅ Métricas finales:")
+        print(f"   - MAE: {test_mae:.4f}")
+        print(f"   - RMSE: {np.sqrt(test_mse):.4f}")
+        print(f"   - Loss: {test_loss:.4f}")
         
-        try:
-            # Codificar usuario y producto
-            user_encoded = self.user_encoder.transform([user_id])[0]
-            product_encoded = self.product_encoder.transform([product_id])[0]
-            
-            # Predecir
-            prediction = self.model.predict(
-                [np.array([user_encoded]), np.array([product_encoded])],
-                verbose=0
-            )[0][0]
-            
-            # Limitar rating entre 0 y 5
-            prediction = np.clip(prediction, 0, 5)
-            
-            return prediction
-        
-        except ValueError:
-            # Usuario o producto no visto en entrenamiento
-            return None
-    
-    def recommend_products(self, user_id, products_df, top_n=10, exclude_purchased=None):
+        return self.history
+    
+    def incremental_update(self, delta_df, epochs=None, batch_size=64, learning_rate=None, verbose=1):
         """
-        Recomienda productos para un usuario
+        Ajusta el modelo cargado solo con las interacciones nuevas
+        
+        Amplía los encoders y las tablas de embeddings con los IDs no vistos,
+        conserva el resto de pesos y hace un fine-tuning corto sobre el delta.
         
         Args:
-            user_id: ID del usuario
-            products_df: DataFrame con información de productos
-            top_n: Número de recomendaciones a retornar
-            exclude_purchased: Lista de product_ids ya comprados (opcional)
+            delta_df: DataFrame con user_id, product_id y rating nuevos
+            epochs: Épocas de fine-tuning (por defecto MODEL_CONFIG['incremental_epochs'])
+            batch_size: Tamaño del batch
+            learning_rate: Learning rate del fine-tuning
+                (por defecto MODEL_CONFIG['incremental_learning_rate'])
+            verbose: Nivel de verbosidad
         
         Returns:
-            DataFrame con top_n productos recomendados
+            History object del fine-tuning
         """
+        epochs = epochs or MODEL_CONFIG['incremental_epochs']
+        learning_rate = learning_rate or MODEL_CONFIG['incremental_learning_rate']
         
-        if exclude_purchased is None:
-            exclude_purchased = []
-        
-        # Obtener todos los productos
-        all_products = products_df['product_id'].unique()
-        
-        # Filtrar productos ya comprados
-        candidate_products = [p for p in all_products if p not in exclude_purchased]
-        
-        # Predecir ratings para todos los productos candidatos
-        predictions = []
-        
-        for product_id in candidate_products:
-            rating = self.predict_rating(user_id, product_id)
-            
-            if rating is not None:
-                predictions.append({
-                    'product_id': product_id,
-                    'predicted_rating': rating
-                })
-        
-        # Crear DataFrame y ordenar por rating predicho
-        recommendations = pd.DataFrame(predictions)
-        recommendations = recommendations.sort_values('predicted_rating', ascending=False)
-        recommendations = recommendations.head(top_n)
-        
-        # Agregar información del producto
-        recommendations = recommendations.merge(
-            products_df[['product_id', 'product_name', 'category', 'price']],
-            on='product_id',
-            how='left'
+        new_users, new_products = self.grow_embeddings(
+            delta_df['user_id'].values, delta_df['product_id'].values
         )
+        print(f"✅ Delta preparado:")
+        print(f"   - Interacciones nuevas: {len(delta_df)}")
+        print(f"   - Usuarios nuevos: {new_users}")
+        print(f"   - Productos nuevos: {new_products}")
+        
+        X_user, _ = self.encode_ids(self.user_encoder, delta_df['user_id'].values)
+        X_product, _ = self.encode_ids(self.product_encoder, delta_df['product_id'].values)
+        y = delta_df['rating'].values.astype(np.float32)
         
-        return recommendations
+        self.model.compile(
+            optimizer=Adam(learning_rate=learning_rate),
+            loss='mse',
+            metrics=['mae', 'mse']
+        )
+        
+        print(f"\n🔁 Ajuste incremental ({epochs} épocas)...")
+        self.history = self.model.fit(
+            [X_user, X_product],
+            y,
+            epochs=epochs,
+            batch_size=batch_size,
+            verbose=verbose
+        )
+        
+        # Los pesos cambiaron: recalcular las torres de inferencia
+        self.build_inference_engine()
+        
+        return self.history
+    
+    def grow_embeddings(self, user_ids, product_ids):
+        """
+        Agrega a los encoders y embeddings los IDs que el modelo no conoce
+        
+        Los codificadores solo agregan códigos al final, así que las filas
+        existentes conservan su posición y sus pesos; las nuevas empiezan en
+        el promedio de los embeddings entrenados. Las capas densas no cambian.
+        
+        Args:
+            user_ids: IDs de usuario del delta
+            product_ids: IDs de producto del delta
+        
+        Returns:
+            (usuarios nuevos, productos nuevos)
+        """
+        user_table = self.model.get_layer('user_embedding').get_weights()[0]
+        product_table = self.model.get_layer('product_embedding').get_weights()[0]
+        
+        # Los IDs nuevos reciben códigos al final: las filas existentes no se mueven
+        new_users = len(self.user_encoder.add(user_ids))
+        new_products = len(self.product_encoder.add(product_ids))
+        
+        if new_users == 0 and new_products == 0:
+            return 0, 0
+        
+        user_table = self._grow_table(user_table, new_users)
+        product_table = self._grow_table(product_table, new_products)
+        
+        # Reconstruir la red con las tablas ampliadas y copiar los pesos
+        previous = self.model
+        self.n_users = len(user_table)
+        self.n_products = len(product_table)
+        self.build_model()
+        
+        for layer in self.model.layers:
+            if layer.name == 'user_embedding':
+                layer.set_weights([user_table])
+            elif layer.name == 'product_embedding':
+                layer.set_weights([product_table])
+            elif layer.weights:
+                layer.set_weights(previous.get_layer(layer.name).get_weights())
+        
+        return new_users, new_products
+    
+    @staticmethod
+    def _grow_table(table, n_new):
+        """Agrega n_new filas (promedio de los embeddings entrenados) al final de la tabla"""
+        if n_new == 0:
+            return table
+        
+        return np.vstack([table, np.repeat(table.mean(axis=0, keepdims=True), n_new, axis=0)])
+    
+    def _training_callbacks(self):
+        """Early stopping y reducción de learning rate sobre val_loss"""
+        early_stopping = keras.callbacks.EarlyStopping(
+            monitor='val_loss',
+            patience=5,
+            restore_best_weights=True
+        )
+        
+        reduce_lr = keras.callbacks.ReduceLROnPlateau(
+            monitor='val_loss',
+            factor=0.5,
+            patience=3,
+            min_lr=0.00001
+        )
+        
+        return [early_stopping, reduce_lr]
+    
+    def build_inference_engine(self):
+        """
+        Precalcula las torres de embeddings para inferencia en NumPy
+        
+        Returns:
+            EmbeddingTowerEngine listo para puntuar
+        """
+        
+        return self.attach_engine(EmbeddingTowerEngine.from_keras_model(self.model))
+    
+    def export_inference(self, filepath='models/recommendation_model'):
+        """
+        Exporta los pesos para el runtime NumPy (src.runtime.load_runtime)
+        
+        Args:
+            filepath: Carpeta del modelo
+        
+        Returns:
+            Ruta del archivo .npz escrito
+        """
+        
+        path = os.path.join(filepath, INFERENCE_FILE)
+        EmbeddingTowerEngine.save_weights(path, keras_weights(self.model))
+        return path
     
     def save_model(self, filepath='models/recommendation_model'):
         """
@@ -298,16 +432,25 @@ class ProductRecommendationANN:
         # Guardar modelo Keras
         self.model.save(f'{filepath}/model.keras')
         
-        # Guardar encoders
-        joblib.dump(self.user_encoder, f'{filepath}/user_encoder.pkl')
-        joblib.dump(self.product_encoder, f'{filepath}/product_encoder.pkl')
+        # Guardar encoders (.npy con memoria mapeada al cargar)
+        self.user_encoder.save(filepath, 'user_encoder')
+        self.product_encoder.save(filepath, 'product_encoder')
+        
+        # Pesos para servir sin TensorFlow
+        self.export_inference(filepath)
+        
+        # Respaldo por popularidad: quien cargue el modelo no necesita las interacciones
+        if self.popularity is not None:
+            self.popularity.save(filepath)
         
         # Guardar configuración
+        self.version = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         config = {
             'n_users': self.n_users,
             'n_products': self.n_products,
             'embedding_dim': self.embedding_dim,
-            'saved_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'purchases_position': self.purchases_position,
+            'saved_date': self.version
         }
         joblib.dump(config, f'{filepath}/config.pkl')
         
@@ -325,31 +468,55 @@ class ProductRecommendationANN:
         self.model = keras.models.load_model(f'{filepath}/model.keras')
         
         # Cargar encoders
-        self.user_encoder = joblib.load(f'{filepath}/user_encoder.pkl')
-        self.product_encoder = joblib.load(f'{filepath}/product_encoder.pkl')
+        self.user_encoder = self._load_encoder(filepath, 'user_encoder')
+        self.product_encoder = self._load_encoder(filepath, 'product_encoder')
         
         # Cargar configuración
         config = joblib.load(f'{filepath}/config.pkl')
         self.n_users = config['n_users']
         self.n_products = config['n_products']
         self.embedding_dim = config['embedding_dim']
+        self.purchases_position = config.get('purchases_position')
+        self.version = config.get('saved_date')
+        
+        self.build_inference_engine()
+        self.popularity = PopularityScorer.load(filepath)
         
         print(f"✅ Modelo cargado desde: {filepath}")
 
 
-def train_and_save_model():
+
+def train_and_save_model(streaming=False):
     """
     Función principal para entrenar y guardar el modelo
+    
+    Args:
+        streaming: Entrenar leyendo shards desde disco en lugar de cargar
+            todas las interacciones en memoria
     """
     
     print("=" * 60)
     print("🤖 SISTEMA DE RECOMENDACIÓN - ENTRENAMIENTO")
     print("=" * 60)
     
+    if streaming:
+        # Los tamaños reales se conocen al ajustar los encoders
+        model = ProductRecommendationANN(n_users=1, n_products=1, embedding_dim=50)
+        history = model.train_streaming(
+            epochs=MODEL_CONFIG['epochs'],
+            batch_size=MODEL_CONFIG['streaming_batch_size']
+        )
+        model.save_model('models/recommendation_model')
+        
+        print("\n✨ ¡Entrenamiento completado exitosamente!")
+        
+        return model, history
+    
     # Cargar datos
     print("\n📂 Cargando datos...")
-    interactions = pd.read_csv('data/interactions.csv')
-    products = pd.read_csv('data/products.csv')
+    # La capa de datos resuelve la fuente: CSV, Parquet o shards generados
+    interactions = load_table('interactions', columns=['user_id', 'product_id', 'category', 'rating'])
+    products = load_table('products')
     
     print(f"✅ Datos cargados:")
     print(f"   - Interacciones: {len(interactions)}")
@@ -377,10 +544,77 @@ def train_and_save_model():
     return model, history
 
 
+def purchases_to_interactions(purchases_df):
+    """
+    Convierte compras de la tienda en interacciones de entrenamiento
+    
+    Las compras no tienen rating explícito; se usan como señal positiva con
+    MODEL_CONFIG['purchase_rating'].
+    """
+    return pd.DataFrame({
+        'user_id': purchases_df['user_id'].values,
+        'product_id': purchases_df['product_id'].values,
+        'rating': MODEL_CONFIG['purchase_rating']
+    })
+
+
+def update_model_incrementally(filepath='models/recommendation_model'):
+    """
+    Actualiza el modelo guardado con las compras registradas desde el último checkpoint
+    
+    Args:
+        filepath: Ruta del modelo a actualizar
+    
+    Returns:
+        Modelo actualizado o None si no había compras nuevas
+    """
+    from app.components.purchases import get_purchase_journal
+    
+    print("=" * 60)
+    print("🔁 SISTEMA DE RECOMENDACIÓN - ACTUALIZACIÓN INCREMENTAL")
+    print("=" * 60)
+    
+    model = ProductRecommendationANN(n_users=1, n_products=1)
+    model.load_model(filepath)
+    
+    # Checkpoint por posición en el diario: cada compra se entrena exactamente una vez
+    purchases, position = get_purchase_journal().read_since(
+        model.purchases_position, columns=['user_id', 'product_id']
+    )
+    
+    if len(purchases) == 0:
+        print("✅ No hay compras nuevas desde el último checkpoint")
+        return None
+    
+    model.incremental_update(purchases_to_interactions(purchases))
+    model.purchases_position = position
+    model.save_model(filepath)
+    
+    print("\n✨ ¡Actualización incremental completada!")
+    
+    return model
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Entrenamiento del modelo de recomendación')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Entrenar en streaming desde shards en disco')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Ajustar el modelo guardado solo con las compras nuevas')
+    parser.add_argument('--export', action='store_true',
+                        help='Exportar el modelo guardado a inference.npz para el runtime NumPy')
+    args = parser.parse_args()
+    
     # Crear carpetas necesarias
     os.makedirs('data', exist_ok=True)
     os.makedirs('models', exist_ok=True)
     
-    # Entrenar modelo
-    model, history = train_and_save_model()
+    if args.export:
+        model = ProductRecommendationANN(n_users=1, n_products=1)
+        model.load_model(MODEL_CONFIG['model_path'])
+        print(f"📦 Pesos exportados en: {model.export_inference(MODEL_CONFIG['model_path'])}")
+    elif args.incremental:
+        update_model_incrementally()
+    else:
+        # Entrenar modelo
+        model, history = train_and_save_model(streaming=args.streaming)
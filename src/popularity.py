@@ -0,0 +1,150 @@
+"""
+Puntuación de respaldo (cold start) basada en popularidad
+Se usa para usuarios que el modelo no conoce y para productos del catálogo
+que no tienen embedding todavía
+"""
+import os
+import numpy as np
+import pandas as pd
+from src.id_encoder import IDEncoder
+from config.settings import MODEL_CONFIG
+
+# Rating global sin interacciones: punto medio de la escala 1-5
+NEUTRAL_RATING = 3.0
+
+# Archivo del respaldo dentro de la carpeta del modelo
+POPULARITY_FILE = 'popularity.npz'
+
+
+class PopularityScorer:
+    """
+    Rating promedio bayesiano precalculado por producto y por categoría
+
+    Cada promedio se suaviza hacia el promedio global con prior_weight
+    valoraciones ficticias, así un producto con una sola valoración de 5
+    no supera a uno con cientos de valoraciones altas. Los productos sin
+    interacciones reciben el promedio de su categoría y, si la categoría
+    tampoco existe, el promedio global.
+    """
+
+    def __init__(self, product_ids, product_scores, category_scores, global_score):
+        """
+        Args:
+            product_ids: IDs de producto con interacciones
+            product_scores: Rating suavizado de cada producto
+            category_scores: Diccionario categoría -> rating suavizado
+            global_score: Rating promedio global
+        """
+        self.products = IDEncoder(product_ids)
+        self.product_scores = np.asarray(product_scores, dtype=np.float32)
+        self.category_scores = category_scores
+        self.global_score = float(global_score)
+
+    @classmethod
+    def from_interactions(cls, interactions_df, prior_weight=None):
+        """
+        Precalcula la popularidad desde las interacciones
+
+        Args:
+            interactions_df: DataFrame con product_id, category y rating
+            prior_weight: Valoraciones ficticias del suavizado
+                (por defecto MODEL_CONFIG['popularity_prior_weight'])
+
+        Returns:
+            PopularityScorer listo para puntuar
+        """
+        return cls.from_batches([interactions_df], prior_weight)
+
+    @classmethod
+    def from_batches(cls, batches, prior_weight=None):
+        """
+        Precalcula la popularidad recorriendo las interacciones por bloques
+
+        Solo acumula suma y conteo de ratings por producto y por categoría,
+        así la memoria no crece con el número de interacciones.
+
+        Args:
+            batches: Iterable de DataFrames con product_id, category y rating
+            prior_weight: Valoraciones ficticias del suavizado
+                (por defecto MODEL_CONFIG['popularity_prior_weight'])
+
+        Returns:
+            PopularityScorer listo para puntuar
+        """
+        product_stats = []
+        category_stats = []
+        for batch in batches:
+            ratings = batch['rating'].astype(np.float64)
+            product_stats.append(ratings.groupby(batch['product_id']).agg(['sum', 'count']))
+            category_stats.append(ratings.groupby(batch['category'].astype(str)).agg(['sum', 'count']))
+
+        if sum(int(stats['count'].sum()) for stats in product_stats) == 0:
+            # Sin historial todos los productos reciben el mismo rating
+            return cls([], [], {}, NEUTRAL_RATING)
+
+        prior_weight = prior_weight if prior_weight is not None else MODEL_CONFIG['popularity_prior_weight']
+        products = pd.concat(product_stats).groupby(level=0).sum()
+        categories = pd.concat(category_stats).groupby(level=0).sum()
+        global_score = products['sum'].sum() / products['count'].sum()
+
+        def smoothed(stats):
+            return (stats['sum'] + prior_weight * global_score) / (stats['count'] + prior_weight)
+
+        return cls(products.index.to_numpy(), smoothed(products).to_numpy(),
+                   smoothed(categories).to_dict(), global_score)
+
+    def save(self, filepath):
+        """
+        Guarda el respaldo junto al modelo (POPULARITY_FILE)
+
+        Args:
+            filepath: Carpeta del modelo
+        """
+        path = os.path.join(filepath, POPULARITY_FILE)
+        tmp_path = f'{path}.tmp.npz'
+        np.savez(
+            tmp_path,
+            product_ids=np.asarray(self.products.classes_, dtype=np.int64),
+            product_scores=self.product_scores,
+            categories=np.array(list(self.category_scores), dtype=str),
+            category_scores=np.array(list(self.category_scores.values()), dtype=np.float64),
+            global_score=np.float64(self.global_score)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Abre un respaldo guardado con save
+
+        Returns:
+            PopularityScorer o None si el modelo no lo tiene (guardado antes)
+        """
+        path = os.path.join(filepath, POPULARITY_FILE)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            category_scores = dict(zip(data['categories'].tolist(), data['category_scores'].tolist()))
+            return cls(data['product_ids'], data['product_scores'], category_scores, data['global_score'])
+
+    def score(self, product_ids, categories):
+        """
+        Puntúa productos por popularidad
+
+        Args:
+            product_ids: Arreglo de IDs de producto
+            categories: Categoría de cada producto (para los que no tienen historial)
+
+        Returns:
+            Arreglo float32 con un rating estimado por producto
+        """
+        encoded, known = self.products.encode(product_ids)
+        fallback = (pd.Series(categories, dtype=object)
+                    .map(self.category_scores)
+                    .fillna(self.global_score)
+                    .to_numpy(dtype=np.float32))
+        if len(self.product_scores) == 0:
+            return fallback
+
+        return np.where(known, self.product_scores[encoded], fallback).astype(np.float32)
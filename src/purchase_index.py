@@ -0,0 +1,98 @@
+"""
+Índice de productos comprados por usuario
+Estructura CSR construida una vez desde las interacciones, con un delta
+en memoria para las compras nuevas
+"""
+
+import threading
+import numpy as np
+
+
+class PurchasedItemIndex:
+    """
+    Índice usuario -> productos comprados en formato CSR
+
+    users está ordenado y products[offsets[i]:offsets[i + 1]] contiene los
+    productos (ordenados, sin duplicados) del usuario users[i]. Las compras
+    registradas después de construir el índice se guardan en un delta por
+    usuario, sin reconstruir los arreglos.
+    """
+
+    def __init__(self, user_ids, product_ids):
+        """
+        Construye el índice a partir de pares (usuario, producto)
+
+        Args:
+            user_ids: Arreglo con el user_id de cada compra
+            product_ids: Arreglo con el product_id de cada compra
+        """
+        user_ids = np.asarray(user_ids)
+        product_ids = np.asarray(product_ids)
+
+        order = np.lexsort((product_ids, user_ids))
+        user_ids, product_ids = user_ids[order], product_ids[order]
+
+        # Eliminar pares repetidos (mismo producto comprado varias veces)
+        keep = np.ones(len(user_ids), dtype=bool)
+        keep[1:] = (user_ids[1:] != user_ids[:-1]) | (product_ids[1:] != product_ids[:-1])
+        user_ids, product_ids = user_ids[keep], product_ids[keep]
+
+        self.users, starts = np.unique(user_ids, return_index=True)
+        self.offsets = np.append(starts, len(user_ids))
+        self.products = product_ids
+        self._delta = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """
+        Construye el índice desde un DataFrame con columnas user_id y product_id
+        """
+        return cls(df['user_id'].values, df['product_id'].values)
+
+    def get(self, user_id):
+        """
+        Obtiene los productos comprados por un usuario
+
+        Args:
+            user_id: ID del usuario
+
+        Returns:
+            Arreglo ordenado de product_ids
+        """
+        pos = np.searchsorted(self.users, user_id)
+
+        if pos < len(self.users) and self.users[pos] == user_id:
+            purchased = self.products[self.offsets[pos]:self.offsets[pos + 1]]
+        else:
+            purchased = self.products[:0]
+
+        delta = self._delta.get(user_id)
+        if delta:
+            purchased = np.union1d(purchased, delta)
+
+        return purchased
+
+    def mask(self, user_id, product_ids):
+        """
+        Máscara booleana de productos ya comprados por el usuario
+
+        Args:
+            user_id: ID del usuario
+            product_ids: Arreglo de product_ids a evaluar
+
+        Returns:
+            Arreglo booleano alineado con product_ids
+        """
+        return np.isin(product_ids, self.get(user_id))
+
+    def add(self, user_id, product_id):
+        """
+        Registra una compra nueva sin reconstruir el índice
+
+        Args:
+            user_id: ID del usuario
+            product_id: ID del producto comprado
+        """
+        with self._lock:
+            self._delta.setdefault(user_id, []).append(product_id)
@@ -0,0 +1,139 @@
+"""
+Caché de recomendaciones por usuario
+Guarda el ranking ya calculado para que los reruns de Streamlit (cambio de
+pestaña, carrito, etc.) no vuelvan a puntuar el catálogo
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from config.settings import RECOMMENDATION_CACHE_CONFIG
+
+
+class RecommendationCache:
+    """
+    Caché LRU con TTL de rankings de recomendación
+
+    La clave es (user_id, categoría, variante, versión del modelo). Cada
+    entrada guarda el ranking hasta `depth` productos, así cualquier top_n
+    menor se sirve recortando. Si el ranking tiene menos productos que la
+    profundidad pedida, está completo y sirve para cualquier top_n.
+    save_purchase invalida las entradas del usuario que compró.
+    """
+
+    def __init__(self, max_entries=None, ttl_seconds=None):
+        """
+        Args:
+            max_entries: Máximo de rankings guardados (por defecto RECOMMENDATION_CACHE_CONFIG)
+            ttl_seconds: Vigencia de cada ranking en segundos (por defecto RECOMMENDATION_CACHE_CONFIG)
+        """
+        self.max_entries = max_entries or RECOMMENDATION_CACHE_CONFIG['max_entries']
+        self.ttl_seconds = ttl_seconds or RECOMMENDATION_CACHE_CONFIG['ttl_seconds']
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user_id, category, variant, model_version, top_n):
+        """
+        Devuelve las top_n primeras recomendaciones guardadas
+
+        Args:
+            user_id: ID del usuario
+            category: Categoría filtrada (None = todas)
+            variant: Origen del ranking (p. ej. 'live' o 'precomputed')
+            model_version: Versión del modelo que generó el ranking
+            top_n: Número de recomendaciones pedidas
+
+        Returns:
+            DataFrame con top_n filas (copia propia) o None si no hay entrada válida
+        """
+        key = (user_id, category, variant, model_version)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() > entry[0]:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None or (len(entry[1]) < top_n and not entry[2]):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].head(top_n).copy()
+
+    def put(self, user_id, category, variant, model_version, ranked, depth):
+        """
+        Guarda un ranking
+
+        Args:
+            user_id, category, variant, model_version: Clave de la entrada
+            ranked: DataFrame ordenado con el formato de recommend_products
+            depth: Número de productos que se pidieron al calcular ranked
+        """
+        key = (user_id, category, variant, model_version)
+        # Menos filas que las pedidas: no quedan más candidatos
+        complete = len(ranked) < depth
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, ranked, complete)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        """Descarta todos los rankings de un usuario (p. ej. tras una compra)"""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        """Descarta todas las entradas"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key):
+        """Quita una entrada y su referencia por usuario (requiere el lock)"""
+        del self._entries[key]
+        user_keys = self._keys_by_user.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self):
+        """Contadores de uso de la caché"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries)
+            }
+
+
+# Caché de recomendaciones compartida por todas las sesiones del proceso
+RECOMMENDATION_CACHE = RecommendationCache()
+
+
+def get_recommendation_cache_stats():
+    """Contadores de aciertos y fallos de la caché de recomendaciones"""
+    return RECOMMENDATION_CACHE.stats()
@@ -0,0 +1,365 @@
+"""
+Runtime de recomendación solo con NumPy
+Contiene el scoring y el ranking de ProductRecommendationANN sin depender de
+TensorFlow, para que el servicio y la interfaz arranquen desde el paquete
+exportado (inference.npz + encoders .npy) sin cargar Keras
+"""
+
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from src.inference import EmbeddingTowerEngine, INFERENCE_FILE
+from src.id_encoder import IDEncoder
+from src.popularity import PopularityScorer
+from src.ann_index import IVFCandidateIndex
+from config.settings import MODEL_CONFIG
+
+
+class RecommendationRuntime:
+    """
+    Scoring y ranking de recomendaciones sobre el motor NumPy
+    
+    ProductRecommendationANN hereda de esta clase y agrega el modelo Keras,
+    el entrenamiento y el guardado. load_runtime la crea directamente desde
+    un modelo exportado.
+    """
+    
+    def __init__(self):
+        self.model = None
+        self.user_encoder = IDEncoder()
+        self.product_encoder = IDEncoder()
+        self.engine = None
+        self.candidate_index = None
+        self.n_candidates = MODEL_CONFIG['ann_candidates']
+        self.popularity = None
+        self.version = None
+    
+    def attach_engine(self, engine):
+        """
+        Asigna el motor de inferencia y, en catálogos grandes, su índice de candidatos
+        
+        Args:
+            engine: EmbeddingTowerEngine
+        
+        Returns:
+            El mismo motor
+        """
+        
+        self.engine = engine
+        
+        # Catálogos grandes: índice de candidatos sobre la torre de productos
+        if len(self.engine.product_tower) >= MODEL_CONFIG['ann_min_catalog']:
+            self.build_candidate_index()
+        else:
+            self.candidate_index = None
+        
+        return self.engine
+    
+    def build_popularity(self, interactions_df):
+        """
+        Precalcula el respaldo por popularidad para cold start
+        
+        Args:
+            interactions_df: DataFrame con product_id, category y rating
+        
+        Returns:
+            PopularityScorer asignado al modelo
+        """
+        
+        self.popularity = PopularityScorer.from_interactions(interactions_df)
+        return self.popularity
+    
+    def build_candidate_index(self, n_lists=None):
+        """
+        Construye el índice IVF de candidatos sobre la torre de productos
+        
+        Args:
+            n_lists: Número de listas invertidas (por defecto ~sqrt(n_productos))
+        
+        Returns:
+            IVFCandidateIndex entrenado
+        """
+        
+        self.candidate_index = IVFCandidateIndex(n_lists=n_lists).fit(
+            self.engine.product_tower
+        )
+        return self.candidate_index
+    
+    def predict_rating(self, user_id, product_id):
+        """
+        Predice el rating que un usuario daría a un producto
+        
+        Args:
+            user_id: ID del usuario
+            product_id: ID del producto
+        
+        Returns:
+            Rating predicho (0-5)
+        """
+        
+        # Codificar usuario y producto
+        user_encoded, user_known = self.user_encoder.encode([user_id])
+        product_encoded, product_known = self.product_encoder.encode([product_id])
+        
+        if not (user_known[0] and product_known[0]):
+            # Usuario o producto no visto en entrenamiento
+            return None
+        
+        # Predecir
+        if self.engine is not None:
+            prediction = self.engine.score(user_encoded[0], product_encoded)[0]
+        else:
+            prediction = self.model.predict(
+                [user_encoded, product_encoded],
+                verbose=0
+            )[0][0]
+        
+        # Limitar rating entre 0 y 5
+        prediction = np.clip(prediction, 0, 5)
+        
+        return prediction
+    
+    def encode_ids(self, encoder, ids):
+        """
+        Codifica un arreglo de IDs en bloque
+        
+        Args:
+            encoder: IDEncoder del modelo
+            ids: Arreglo de IDs originales
+        
+        Returns:
+            (encoded, known): índices codificados y máscara de IDs conocidos
+        """
+        
+        return encoder.encode(ids)
+    
+    def _candidate_codes(self, user_code, product_ids):
+        """
+        Codifica los productos candidatos de un usuario conocido
+        
+        Args:
+            user_code: Índice codificado del usuario
+            product_ids: Arreglo de IDs de productos
+        
+        Returns:
+            (product_ids, product_encoded): productos conocidos por el modelo,
+            preseleccionados con el índice de candidatos en catálogos grandes
+        """
+        
+        product_encoded, product_known = self.encode_ids(self.product_encoder, product_ids)
+        product_ids = product_ids[product_known]
+        product_encoded = product_encoded[product_known]
+        
+        if self.candidate_index is not None and len(product_encoded) > self.n_candidates:
+            # Preselección aproximada antes del scoring denso
+            allowed = np.zeros(len(self.engine.product_tower), dtype=bool)
+            allowed[product_encoded] = True
+            centroid_scores = self.engine.score_towers(
+                user_code, self.candidate_index.centroids
+            )
+            product_encoded = self.candidate_index.shortlist(
+                centroid_scores, self.n_candidates, allowed
+            )
+            product_ids = self.product_encoder.classes_[product_encoded]
+        
+        return product_ids, product_encoded
+    
+    def predict_ratings(self, user_id, product_ids, batch_size=8192):
+        """
+        Predice ratings de un usuario para muchos productos en una sola pasada
+        
+        Args:
+            user_id: ID del usuario
+            product_ids: Arreglo de IDs de productos
+            batch_size: Tamaño de lote para model.predict
+        
+        Returns:
+            (product_ids, ratings): productos conocidos por el modelo y su
+            rating predicho (0-5). Vacíos si el usuario no es conocido.
+        """
+        
+        product_ids = np.asarray(product_ids)
+        user_encoded, user_known = self.encode_ids(self.user_encoder, [user_id])
+        
+        if not user_known[0]:
+            # Usuario no visto en entrenamiento
+            return product_ids[:0], np.empty(0, dtype=np.float32)
+        
+        product_ids, product_encoded = self._candidate_codes(user_encoded[0], product_ids)
+        
+        if len(product_ids) == 0:
+            return product_ids, np.empty(0, dtype=np.float32)
+        
+        if self.engine is not None:
+            # Camino rápido: torres precalculadas, sin TensorFlow
+            predictions = self.engine.score(user_encoded[0], product_encoded)
+            return product_ids, np.clip(predictions, 0, 5)
+        
+        # Una única pasada del grafo para todos los candidatos
+        user_batch = np.full(len(product_encoded), user_encoded[0])
+        predictions = self.model.predict(
+            [user_batch, product_encoded],
+            batch_size=batch_size,
+            verbose=0
+        )[:, 0]
+        
+        # Limitar rating entre 0 y 5
+        return product_ids, np.clip(predictions, 0, 5)
+    
+    def predict_ratings_batch(self, requests, batch_size=8192):
+        """
+        Predice ratings de varias peticiones (usuario, productos) en una sola pasada
+        
+        Los pares usuario-producto de todas las peticiones se concatenan y se
+        evalúan juntos; el resultado se reparte después por petición.
+        
+        Args:
+            requests: Lista de (user_id, product_ids)
+            batch_size: Tamaño de lote para model.predict
+        
+        Returns:
+            Lista con un (product_ids, ratings) por petición, igual que predict_ratings
+        """
+        
+        user_encoded, user_known = self.encode_ids(
+            self.user_encoder, [user_id for user_id, _ in requests]
+        )
+        
+        results = []
+        user_codes = []
+        product_codes = []
+        for (_, product_ids), user_code, known in zip(requests, user_encoded, user_known):
+            product_ids = np.asarray(product_ids)
+            if known:
+                product_ids, product_encoded = self._candidate_codes(user_code, product_ids)
+            else:
+                product_ids, product_encoded = product_ids[:0], product_ids[:0]
+            results.append(product_ids)
+            user_codes.append(np.full(len(product_encoded), user_code))
+            product_codes.append(product_encoded)
+        
+        user_codes = np.concatenate(user_codes).astype(np.int64)
+        product_codes = np.concatenate(product_codes).astype(np.int64)
+        
+        if len(product_codes) == 0:
+            predictions = np.empty(0, dtype=np.float32)
+        elif self.engine is not None:
+            predictions = self.engine.score_pairs(user_codes, product_codes)
+        else:
+            predictions = self.model.predict(
+                [user_codes, product_codes],
+                batch_size=batch_size,
+                verbose=0
+            )[:, 0]
+        
+        # Repartir las predicciones en el orden de las peticiones
+        ratings = np.split(np.clip(predictions, 0, 5), np.cumsum([len(ids) for ids in results])[:-1])
+        return list(zip(results, ratings))
+    
+    def recommend_products(self, user_id, products_df, top_n=10, exclude_purchased=None, scorer=None):
+        """
+        Recomienda productos para un usuario
+        
+        Args:
+            user_id: ID del usuario
+            products_df: DataFrame con información de productos
+            top_n: Número de recomendaciones a retornar
+            exclude_purchased: Lista o arreglo de product_ids ya comprados (opcional)
+            scorer: Función con la firma de predict_ratings que puntúa a los
+                usuarios conocidos (por defecto self.predict_ratings)
+        
+        Returns:
+            DataFrame con top_n productos recomendados. Usuarios y productos
+            sin embedding se puntúan con self.popularity si está disponible.
+        """
+        
+        if exclude_purchased is None:
+            exclude_purchased = []
+        
+        # Obtener todos los productos y filtrar los ya comprados
+        candidates = products_df[['product_id', 'category']].drop_duplicates('product_id')
+        candidates = candidates[~np.isin(candidates['product_id'].values, exclude_purchased)]
+        candidate_products = candidates['product_id'].values
+        
+        # Usuario conocido: se detecta una vez por petición
+        _, user_known = self.encode_ids(self.user_encoder, [user_id])
+        
+        if user_known[0]:
+            # Predecir ratings para todos los productos candidatos en bloque
+            product_ids, ratings = (scorer or self.predict_ratings)(user_id, candidate_products)
+            
+            # Productos sin embedding (nuevos en el catálogo): rating medio del
+            # usuario ajustado por la popularidad relativa de su categoría.
+            # Los conocidos que la preselección descartó no se vuelven a añadir.
+            _, product_known = self.encode_ids(self.product_encoder, candidate_products)
+            unseen = ~product_known
+            if self.popularity is not None and unseen.any():
+                popularity = self.popularity.score(candidate_products[unseen], candidates['category'].values[unseen])
+                user_mean = ratings.mean() if len(ratings) else self.popularity.global_score
+                fallback = np.clip(user_mean + popularity - self.popularity.global_score, 0, 5)
+                product_ids = np.concatenate([product_ids, candidate_products[unseen]])
+                ratings = np.concatenate([ratings, fallback])
+        elif self.popularity is not None:
+            # Cold start: ranking por popularidad
+            product_ids = candidate_products
+            ratings = self.popularity.score(candidate_products, candidates['category'].values)
+        else:
+            product_ids, ratings = candidate_products[:0], np.empty(0, dtype=np.float32)
+        
+        # Crear DataFrame y ordenar por rating predicho
+        recommendations = pd.DataFrame({
+            'product_id': product_ids,
+            'predicted_rating': ratings
+        })
+        recommendations = recommendations.sort_values('predicted_rating', ascending=False)
+        recommendations = recommendations.head(top_n)
+        
+        # Agregar información del producto
+        recommendations = recommendations.merge(
+            products_df[['product_id', 'product_name', 'category', 'price']],
+            on='product_id',
+            how='left'
+        )
+        
+        return recommendations
+    
+    @staticmethod
+    def _load_encoder(filepath, name):
+        """Abre el encoder .npy; los modelos anteriores solo tienen el LabelEncoder en .pkl"""
+        encoder = IDEncoder.load(filepath, name)
+        if encoder is None:
+            encoder = IDEncoder.from_label_encoder(joblib.load(f'{filepath}/{name}.pkl'))
+        return encoder
+
+
+def load_runtime(filepath=None):
+    """
+    Carga un modelo exportado sin importar TensorFlow
+    
+    Args:
+        filepath: Carpeta del modelo (por defecto MODEL_CONFIG['model_path'])
+    
+    Returns:
+        RecommendationRuntime listo para recomendar
+    
+    Raises:
+        FileNotFoundError: Si el modelo no tiene inference.npz
+    """
+    filepath = filepath or MODEL_CONFIG['model_path']
+    weights_path = os.path.join(filepath, INFERENCE_FILE)
+    if not os.path.exists(weights_path):
+        raise FileNotFoundError(
+            f"No existe {weights_path}. Ejecuta: python -m src.model --export"
+        )
+    
+    runtime = RecommendationRuntime()
+    runtime.user_encoder = runtime._load_encoder(filepath, 'user_encoder')
+    runtime.product_encoder = runtime._load_encoder(filepath, 'product_encoder')
+    runtime.version = joblib.load(os.path.join(filepath, 'config.pkl')).get('saved_date')
+    runtime.attach_engine(EmbeddingTowerEngine.load(weights_path))
+    runtime.popularity = PopularityScorer.load(filepath)
+    
+    print(f"✅ Modelo exportado cargado desde: {filepath}")
+    
+    return runtime
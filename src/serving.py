@@ -0,0 +1,280 @@
+"""
+Servicio HTTP de recomendaciones con workers pre-fork
+El proceso principal carga el modelo exportado (inference.npz) una vez, copia
+los pesos del motor NumPy a un bloque de memoria compartida y crea N workers
+que atienden el mismo socket. El servicio nunca importa TensorFlow.
+
+Ejecutar con: python -m src.serving [--workers 4] [--port 8601]
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import numpy as np
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from multiprocessing import shared_memory
+from urllib.parse import urlparse, parse_qs
+from src.runtime import load_runtime
+from src.batch_recommend import load_batch_store, recommend_with_store
+from src.data_store import load_table
+from config.settings import SERVING_CONFIG
+
+ALIGNMENT = 64
+
+
+class SharedWeights:
+    """
+    Bloque de memoria compartida con los arreglos de solo lectura del motor
+
+    Los arreglos se copian una vez antes del fork y se reemplazan por vistas
+    sobre el bloque, así todos los workers leen las mismas páginas físicas.
+    """
+
+    def __init__(self, arrays):
+        """
+        Args:
+            arrays: Diccionario nombre -> np.ndarray
+        """
+        sizes = [-(-array.nbytes // ALIGNMENT) * ALIGNMENT for array in arrays.values()]
+        self.shm = shared_memory.SharedMemory(create=True, size=max(sum(sizes), 1))
+        self.views = {}
+
+        offset = 0
+        for (name, array), size in zip(arrays.items(), sizes):
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf, offset=offset)
+            view[...] = array
+            view.flags.writeable = False
+            self.views[name] = view
+            offset += size
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def unlink(self):
+        """Elimina el bloque del sistema; el mapeo se libera al salir del proceso"""
+        self.shm.unlink()
+
+
+def share_model_weights(model):
+    """
+    Mueve los pesos de inferencia del modelo a memoria compartida
+
+    Args:
+        model: RecommendationRuntime con motor de inferencia
+
+    Returns:
+        SharedWeights que respalda ahora los arreglos del modelo
+    """
+    engine = model.engine
+    arrays = {'user_tower': engine.user_tower, 'product_tower': engine.product_tower}
+    for i, (kernel, bias) in enumerate(engine.layers):
+        arrays[f'kernel_{i}'] = kernel
+        arrays[f'bias_{i}'] = bias
+
+    index = model.candidate_index
+    if index is not None:
+        arrays.update(centroids=index.centroids, list_offsets=index.list_offsets,
+                      list_items=index.list_items)
+
+    if model.popularity is not None:
+        arrays['popularity'] = model.popularity.product_scores
+
+    weights = SharedWeights(arrays)
+    views = weights.views
+
+    engine.user_tower = views['user_tower']
+    engine.product_tower = views['product_tower']
+    engine.layers = [(views[f'kernel_{i}'], views[f'bias_{i}']) for i in range(len(engine.layers))]
+    if index is not None:
+        index.centroids = views['centroids']
+        index.list_offsets = views['list_offsets']
+        index.list_items = views['list_items']
+    if model.popularity is not None:
+        model.popularity.product_scores = views['popularity']
+
+    return weights
+
+
+class RecommendationService:
+    """Estado compartido por los workers: modelo, catálogo y job offline"""
+
+    def __init__(self, model_path=None):
+        self.model = load_runtime(model_path)
+        if self.model.popularity is None:
+            # Modelo guardado antes de persistir el respaldo por popularidad
+            self.model.build_popularity(load_table('interactions', columns=['product_id', 'category', 'rating']))
+        self.products = load_table('products')
+        self.store = load_batch_store(model=self.model)
+
+        self.weights = share_model_weights(self.model)
+
+    def recommend(self, user_id, top_n=10, category=None, exclude_purchased=None, precomputed=False):
+        """Recomendaciones con el mismo formato que recommend_products"""
+        products = self.products
+        if category:
+            products = products[products['category'] == category]
+
+        if precomputed:
+            return recommend_with_store(self.model, self.store, user_id, products, top_n, exclude_purchased)
+
+        return self.model.recommend_products(user_id, products, top_n, exclude_purchased)
+
+    def predict_rating(self, user_id, product_id):
+        rating = self.model.predict_rating(user_id, product_id)
+        return None if rating is None else float(rating)
+
+
+class RecommendationHandler(BaseHTTPRequestHandler):
+    """
+    Endpoints JSON:
+    - GET /health
+    - GET /recommend?user_id=5&top_n=10&category=Ropa&exclude=1,2&precomputed=1
+    - GET /rating?user_id=5&product_id=3
+    """
+
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if url.path == '/health':
+                self._send_json(200, {'status': 'ok', 'pid': os.getpid()})
+            elif url.path == '/recommend':
+                self._send_json(200, self._recommend(params))
+            elif url.path == '/rating':
+                rating = self.service.predict_rating(int(params['user_id']), int(params['product_id']))
+                self._send_json(200, {'predicted_rating': rating})
+            else:
+                self._send_json(404, {'error': f'Ruta desconocida: {url.path}'})
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'error': f'Parámetro inválido: {e}'})
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+
+    def _recommend(self, params):
+        exclude = params.get('exclude')
+        recommendations = self.service.recommend(
+            user_id=int(params['user_id']),
+            top_n=int(params.get('top_n', 10)),
+            category=params.get('category') or None,
+            exclude_purchased=[int(p) for p in exclude.split(',') if p] if exclude else None,
+            precomputed=params.get('precomputed') == '1'
+        )
+        return {'recommendations': json.loads(recommendations.to_json(orient='records'))}
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sin log por petición: el costo de escribir en stderr domina la latencia
+        pass
+
+
+def _run_worker(sock):
+    """Atiende peticiones del socket compartido hasta recibir SIGTERM"""
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    server = HTTPServer(sock.getsockname(), RecommendationHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    try:
+        server.serve_forever()
+    finally:
+        os._exit(0)
+
+
+def serve(host=None, port=None, workers=None):
+    """
+    Carga el modelo, comparte los pesos y lanza los workers pre-fork
+
+    Args:
+        host: Dirección de escucha (por defecto SERVING_CONFIG['host'])
+        port: Puerto (por defecto SERVING_CONFIG['port'])
+        workers: Número de procesos (por defecto uno por núcleo)
+    """
+    host = host or SERVING_CONFIG['host']
+    port = port or SERVING_CONFIG['port']
+    workers = workers or SERVING_CONFIG['workers'] or os.cpu_count()
+
+    print("=" * 60)
+    print("🌐 SISTEMA DE RECOMENDACIÓN - SERVICIO HTTP")
+    print("=" * 60)
+
+    RecommendationHandler.service = RecommendationService()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(SERVING_CONFIG['backlog'])
+
+    children = set()
+    shutting_down = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(sock)
+        children.add(pid)
+
+    def shutdown(*_):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(workers):
+        spawn()
+
+    weights_mb = RecommendationHandler.service.weights.nbytes / 1024 ** 2
+    print(f"✅ {workers} workers en http://{host}:{port} (pesos compartidos: {weights_mb:,.1f} MB)", flush=True)
+
+    # Supervisar: reemplazar workers que terminen inesperadamente
+    try:
+        while children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            if pid not in children:
+                continue
+            children.discard(pid)
+            if not shutting_down:
+                time.sleep(0.1)
+                spawn()
+    finally:
+        sock.close()
+        RecommendationHandler.service.weights.unlink()
+        print("👋 Servicio detenido")
+
+
+def main():
+    """Punto de entrada del servicio"""
+    parser = argparse.ArgumentParser(description='Servicio HTTP de recomendaciones')
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
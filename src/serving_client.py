@@ -0,0 +1,82 @@
+"""
+Cliente del servicio HTTP de recomendaciones
+Permite que la interfaz delegue el scoring en src.serving en lugar de
+cargar el modelo en el proceso de Streamlit
+"""
+
+import json
+import pandas as pd
+from urllib.parse import urlencode
+from urllib.request import urlopen
+from urllib.error import URLError
+from config.settings import SERVING_CONFIG
+
+RECOMMENDATION_COLUMNS = ['product_id', 'predicted_rating', 'product_name', 'category', 'price']
+
+
+class ServiceUnavailableError(Exception):
+    """El servicio no respondió o devolvió un error"""
+
+
+class RecommendationClient:
+    """Cliente JSON de los endpoints /recommend, /rating y /health"""
+
+    def __init__(self, host=None, port=None, timeout=None):
+        """
+        Args:
+            host: Dirección del servicio (por defecto SERVING_CONFIG['host'])
+            port: Puerto del servicio (por defecto SERVING_CONFIG['port'])
+            timeout: Segundos máximos por petición
+        """
+        self.base_url = f"http://{host or SERVING_CONFIG['host']}:{port or SERVING_CONFIG['port']}"
+        self.timeout = timeout or SERVING_CONFIG['timeout']
+
+    def _get(self, path, **params):
+        url = f"{self.base_url}{path}?{urlencode({k: v for k, v in params.items() if v is not None})}"
+        try:
+            with urlopen(url, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except (URLError, OSError, ValueError) as e:
+            raise ServiceUnavailableError(str(e)) from e
+
+    def is_available(self):
+        """El servicio responde a /health"""
+        try:
+            return self._get('/health').get('status') == 'ok'
+        except ServiceUnavailableError:
+            return False
+
+    def recommend(self, user_id, top_n=10, category=None, exclude_purchased=None, precomputed=False):
+        """
+        Pide recomendaciones al servicio
+
+        Args:
+            user_id: ID del usuario
+            top_n: Número de recomendaciones
+            category: Categoría a filtrar (None = todas)
+            exclude_purchased: product_ids ya comprados
+            precomputed: Usar el job offline si tiene al usuario
+
+        Returns:
+            DataFrame con el mismo formato que recommend_products
+
+        Raises:
+            ServiceUnavailableError: Si el servicio no responde
+        """
+        exclude = None
+        if exclude_purchased is not None and len(exclude_purchased):
+            exclude = ','.join(str(int(p)) for p in exclude_purchased)
+
+        payload = self._get(
+            '/recommend',
+            user_id=int(user_id),
+            top_n=int(top_n),
+            category=category,
+            exclude=exclude,
+            precomputed='1' if precomputed else None
+        )
+        return pd.DataFrame(payload['recommendations'], columns=RECOMMENDATION_COLUMNS)
+
+    def predict_rating(self, user_id, product_id):
+        """Rating predicho o None si el usuario o producto no son conocidos"""
+        return self._get('/rating', user_id=int(user_id), product_id=int(product_id))['predicted_rating']
@@ -0,0 +1,181 @@
+"""
+Pipeline de entrenamiento fuera de memoria
+Convierte las interacciones en shards binarios de registros de longitud fija
+(user_encoded, product_encoded, rating) y los lee en streaming con tf.data,
+así el entrenamiento no necesita la tabla completa en memoria
+"""
+import os
+import sys
+import glob
+import time
+import resource
+import joblib
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from datetime import datetime
+from src.data_store import iter_table_batches
+
+RECORD_FIELDS = 3
+RECORD_BYTES = RECORD_FIELDS * np.dtype(np.int32).itemsize
+TRAIN_DIR = 'train'
+VALIDATION_DIR = 'validation'
+META_FILE = 'meta.pkl'
+
+
+def fit_encoders(user_encoder, product_encoder, table='interactions', batch_rows=1_000_000):
+    """
+    Ajusta los encoders recorriendo la tabla por bloques
+
+    Solo se guardan los IDs únicos, por lo que la memoria depende del número
+    de usuarios y productos, no del número de interacciones.
+
+    Args:
+        user_encoder: IDEncoder de usuarios
+        product_encoder: IDEncoder de productos
+        table: Tabla de interacciones
+        batch_rows: Filas por bloque
+    """
+    user_ids = np.array([], dtype=np.int64)
+    product_ids = np.array([], dtype=np.int64)
+
+    for batch in iter_table_batches(table, ['user_id', 'product_id'], batch_rows):
+        user_ids = np.union1d(user_ids, batch['user_id'].to_numpy())
+        product_ids = np.union1d(product_ids, batch['product_id'].to_numpy())
+
+    user_encoder.fit(user_ids)
+    product_encoder.fit(product_ids)
+
+
+def write_shards(user_encoder, product_encoder, shard_dir, table='interactions',
+                 shard_rows=1_000_000, validation_split=0.2, seed=42):
+    """
+    Escribe las interacciones codificadas como shards de entrenamiento y validación
+
+    Args:
+        user_encoder: IDEncoder de usuarios ya ajustado
+        product_encoder: IDEncoder de productos ya ajustado
+        shard_dir: Carpeta destino
+        table: Tabla de interacciones
+        shard_rows: Filas leídas por shard
+        validation_split: Fracción de filas para validación
+        seed: Semilla de la partición train/validación
+
+    Returns:
+        Diccionario con las filas de cada partición y el tamaño de los encoders
+    """
+    for split in (TRAIN_DIR, VALIDATION_DIR):
+        os.makedirs(os.path.join(shard_dir, split), exist_ok=True)
+        for path in glob.glob(os.path.join(shard_dir, split, 'shard_*.bin')):
+            os.remove(path)
+
+    rng = np.random.default_rng(seed)
+    counts = {TRAIN_DIR: 0, VALIDATION_DIR: 0}
+
+    for shard_id, batch in enumerate(iter_table_batches(
+            table, ['user_id', 'product_id', 'rating'], shard_rows)):
+        records = np.empty((len(batch), RECORD_FIELDS), dtype=np.int32)
+        records[:, 0] = user_encoder.encode(batch['user_id'].to_numpy())[0]
+        records[:, 1] = product_encoder.encode(batch['product_id'].to_numpy())[0]
+        records[:, 2] = batch['rating'].to_numpy()
+
+        validation = rng.random(len(records)) < validation_split
+        for split, rows in ((TRAIN_DIR, records[~validation]), (VALIDATION_DIR, records[validation])):
+            rows.tofile(os.path.join(shard_dir, split, f'shard_{shard_id:05d}.bin'))
+            counts[split] += len(rows)
+
+    meta = {
+        'n_train': counts[TRAIN_DIR],
+        'n_validation': counts[VALIDATION_DIR],
+        'n_users': len(user_encoder.classes_),
+        'n_products': len(product_encoder.classes_),
+        'generated_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    joblib.dump(meta, os.path.join(shard_dir, META_FILE))
+
+    return meta
+
+
+def _parse_batch(records):
+    """Decodifica un lote de registros binarios en entradas y rating"""
+    values = tf.reshape(tf.io.decode_raw(records, tf.int32), [-1, RECORD_FIELDS])
+    return (values[:, 0:1], values[:, 1:2]), tf.cast(values[:, 2:3], tf.float32)
+
+
+def make_dataset(shard_dir, split, batch_size=64, shuffle_buffer=None, seed=42):
+    """
+    Crea el tf.data.Dataset que lee en streaming los shards de una partición
+
+    Los shards se intercalan en paralelo, los registros pasan por un búfer
+    de mezcla, se agrupan en lotes antes de decodificarlos en paralelo y
+    se precargan mientras el modelo entrena.
+
+    Args:
+        shard_dir: Carpeta generada por write_shards
+        split: 'train' o 'validation'
+        batch_size: Tamaño del batch
+        shuffle_buffer: Registros en el búfer de mezcla (None = sin mezclar)
+        seed: Semilla de la mezcla
+
+    Returns:
+        Dataset de ((user_encoded, product_encoded), rating)
+    """
+    files = sorted(glob.glob(os.path.join(shard_dir, split, 'shard_*.bin')))
+    dataset = tf.data.Dataset.from_tensor_slices(files)
+
+    if shuffle_buffer:
+        dataset = dataset.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+
+    dataset = dataset.interleave(
+        lambda path: tf.data.FixedLengthRecordDataset(path, RECORD_BYTES, buffer_size=1 << 20),
+        cycle_length=max(1, min(4, len(files))),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle_buffer
+    )
+
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+
+    # Cardinalidad conocida por el tamaño de los archivos (barra de progreso de Keras)
+    n_records = sum(os.path.getsize(path) for path in files) // RECORD_BYTES
+    n_batches = -(-n_records // batch_size)
+
+    return (dataset
+            .batch(batch_size)
+            .apply(tf.data.experimental.assert_cardinality(n_batches))
+            .map(_parse_batch, num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso en MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS informa bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class EpochThroughputCallback(keras.callbacks.Callback):
+    """Informa muestras por segundo y pico de memoria al final de cada época"""
+
+    def __init__(self, n_samples):
+        """
+        Args:
+            n_samples: Filas de entrenamiento por época
+        """
+        super().__init__()
+        self.n_samples = n_samples
+        self._start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        samples_per_sec = self.n_samples / (time.perf_counter() - self._start)
+        peak_mb = peak_rss_mb()
+
+        if logs is not None:
+            logs['samples_per_sec'] = samples_per_sec
+            logs['peak_rss_mb'] = peak_mb
+
+        print(f"   ⏱️  Época {epoch + 1}: {samples_per_sec:,.0f} muestras/s | "
+              f"pico de memoria {peak_mb:,.0f} MB")
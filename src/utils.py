@@ -1,42 +1,86 @@
 """
 Funciones utilitarias compartidas
 """
+import os
 import pandas as pd
 import numpy as np
 import streamlit as st
 from config.settings import DATA_CONFIG, USER_CONFIG
+from src.data_store import load_table
 
-@st.cache_data
-def generate_user_names(user_ids):
-    """Genera nombres de usuario consistentes basados en IDs"""
-    nombres = [
-        "Juan", "María", "Carlos", "Ana", "Pedro", "Laura", "Miguel", "Carmen", 
-        "José", "Isabel", "Francisco", "Lucía", "Antonio", "Marta", "Manuel", 
-        "Elena", "David", "Patricia", "Javier", "Rosa", "Daniel", "Sofía", 
-        "Rafael", "Andrea", "Sergio", "Paula", "Jorge", "Beatriz", "Luis", "Clara"
-    ]
+NOMBRES = [
+    "Juan", "María", "Carlos", "Ana", "Pedro", "Laura", "Miguel", "Carmen", 
+    "José", "Isabel", "Francisco", "Lucía", "Antonio", "Marta", "Manuel", 
+    "Elena", "David", "Patricia", "Javier", "Rosa", "Daniel", "Sofía", 
+    "Rafael", "Andrea", "Sergio", "Paula", "Jorge", "Beatriz", "Luis", "Clara"
+]
+
+APELLIDOS = [
+    "García", "Rodríguez", "González", "Fernández", "López", "Martínez", 
+    "Sánchez", "Pérez", "Martín", "Gómez", "Jiménez", "Ruiz", "Hernández", 
+    "Díaz", "Moreno", "Álvarez", "Muñoz", "Romero", "Alonso", "Gutiérrez"
+]
+
+# Todas las combinaciones "Nombre Apellido"; fila = nombre, columna = apellido
+FULL_NAMES = np.array([f"{nombre} {apellido}" for nombre in NOMBRES for apellido in APELLIDOS])
+
+
+def _mix64(values):
+    """Hash splitmix64 de un arreglo uint64 (sin estado, mismo resultado en cada llamada)"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _load_name_migration():
+    """Nombres conservados de los usuarios existentes (ordenados por user_id)"""
+    if not os.path.exists(DATA_CONFIG['user_names_path']):
+        return np.array([], dtype=np.int64), np.array([], dtype=object)
     
-    apellidos = [
-        "García", "Rodríguez", "González", "Fernández", "López", "Martínez", 
-        "Sánchez", "Pérez", "Martín", "Gómez", "Jiménez", "Ruiz", "Hernández", 
-        "Díaz", "Moreno", "Álvarez", "Muñoz", "Romero", "Alonso", "Gutiérrez"
-    ]
+    table = load_table('user_names').sort_values('user_id')
+    return table['user_id'].to_numpy(np.int64), table['user_name'].to_numpy(object)
+
+
+def generate_user_name_array(user_ids):
+    """
+    Genera los nombres de muchos usuarios en una sola operación vectorizada
+    
+    Los usuarios presentes en la tabla de migración conservan su nombre; el
+    resto se obtiene de un hash del user_id, sin tocar el estado global de
+    np.random.
+    
+    Args:
+        user_ids: Arreglo o lista de IDs de usuario
+    
+    Returns:
+        Arreglo de nombres alineado con user_ids
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    hashed = _mix64(user_ids.astype(np.uint64))
+    nombre = hashed % np.uint64(len(NOMBRES))
+    apellido = (hashed >> np.uint64(32)) % np.uint64(len(APELLIDOS))
+    names = FULL_NAMES[nombre * np.uint64(len(APELLIDOS)) + apellido].astype(object)
     
-    user_names = {}
-    for user_id in user_ids:
-        np.random.seed(user_id)
-        nombre = np.random.choice(nombres)
-        apellido = np.random.choice(apellidos)
-        user_names[user_id] = f"{nombre} {apellido}"
+    migrated_ids, migrated_names = _load_name_migration()
+    if len(migrated_ids):
+        position = np.minimum(np.searchsorted(migrated_ids, user_ids), len(migrated_ids) - 1)
+        migrated = migrated_ids[position] == user_ids
+        names[migrated] = migrated_names[position[migrated]]
     
-    return user_names
+    return names
+
+
+def generate_user_names(user_ids):
+    """Genera nombres de usuario consistentes basados en IDs"""
+    return dict(zip(user_ids, generate_user_name_array(user_ids)))
 
 def load_data():
     """Carga todos los datos del sistema"""
     try:
-        interactions = pd.read_csv(DATA_CONFIG['interactions_path'])
-        products = pd.read_csv(DATA_CONFIG['products_path'])
-        user_stats = pd.read_csv(DATA_CONFIG['user_stats_path'])
+        interactions = load_table('interactions')
+        products = load_table('products')
+        user_stats = load_table('user_stats')
         return interactions, products, user_stats
     except Exception as e:
         st.error(f"❌ Error al cargar datos: {e}")